@@ -0,0 +1,169 @@
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+from software_life_cycle.utils.tokens import count_tokens
+
+# SDLC_LLM_PROVIDER=fake replaces the Groq clients with ScriptedChatModel
+FAKE_PROVIDER = "fake"
+
+
+def parse_latency(spec: str) -> tuple:
+    """
+    "fixed:S", "uniform:LOW:HIGH" or "lognormal:MEDIAN:SIGMA" (seconds) -> (kind, a, b).
+    An empty spec means no latency.
+    """
+    if not spec:
+        return ("fixed", 0.0, 0.0)
+    kind, *values = spec.split(":")
+    values = [float(value) for value in values] + [0.0, 0.0]
+    if kind not in ("fixed", "uniform", "lognormal"):
+        raise ValueError(f"Unknown latency distribution: {spec}")
+    return (kind, values[0], values[1])
+
+
+def _prompt_text(messages) -> str:
+    return "\n".join(str(message.content) for message in messages)
+
+
+class CannedChatModel(BaseChatModel):
+    """
+    Chat model that answers from canned responses instead of calling a provider.
+    Subclasses implement `_next`; generation and streaming (word chunks, usage on the last one) are shared.
+    """
+
+    model_name: str = "scripted"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name}
+
+    def _next(self, messages) -> tuple:
+        """(response text, usage metadata, delay in seconds) for a prompt."""
+        raise NotImplementedError
+
+    def _result(self, text: str, usage: dict) -> ChatResult:
+        message = AIMessage(content=text, usage_metadata=usage)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _pieces(self, text: str, usage: dict) -> list:
+        pieces = re.findall(r"\S+\s*|\s+", text) or [""]
+        chunks = [AIMessageChunk(content=piece) for piece in pieces]
+        chunks[-1] = AIMessageChunk(content=pieces[-1], usage_metadata=usage)
+        return chunks
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        text, usage, delay = self._next(messages)
+        time.sleep(delay)
+        return self._result(text, usage)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        text, usage, delay = self._next(messages)
+        await asyncio.sleep(delay)
+        return self._result(text, usage)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        text, usage, delay = self._next(messages)
+        chunks = self._pieces(text, usage)
+        for chunk in chunks:
+            time.sleep(delay / len(chunks))
+            yield ChatGenerationChunk(message=chunk)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        text, usage, delay = self._next(messages)
+        chunks = self._pieces(text, usage)
+        for chunk in chunks:
+            await asyncio.sleep(delay / len(chunks))
+            yield ChatGenerationChunk(message=chunk)
+
+
+class ScriptedChatModel(CannedChatModel):
+    """
+    Deterministic offline stand-in for the Groq clients.
+    - `rules`: [{"match": regex, "responses": [...]}]; a prompt gets the first rule whose regex
+      matches it, and the n-th call on a rule answers with `responses[n]` (the last one repeats).
+      Unmatched prompts get `default`.
+    - `latency`: per-call delay (see `parse_latency`), drawn from a generator seeded with `seed`;
+      streamed responses spread it over their chunks.
+    - Usage is reported like Groq does: counted prompt/completion tokens, or `completion_tokens` when set.
+    """
+
+    rules: List[Dict[str, Any]] = []
+    default: str = "OK"
+    latency: str = ""
+    seed: int = 0
+    completion_tokens: Optional[int] = None
+
+    _calls: Dict[int, int] = PrivateAttr(default_factory=dict)
+    _patterns: list = PrivateAttr(default_factory=list)
+    _random: random.Random = PrivateAttr(default=None)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, __context) -> None:
+        self._random = random.Random(self.seed)
+        self._patterns = [re.compile(rule["match"], re.S) for rule in self.rules]
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def calls(self) -> int:
+        """Scripted responses served so far."""
+        with self._lock:
+            return sum(self._calls.values())
+
+    def _next(self, messages) -> tuple:
+        """Advances the first rule matching the prompt."""
+        prompt = _prompt_text(messages)
+        with self._lock:
+            index = next((i for i, pattern in enumerate(self._patterns) if pattern.search(prompt)), None)
+            if index is None:
+                text = self.default
+                self._calls[-1] = self._calls.get(-1, 0) + 1
+            else:
+                responses = self.rules[index]["responses"]
+                count = self._calls.get(index, 0)
+                text = responses[min(count, len(responses) - 1)]
+                self._calls[index] = count + 1
+            kind, a, b = parse_latency(self.latency)
+            if kind == "uniform":
+                delay = self._random.uniform(a, b)
+            elif kind == "lognormal":
+                delay = a * math.exp(self._random.gauss(0.0, b))
+            else:
+                delay = a
+        return text, self._usage(prompt, text), max(0.0, delay)
+
+    def _usage(self, prompt: str, text: str) -> dict:
+        prompt_tokens = count_tokens(prompt, self.model_name)
+        completion = self.completion_tokens if self.completion_tokens is not None else count_tokens(text, self.model_name)
+        return {"input_tokens": prompt_tokens, "output_tokens": completion, "total_tokens": prompt_tokens + completion}
+
+
+def load_script(path: Optional[str]) -> dict:
+    """Reads a JSON script ({"default", "rules", "latency", "seed", "completion_tokens"}); empty without a path."""
+    if not path:
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def fake_client(model: str, script: dict = None, **options) -> ScriptedChatModel:
+    """
+    A ScriptedChatModel for `model`, configured by `script` or else by SDLC_FAKE_LLM_SCRIPT
+    (a JSON file) and SDLC_FAKE_LLM_LATENCY (overrides the script's latency).
+    """
+    script = dict(script if script is not None else load_script(os.getenv("SDLC_FAKE_LLM_SCRIPT")))
+    if os.getenv("SDLC_FAKE_LLM_LATENCY"):
+        script["latency"] = os.getenv("SDLC_FAKE_LLM_LATENCY")
+    return ScriptedChatModel(model_name=model, **script, **options)
@@ -1,20 +1,113 @@
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
+from functools import lru_cache
 import os
+import threading
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Fetch API Key (Ensure it's not None)
-api_key = os.getenv('GROQ_API_KEY')
+# Model behind each shared client
+MODELS = {
+    # "llm": 'llama-3.3-70b-versatile',
+    "llm": 'llama-3.2-90b-vision-preview',
+    "llm_docs": 'gemma2-9b-it',
+    # "llm_coder": 'llama3-8b-8192',
+    "llm_coder": 'qwen-2.5-coder-32b',
+    # Small fast model for cheap calls (see LLM/router.py)
+    "llm_fast": 'llama-3.1-8b-instant',
+}
 
-if api_key is None:
-    raise ValueError("Error: GROQ_API_KEY is missing! Please set it in the .env file.")
+# Seconds before a request is abandoned and the routed node falls back to its next model
+LLM_TIMEOUT = float(os.getenv("SDLC_LLM_TIMEOUT", "60"))
 
-os.environ['GROQ_API_KEY'] = api_key
 
-# llm = ChatGroq(model = 'llama-3.3-70b-versatile', api_key = api_key)
-llm = ChatGroq(model = 'llama-3.2-90b-vision-preview', api_key = api_key)
-llm_docs = ChatGroq(model = 'gemma2-9b-it', api_key=api_key)
-# llm_coder = ChatGroq(model = 'llama3-8b-8192', api_key=api_key)
-llm_coder = ChatGroq(model = 'qwen-2.5-coder-32b', api_key=api_key)
+def get_api_key() -> str:
+    # Fetch API Key (Ensure it's not None)
+    api_key = os.getenv('GROQ_API_KEY')
+    if api_key is None:
+        raise ValueError("Error: GROQ_API_KEY is missing! Please set it in the .env file.")
+    return api_key
+
+
+@lru_cache(maxsize=None)
+def get_response_cache():
+    """Shared on-disk response cache; identical (model, params, messages) requests are served locally."""
+    from software_life_cycle.LLM.cache import build_response_cache
+    return build_response_cache()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def set_llm(name: str, client) -> None:
+    """Replaces the shared client `name` (e.g. with a scripted fake for a benchmark); None restores the default."""
+    with _clients_lock:
+        if client is None:
+            _clients.pop(name, None)
+        else:
+            _clients[name] = client
+
+
+def get_llm(name: str = "llm"):
+    """The shared chat client `name` (a key of MODELS), built on first use."""
+    with _clients_lock:
+        if name not in _clients:
+            _clients[name] = build_llm(name)
+        return _clients[name]
+
+
+def build_llm(name: str):
+    """
+    Builds the client for `name` with the response cache and metrics callback attached.
+    - Requests are queued against each model's RPM/TPM quota (SDLC_RATE_LIMIT=0 sends them straight through).
+    - SDLC_LLM_PROVIDER=fake builds an offline scripted model instead (see `LLM/fake.py`); no API key is needed.
+    - SDLC_LLM_PROVIDER=replay serves the responses recorded in SDLC_LLM_TRACE (see `LLM/replay.py`).
+    - SDLC_LLM_RECORD=<trace> appends every request/response pair to that trace.
+    """
+    from software_life_cycle.utils.metrics import LLMMetrics
+    callbacks = [LLMMetrics(MODELS[name])]
+    if os.getenv("SDLC_LLM_RECORD"):
+        from software_life_cycle.LLM.replay import TraceRecorder
+        callbacks.append(TraceRecorder(MODELS[name], os.getenv("SDLC_LLM_RECORD")))
+    provider = os.getenv("SDLC_LLM_PROVIDER", "groq")
+    if provider == "fake":
+        from software_life_cycle.LLM.fake import fake_client
+        return fake_client(MODELS[name], cache=get_response_cache(), callbacks=callbacks)
+    if provider == "replay":
+        # No response cache: every request is answered (and delayed) from the trace
+        from software_life_cycle.LLM.replay import replay_client
+        return replay_client(MODELS[name], callbacks=callbacks)
+
+    if os.getenv("SDLC_RATE_LIMIT", "1") != "0":
+        from software_life_cycle.LLM.rate_limit import RateLimitedChatGroq as ChatClient
+        client_options = {"max_retries": 0}
+    else:
+        from langchain_groq import ChatGroq as ChatClient
+        client_options = {}
+    if LLM_TIMEOUT > 0:
+        client_options["timeout"] = LLM_TIMEOUT
+    return ChatClient(
+        model=MODELS[name], api_key=get_api_key(), cache=get_response_cache(), callbacks=callbacks, **client_options,
+    )
+
+
+class LazyClient:
+    """
+    Stands in for a shared client until it is first used, so importing the nodes (or the CLI)
+    needs neither GROQ_API_KEY nor the Groq SDK.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __getattr__(self, attr):
+        return getattr(get_llm(self.name), attr)
+
+    def __repr__(self):
+        return f"LazyClient({self.name!r})"
+
+
+llm = LazyClient("llm")
+llm_docs = LazyClient("llm_docs")
+llm_coder = LazyClient("llm_coder")
@@ -0,0 +1,312 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from groq import APIConnectionError
+from langchain_core.outputs import ChatResult
+from langchain_groq import ChatGroq
+from software_life_cycle.utils.metrics import record
+from software_life_cycle.utils.tokens import count_tokens
+
+# Provider quotas per model: (requests per minute, tokens per minute)
+MODEL_LIMITS = {
+    "llama-3.2-90b-vision-preview": (15, 7000),
+    "gemma2-9b-it": (30, 15000),
+    "qwen-2.5-coder-32b": (30, 6000),
+    "llama-3.3-70b-versatile": (30, 6000),
+    "llama-3.1-8b-instant": (30, 6000),
+}
+DEFAULT_LIMITS = (30, 6000)
+
+# Completion tokens reserved per call until the real usage is known
+RESERVED_OUTPUT_TOKENS = int(os.getenv("SDLC_RATE_LIMIT_OUTPUT_TOKENS", "1024"))
+# Retries of 429s and transient errors, and backoff (seconds), before a call is allowed to fail
+MAX_RETRIES = int(os.getenv("SDLC_RATE_LIMIT_RETRIES", "5"))
+BACKOFF_BASE = float(os.getenv("SDLC_RATE_LIMIT_BACKOFF", "1.0"))
+BACKOFF_CAP = 60.0
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `per_minute / 60` per second.
+    `reserve` always succeeds and returns how long the caller has to wait: the level
+    may go negative, so concurrent callers queue up in arrival order.
+    """
+
+    def __init__(self, per_minute: float, clock=time.monotonic):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self._clock = clock
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        with self._lock:
+            self._refill()
+            self.level -= min(amount, self.capacity)
+            return max(0.0, -self.level / self.rate)
+
+    def adjust(self, amount: float) -> None:
+        """Gives back (positive) or charges (negative) tokens once the real usage is known."""
+        with self._lock:
+            self._refill()
+            self.level = min(self.capacity, self.level + amount)
+
+    def drain(self) -> None:
+        """Empties the bucket after the provider throttled us, so queued callers back off too."""
+        with self._lock:
+            self._refill()
+            self.level = min(self.level, 0.0)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    return getattr(error, "status_code", None) == 429 or "rate limit" in str(error).lower()
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Connection errors, timeouts and 408/409/5xx responses: the errors the Groq SDK retries itself."""
+    if isinstance(error, APIConnectionError):
+        return True
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and (status in (408, 409) or status >= 500)
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, hint: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff, never shorter than the provider's Retry-After."""
+    jitter = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+    return (hint or 0.0) + jitter
+
+
+class ModelScheduler:
+    """
+    Request (RPM) and token (TPM) budgets for one model, shared by every client and thread.
+    Calls wait for budget instead of failing, 429s and transient errors are retried with
+    jittered backoff (only 429s drain the token bucket), and the wait/queue metrics are
+    kept for `scheduler_stats`.
+    """
+
+    def __init__(self, model: str, rpm: float, tpm: float, clock=time.monotonic):
+        self.model = model
+        self.requests = TokenBucket(rpm, clock)
+        self.tokens = TokenBucket(tpm, clock)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.throttled = 0
+        self.transient_errors = 0
+        self.queued = 0
+        self.max_queued = 0
+        self.wait_seconds = 0.0
+
+    def reserve(self, tokens: int) -> float:
+        return max(self.requests.reserve(1), self.tokens.reserve(tokens))
+
+    def _enter_queue(self, delay: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self.wait_seconds += delay
+            if delay > 0:
+                self.queued += 1
+                self.max_queued = max(self.max_queued, self.queued)
+        if delay > 0:
+            record(wait_seconds=delay)
+
+    def _leave_queue(self, delay: float) -> None:
+        if delay > 0:
+            with self._lock:
+                self.queued -= 1
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Backoff before retrying `error`, or None when it is not worth retrying."""
+        if attempt == MAX_RETRIES:
+            return None
+        if is_rate_limit_error(error):
+            with self._lock:
+                self.throttled += 1
+            self.tokens.drain()
+            reason = "Rate limited"
+        elif is_transient_error(error):
+            with self._lock:
+                self.transient_errors += 1
+            reason = f"Transient error ({error})"
+        else:
+            return None
+        record(retries=1)
+        delay = backoff_delay(attempt, retry_after(error))
+        print(f"{reason} on {self.model}; retrying in {delay:.1f}s (attempt {attempt + 1}/{MAX_RETRIES})")
+        return delay
+
+    def call(self, tokens: int, fn: Callable[[], Any], sleep=time.sleep) -> Any:
+        for attempt in range(MAX_RETRIES + 1):
+            delay = self.reserve(tokens)
+            self._enter_queue(delay)
+            try:
+                if delay > 0:
+                    sleep(delay)
+            finally:
+                self._leave_queue(delay)
+            try:
+                return fn()
+            except Exception as e:
+                retry = self._retry_delay(e, attempt)
+                if retry is None:
+                    raise
+                sleep(retry)
+
+    async def acall(self, tokens: int, fn: Callable[[], Any]) -> Any:
+        for attempt in range(MAX_RETRIES + 1):
+            delay = self.reserve(tokens)
+            self._enter_queue(delay)
+            try:
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            finally:
+                self._leave_queue(delay)
+            try:
+                return await fn()
+            except Exception as e:
+                retry = self._retry_delay(e, attempt)
+                if retry is None:
+                    raise
+                await asyncio.sleep(retry)
+
+    def settle(self, reserved: int, used: Optional[int]) -> None:
+        """Corrects the token bucket with the usage the provider reported."""
+        if used is not None:
+            self.tokens.adjust(reserved - used)
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "throttled": self.throttled,
+            "transient_errors": self.transient_errors,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "wait_seconds": round(self.wait_seconds, 2),
+            "avg_wait_seconds": round(self.wait_seconds / self.calls, 3) if self.calls else 0.0,
+        }
+
+
+def _configured_limits() -> Dict[str, tuple]:
+    """MODEL_LIMITS, overridden by SDLC_RATE_LIMITS='{"model": [rpm, tpm], ...}'."""
+    limits = dict(MODEL_LIMITS)
+    overrides = os.getenv("SDLC_RATE_LIMITS")
+    if overrides:
+        try:
+            limits.update({model: tuple(value) for model, value in json.loads(overrides).items()})
+        except (ValueError, TypeError) as e:
+            print(f"Ignoring invalid SDLC_RATE_LIMITS ({e})")
+    return limits
+
+
+_schedulers: Dict[str, ModelScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(model: str) -> ModelScheduler:
+    with _schedulers_lock:
+        if model not in _schedulers:
+            rpm, tpm = _configured_limits().get(model, DEFAULT_LIMITS)
+            _schedulers[model] = ModelScheduler(model, rpm, tpm)
+        return _schedulers[model]
+
+
+def scheduler_stats() -> dict:
+    """Per-model call, throttle, queue depth and wait metrics."""
+    with _schedulers_lock:
+        return {model: scheduler.stats() for model, scheduler in _schedulers.items()}
+
+
+def _chunk_usage(chunk) -> Optional[int]:
+    metadata = getattr(chunk.message, "usage_metadata", None)
+    return metadata.get("total_tokens") if metadata else None
+
+
+def _usage(result: ChatResult) -> Optional[int]:
+    usage = (result.llm_output or {}).get("token_usage") or {}
+    if "total_tokens" in usage:
+        return usage["total_tokens"]
+    message = result.generations[0].message if result.generations else None
+    metadata = getattr(message, "usage_metadata", None)
+    return metadata.get("total_tokens") if metadata else None
+
+
+class RateLimitedChatGroq(ChatGroq):
+    """
+    ChatGroq whose requests go through the per-model scheduler.
+    Only real requests are scheduled: cache hits never reach `_generate` or `_stream`.
+    The Groq SDK's own retries are disabled (max_retries=0) so 429s and transient errors
+    are retried by the scheduler instead.
+    A streamed request is retried only until its first chunk arrives.
+    """
+
+    def _reserved_tokens(self, messages) -> int:
+        prompt = "\n".join(str(message.content) for message in messages)
+        return count_tokens(prompt, self.model_name) + (self.max_tokens or RESERVED_OUTPUT_TOKENS)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        scheduler = get_scheduler(self.model_name)
+        reserved = self._reserved_tokens(messages)
+        result = scheduler.call(
+            reserved, lambda: super(RateLimitedChatGroq, self)._generate(messages, stop, run_manager, **kwargs)
+        )
+        scheduler.settle(reserved, _usage(result))
+        return result
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        scheduler = get_scheduler(self.model_name)
+        reserved = self._reserved_tokens(messages)
+        result = await scheduler.acall(
+            reserved, lambda: super(RateLimitedChatGroq, self)._agenerate(messages, stop, run_manager, **kwargs)
+        )
+        scheduler.settle(reserved, _usage(result))
+        return result
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        scheduler = get_scheduler(self.model_name)
+        reserved = self._reserved_tokens(messages)
+
+        def start():
+            chunks = super(RateLimitedChatGroq, self)._stream(messages, stop, run_manager, **kwargs)
+            return chunks, next(chunks, None)
+
+        chunks, chunk = scheduler.call(reserved, start)
+        used = None
+        while chunk is not None:
+            used = _chunk_usage(chunk) or used
+            yield chunk
+            chunk = next(chunks, None)
+        scheduler.settle(reserved, used)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        scheduler = get_scheduler(self.model_name)
+        reserved = self._reserved_tokens(messages)
+
+        async def start():
+            chunks = super(RateLimitedChatGroq, self)._astream(messages, stop, run_manager, **kwargs)
+            return chunks, await anext(chunks, None)
+
+        chunks, chunk = await scheduler.acall(reserved, start)
+        used = None
+        while chunk is not None:
+            used = _chunk_usage(chunk) or used
+            yield chunk
+            chunk = await anext(chunks, None)
+        scheduler.settle(reserved, used)
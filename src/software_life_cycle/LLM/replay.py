@@ -0,0 +1,158 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from pydantic import PrivateAttr
+from software_life_cycle.LLM.fake import CannedChatModel
+
+# SDLC_LLM_RECORD=<trace> records every LLM exchange; SDLC_LLM_PROVIDER=replay serves them back
+REPLAY_PROVIDER = "replay"
+
+_write_lock = threading.Lock()
+
+
+class ReplayMissError(LookupError):
+    """A replayed run sent a request the trace has no (further) response for."""
+
+
+def request_key(model: str, messages) -> str:
+    """Content address of a request in a trace: model + message roles and contents."""
+    rendered = json.dumps([[message.type, message.content] for message in messages], default=str)
+    return hashlib.sha256(f"{model}\x00{rendered}".encode("utf-8")).hexdigest()
+
+
+def _open(path: str, mode: str):
+    """Traces ending in .gz are gzip-compressed (appends add gzip members, which read back as one stream)."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class TraceRecorder(BaseCallbackHandler):
+    """
+    Callback attached to each chat client that appends one JSON line per finished request to a trace:
+    {"key", "model", "seconds", "text", "usage", "cached"}. Prompts are stored only as their key.
+    Responses served by the response cache are marked `cached` (record with SDLC_LLM_CACHE=0 for real latencies).
+    """
+
+    run_inline = True
+
+    def __init__(self, model: str, path: str):
+        self.model = model
+        self.path = path
+        self._pending: Dict[Any, tuple] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs) -> None:
+        self._pending[run_id] = (request_key(self.model, messages[0]), time.perf_counter())
+
+    def on_llm_end(self, response, *, run_id, **kwargs) -> None:
+        if run_id not in self._pending:
+            return
+        key, started = self._pending.pop(run_id)
+        generation = response.generations[0][0] if response.generations and response.generations[0] else None
+        message = getattr(generation, "message", None)
+        usage = dict(getattr(message, "usage_metadata", None) or {})
+        entry = {
+            "key": key,
+            "model": self.model,
+            "seconds": round(time.perf_counter() - started, 4),
+            "text": generation.text if generation is not None else "",
+            "usage": {k: usage[k] for k in ("input_tokens", "output_tokens", "total_tokens") if k in usage},
+            "cached": usage.get("total_cost") == 0,
+        }
+        with _write_lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with _open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def on_llm_error(self, error, *, run_id, **kwargs) -> None:
+        self._pending.pop(run_id, None)
+
+
+def load_trace(path: str) -> Dict[str, List[dict]]:
+    """Recorded responses of a trace grouped by request key, in recording order."""
+    entries: Dict[str, List[dict]] = {}
+    with _open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                entries.setdefault(entry["key"], []).append(entry)
+    return entries
+
+
+def replay_delay(spec: str, recorded: float) -> float:
+    """Replay latency: "zero", "recorded" (as measured) or "scaled:F" (recorded x F)."""
+    if spec in ("", "zero"):
+        return 0.0
+    if spec == "recorded":
+        return recorded
+    if spec.startswith("scaled:"):
+        return recorded * float(spec.split(":", 1)[1])
+    raise ValueError(f"Unknown replay latency: {spec}")
+
+
+class ReplayChatModel(CannedChatModel):
+    """
+    Serves the responses of a recorded trace, looked up by request key.
+    The n-th identical request gets the n-th recorded response (the last one repeats);
+    an unrecorded request raises ReplayMissError. Cached responses replay as cache hits.
+    """
+
+    trace: str
+    latency: str = "zero"
+
+    _entries: Dict[str, List[dict]] = PrivateAttr(default_factory=dict)
+    _calls: Dict[str, int] = PrivateAttr(default_factory=dict)
+    _misses: int = PrivateAttr(default=0)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, __context) -> None:
+        replay_delay(self.latency, 0.0)
+        self._entries = load_trace(self.trace)
+
+    @property
+    def _llm_type(self) -> str:
+        return "trace-replay"
+
+    def calls(self) -> int:
+        """Recorded responses served so far."""
+        with self._lock:
+            return sum(self._calls.values())
+
+    def misses(self) -> int:
+        """Requests that were not in the trace, i.e. where the run diverged from the recording."""
+        with self._lock:
+            return self._misses
+
+    def _next(self, messages) -> tuple:
+        key = request_key(self.model_name, messages)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self._misses += 1
+                raise ReplayMissError(f"No recorded {self.model_name} response for request {key[:12]} in {self.trace}")
+            count = self._calls.get(key, 0)
+            entry = entries[min(count, len(entries) - 1)]
+            self._calls[key] = count + 1
+        usage = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0, **entry["usage"]}
+        if entry.get("cached"):
+            usage["total_cost"] = 0
+        return entry["text"], usage, replay_delay(self.latency, entry["seconds"])
+
+
+def replay_client(model: str, trace: Optional[str] = None, latency: Optional[str] = None,
+                  **options) -> ReplayChatModel:
+    """A ReplayChatModel for `model` over `trace` (default SDLC_LLM_TRACE) at `latency` (default SDLC_REPLAY_LATENCY)."""
+    trace = trace or os.getenv("SDLC_LLM_TRACE")
+    if not trace:
+        raise ValueError("Error: SDLC_LLM_TRACE is missing! Set it to a trace recorded with SDLC_LLM_RECORD.")
+    return ReplayChatModel(
+        model_name=model, trace=trace, latency=latency or os.getenv("SDLC_REPLAY_LATENCY", "zero"), **options,
+    )
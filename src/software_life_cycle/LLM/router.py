@@ -0,0 +1,108 @@
+import json
+import os
+from functools import lru_cache
+from typing import Callable, Optional
+
+from software_life_cycle.LLM.llm import MODELS, get_llm
+from software_life_cycle.utils.metrics import record
+
+# Model policy per node: "model" answers first, "escalate" re-answers when the response fails
+# parsing/validation, "fallbacks" take over (in order) when a call errors or times out.
+# Values are MODELS keys. Role listing and test review triage are cheap enough for the small model.
+DEFAULT_POLICY = {
+    "default": {"model": "llm_coder", "fallbacks": ["llm"]},
+    "auto_gen_us": {"model": "llm", "fallbacks": ["llm_docs"]},
+    "create_design_doc": {"model": "llm_docs", "fallbacks": ["llm"]},
+    "generate_worker_roles": {"model": "llm_fast", "escalate": "llm_docs", "fallbacks": ["llm_docs"]},
+    "code_generation": {"model": "llm_coder", "fallbacks": ["llm"]},
+    "code_review": {"model": "llm_coder", "escalate": "llm", "fallbacks": ["llm"]},
+    "code_security_review": {"model": "llm", "escalate": "llm_coder", "fallbacks": ["llm_coder"]},
+    "generate_test_cases": {"model": "llm_coder", "fallbacks": ["llm"]},
+    "review_test_cases": {"model": "llm_fast", "escalate": "llm_coder", "fallbacks": ["llm_coder"]},
+    "qa_testing": {"model": "llm_coder", "escalate": "llm", "fallbacks": ["llm"]},
+}
+
+
+def load_policy(path: Optional[str]) -> dict:
+    """
+    DEFAULT_POLICY with the node routes of a JSON policy file laid over it
+    ({"node": {"model", "escalate", "fallbacks"}, ...}; a route replaces the default one for its node).
+    """
+    policy = dict(DEFAULT_POLICY)
+    if path:
+        with open(path, encoding="utf-8") as f:
+            policy.update(json.load(f))
+    for node, route in policy.items():
+        names = [route.get("model")] + ([route["escalate"]] if route.get("escalate") else []) + route.get("fallbacks", [])
+        unknown = [name for name in names if name not in MODELS]
+        if unknown:
+            raise ValueError(f"Model policy for {node} uses unknown model(s) {unknown}; choose from {list(MODELS)}")
+    return policy
+
+
+@lru_cache(maxsize=None)
+def get_policy() -> dict:
+    """The policy from SDLC_MODEL_POLICY (a JSON file), or the default one."""
+    return load_policy(os.getenv("SDLC_MODEL_POLICY"))
+
+
+def route(node: str) -> dict:
+    policy = get_policy()
+    return policy.get(node, policy["default"])
+
+
+def _with_fallbacks(name: str, fallbacks: list):
+    client = get_llm(name)
+    others = [get_llm(other) for other in fallbacks if other != name]
+    return client.with_fallbacks(others) if others else client
+
+
+class RoutedClient:
+    """
+    Stands in for the client a node's policy picks: its model, falling back to the next ones on errors.
+    Clients are looked up on every use, so `set_llm` replacements (benchmarks, tests) apply to routed nodes too.
+    """
+
+    def __init__(self, node: str):
+        self.node = node
+
+    @property
+    def model_name(self) -> str:
+        return MODELS[route(self.node)["model"]]
+
+    @property
+    def escalation(self):
+        """The larger model to re-ask when a response fails validation (with the same fallbacks), or None."""
+        current = route(self.node)
+        if not current.get("escalate"):
+            return None
+        return _with_fallbacks(current["escalate"], current.get("fallbacks", []))
+
+    def __getattr__(self, attr):
+        current = route(self.node)
+        return getattr(_with_fallbacks(current["model"], current.get("fallbacks", [])), attr)
+
+    def __repr__(self):
+        return f"RoutedClient({self.node!r})"
+
+
+def invoke_checked(client: RoutedClient, messages: list, valid: Callable[[str], bool], label: str) -> str:
+    """Response text from the routed model, re-asked once on the escalation model when `valid` rejects it."""
+    content = client.invoke(messages).content
+    escalation = client.escalation
+    if not valid(content) and escalation is not None:
+        print(f"{label}: response failed validation, escalating to {route(client.node)['escalate']}")
+        record(escalations=1)
+        content = escalation.invoke(messages).content
+    return content
+
+
+async def ainvoke_checked(client: RoutedClient, messages: list, valid: Callable[[str], bool], label: str) -> str:
+    """Async variant of `invoke_checked`."""
+    content = (await client.ainvoke(messages)).content
+    escalation = client.escalation
+    if not valid(content) and escalation is not None:
+        print(f"{label}: response failed validation, escalating to {route(client.node)['escalate']}")
+        record(escalations=1)
+        content = (await escalation.ainvoke(messages)).content
+    return content
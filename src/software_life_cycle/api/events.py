@@ -0,0 +1,179 @@
+import json
+from typing import Iterable, Iterator, List
+from fastapi.encoders import jsonable_encoder
+from software_life_cycle.utils.concurrency import env_int
+
+# Bumped whenever an event type or field changes meaning
+EVENT_SCHEMA_VERSION = 2
+
+# Event types
+NODE_START, NODE_END, TOKEN, REVIEW, STATUS, ERROR = "node_start", "node_end", "token", "review", "status", "error"
+SNAPSHOT = "snapshot"
+
+# A full state snapshot every N node_end events, so clients resynchronize (0 = only at the start)
+SNAPSHOT_EVERY = env_int("SDLC_STREAM_SNAPSHOT_EVERY", 20)
+
+_MISSING = object()
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+
+def _copy(value):
+    # Nodes may mutate a dict or list in place; keep our own container so the next diff sees the change
+    return value.copy() if isinstance(value, (dict, list)) else value
+
+
+def _patch(old, new):
+    """
+    A compact change from `old` to `new`, or None when sending `new` whole is as cheap:
+    - {"merge": {...}, "remove": [...]} for dicts (e.g. one role's entry in `generated_code`)
+    - {"append": ...} for lists and strings that only grew (e.g. `feedback_log`)
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        changed = {key: value for key, value in new.items() if old.get(key, _MISSING) != value}
+        removed = [key for key in old if key not in new]
+        if len(changed) + len(removed) >= len(new):
+            return None
+        patch = {"merge": jsonable_encoder(changed)}
+        if removed:
+            patch["remove"] = removed
+        return patch
+    if old and type(old) is type(new) and isinstance(new, (list, str)) and len(new) > len(old) \
+            and new[:len(old)] == old:
+        return {"append": jsonable_encoder(new[len(old):])}
+    return None
+
+
+class WorkflowEvents:
+    """
+    Turns the graph's stream chunks into versioned workflow events for one run.
+    Every event carries `v`, `type`, `seq` and `workflow_id`:
+    - snapshot:   `values`, the full state (first event, then every SNAPSHOT_EVERY node_end events)
+    - node_start: `node`
+    - node_end:   `node`, `delta` (changed fields, sent whole) and `patch` (changed fields, sent as
+                  a merge or append, see `_patch`); unchanged fields are left out
+    - token:      `source`, `text`
+    - review:     `node` waiting for a decision, `user_stories`, `design_documents`
+    - status:     the session summary when the run stops
+    - error:      `detail`
+    Clients rebuild the state with `apply_event`.
+    """
+
+    def __init__(self, workflow_id: str, values: dict = None, snapshot_every: int = None):
+        self.workflow_id = workflow_id
+        self.values = {key: _copy(value) for key, value in (values or {}).items()}
+        self.seq = 0
+        self.snapshot_every = SNAPSHOT_EVERY if snapshot_every is None else snapshot_every
+        self.since_snapshot = 0
+
+    def event(self, type_: str, **fields) -> dict:
+        self.seq += 1
+        return {"v": EVENT_SCHEMA_VERSION, "type": type_, "seq": self.seq, "workflow_id": self.workflow_id, **fields}
+
+    def snapshot(self) -> dict:
+        self.since_snapshot = 0
+        return self.event(SNAPSHOT, values=jsonable_encoder(self.values))
+
+    def diff(self, update) -> tuple:
+        """
+        (delta, patch) for the fields of a node update that differ from what the client already has.
+        Values are compared before they are encoded, so unchanged fields cost no serialization.
+        """
+        delta, patch = {}, {}
+        if not isinstance(update, dict):
+            return delta, patch
+        for key, value in update.items():
+            old = self.values.get(key, _MISSING)
+            if old is not _MISSING and old == value:
+                continue
+            self.values[key] = _copy(value)
+            change = _patch(old, value)
+            if change is None:
+                delta[key] = jsonable_encoder(value)
+            else:
+                patch[key] = change
+        return delta, patch
+
+    def from_chunk(self, mode: str, chunk) -> List[dict]:
+        """The events for one `(mode, chunk)` pair of a multi-mode graph stream (often none or one)."""
+        if mode == "tasks":
+            # Task results duplicate the "updates" chunk; only the starts are new information
+            return [self.event(NODE_START, node=chunk["name"])] if "input" in chunk else []
+        if mode == "custom":
+            return [self.event(TOKEN, source=chunk.get("source"), text=chunk.get("text", ""))]
+        if mode == "review":
+            return [self.event(REVIEW, **jsonable_encoder(chunk))]
+        node, update = next(iter(chunk.items()))
+        if node == "__interrupt__":
+            return []
+        delta, patch = self.diff(update)
+        events = [self.event(NODE_END, node=node, delta=delta, patch=patch)]
+        self.since_snapshot += 1
+        if self.snapshot_every and self.since_snapshot >= self.snapshot_every:
+            events.append(self.snapshot())
+        return events
+
+    def status(self, summary: dict) -> dict:
+        return self.event(STATUS, **jsonable_encoder(summary))
+
+    def error(self, detail: str) -> dict:
+        return self.event(ERROR, detail=detail)
+
+
+def changed_fields(event: dict) -> set:
+    """State fields a node_end event changed."""
+    return set(event.get("delta", ())) | set(event.get("patch", ()))
+
+
+def apply_event(values: dict, event: dict) -> dict:
+    """
+    Client side: the state after `event`, given the state before it (a dict of JSON values).
+    A snapshot replaces the state; node_end applies its delta and patches; other events leave it as is.
+    """
+    if event["type"] == SNAPSHOT:
+        return dict(event["values"])
+    if event["type"] != NODE_END:
+        return values
+    values = {**values, **event.get("delta", {})}
+    for key, change in event.get("patch", {}).items():
+        current = values.get(key)
+        if "append" in change:
+            values[key] = (current or type(change["append"])()) + change["append"]
+        else:
+            merged = {k: v for k, v in (current or {}).items() if k not in change.get("remove", ())}
+            merged.update(change["merge"])
+            values[key] = merged
+    return values
+
+
+def encode_ndjson(event: dict) -> str:
+    return json.dumps(event) + "\n"
+
+
+def encode_sse(event: dict) -> str:
+    return f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+def iter_events(lines: Iterable) -> Iterator[dict]:
+    """
+    Incremental client-side parser for either wire format.
+    Feed it the response's lines as they arrive (bytes or str, e.g. `response.iter_lines()`):
+    NDJSON lines are decoded one by one; SSE `data:` lines are decoded when their event ends.
+    """
+    data = []
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        line = line.rstrip("\r\n")
+        if line.startswith("data:"):
+            data.append(line[5:].lstrip())
+        elif not line:
+            if data:
+                yield json.loads("\n".join(data))
+                data = []
+        elif line.startswith("{"):
+            yield json.loads(line)
+        # Other SSE fields (id:, event:, comments) are repeated inside the JSON payload
+    if data:
+        yield json.loads("\n".join(data))
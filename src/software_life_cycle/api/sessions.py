@@ -0,0 +1,116 @@
+import asyncio
+import time
+import uuid
+from typing import Dict, Optional
+from software_life_cycle.utils.concurrency import env_int
+
+# Sessions one API process will hold at once (running or waiting for review)
+MAX_SESSIONS = env_int("SDLC_MAX_SESSIONS", 20)
+# Seconds a session may sit idle before it is dropped from memory (its checkpoint stays)
+SESSION_IDLE_SECONDS = env_int("SDLC_SESSION_IDLE_SECONDS", 1800)
+
+# Session statuses
+CREATED, RUNNING, PAUSED, AWAITING_REVIEW, COMPLETED, FAILED, CANCELLED = (
+    "created", "running", "paused", "awaiting_review", "completed", "failed", "cancelled"
+)
+
+
+class SessionLimitError(Exception):
+    """Raised when a new session would exceed MAX_SESSIONS."""
+
+
+class WorkflowSession:
+    """
+    One user's workflow run.
+    - `workflow_id` doubles as the LangGraph thread id, so the session's state lives
+      in the checkpointer and survives eviction or a restart.
+    - `lock` serialises runs of the same thread; `task` is the background run, if any.
+    """
+
+    def __init__(self, workflow_id: str, clock=time.monotonic):
+        self.workflow_id = workflow_id
+        self.status = CREATED
+        self.next_nodes = []
+        self.last_node = None
+        self.error = None
+        self.cancel_requested = False
+        self.lock = asyncio.Lock()
+        self.task: Optional[asyncio.Task] = None
+        self._clock = clock
+        self.created_at = clock()
+        self.last_active = self.created_at
+
+    def touch(self) -> None:
+        self.last_active = self._clock()
+
+    def cancel(self) -> None:
+        """Stops the session's run: the background task is cancelled, a streaming
+        run stops at its next chunk."""
+        self.cancel_requested = True
+        self.status = CANCELLED
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+
+    @property
+    def busy(self) -> bool:
+        return self.lock.locked() or (self.task is not None and not self.task.done())
+
+    def summary(self) -> dict:
+        return {
+            "workflow_id": self.workflow_id,
+            "status": self.status,
+            "next": list(self.next_nodes),
+            "last_node": self.last_node,
+            "error": self.error,
+            "idle_seconds": round(self._clock() - self.last_active, 1),
+        }
+
+
+class SessionRegistry:
+    """
+    In-process registry of workflow sessions keyed by workflow id.
+    - Idle sessions that are not running are evicted after `idle_seconds`.
+    - At most `max_sessions` are held; creating one more raises `SessionLimitError`.
+    """
+
+    def __init__(self, max_sessions: int = None, idle_seconds: float = None, clock=time.monotonic):
+        self.max_sessions = max_sessions or MAX_SESSIONS
+        self.idle_seconds = idle_seconds or SESSION_IDLE_SECONDS
+        self._clock = clock
+        self._sessions: Dict[str, WorkflowSession] = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def evict_idle(self) -> list:
+        """Drops idle, non-running sessions; returns their ids."""
+        now = self._clock()
+        expired = [
+            workflow_id for workflow_id, session in self._sessions.items()
+            if not session.busy and now - session.last_active > self.idle_seconds
+        ]
+        for workflow_id in expired:
+            del self._sessions[workflow_id]
+        return expired
+
+    def create(self, workflow_id: str = None) -> WorkflowSession:
+        self.evict_idle()
+        if len(self._sessions) >= self.max_sessions:
+            raise SessionLimitError(f"Session limit reached ({self.max_sessions}); try again later.")
+        workflow_id = workflow_id or uuid.uuid4().hex
+        session = WorkflowSession(workflow_id, clock=self._clock)
+        self._sessions[workflow_id] = session
+        return session
+
+    def get(self, workflow_id: str) -> Optional[WorkflowSession]:
+        self.evict_idle()
+        session = self._sessions.get(workflow_id)
+        if session is not None:
+            session.touch()
+        return session
+
+    def remove(self, workflow_id: str) -> Optional[WorkflowSession]:
+        return self._sessions.pop(workflow_id, None)
+
+
+registry = SessionRegistry()
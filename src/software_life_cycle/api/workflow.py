@@ -1,13 +1,25 @@
 # workflow.py
-from fastapi import APIRouter
+import asyncio
+from typing import Literal, Optional
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 from fastapi.responses import StreamingResponse
-from software_life_cycle.graph.builder import graph
+from software_life_cycle.api.events import (
+    NDJSON_MEDIA_TYPE, SSE_MEDIA_TYPE, WorkflowEvents, encode_ndjson, encode_sse,
+)
+from software_life_cycle.api.sessions import (
+    AWAITING_REVIEW, CANCELLED, COMPLETED, FAILED, PAUSED, RUNNING, SessionLimitError, registry,
+)
+from software_life_cycle.graph.builder import REVIEW_NODES
+from software_life_cycle.graph.runner import astream_workflow, get_async_graph
+from software_life_cycle.jobs.queue import FINISHED, JobQueue
+from software_life_cycle.jobs.worker import ensure_worker_pool
+from software_life_cycle.LLM.rate_limit import scheduler_stats
 from software_life_cycle.state.state import SoftwareLifecycle
-from software_life_cycle.node.user_story import product_routing_cond
+from software_life_cycle.utils.metrics import summarize, thread_metrics
+from software_life_cycle.utils.streaming import is_token_event
 
 router = APIRouter()
-global_state = SoftwareLifecycle()
 
 class WorkflowInput(BaseModel):
     requirements: str
@@ -16,111 +28,355 @@ class WorkflowInput(BaseModel):
     previous_story: str = ""
 
 class FeedbackInput(BaseModel):
+    workflow_id: str
     user_stories_feedback: str
+    requirements: str = ""
+    feedback_iteration: int = 0
+
+class JobInput(BaseModel):
     requirements: str
-    feedback_iteration: int
+    user_stories_feedback: str = ""
+    auto_approve: bool = True
 
-@router.post("/run_ai_workflow/", response_class=StreamingResponse)
-def run_ai_workflow(data: WorkflowInput):
-    global global_state
-    
-    # Initialize or update state with complete context
-    global_state = SoftwareLifecycle(
+class ReviewDecision(BaseModel):
+    decision: Optional[Literal["approve", "reject"]] = None
+    feedback: str = ""
+
+
+def _config(workflow_id: str) -> dict:
+    return {"configurable": {"thread_id": workflow_id}}
+
+
+def _status_from_snapshot(snapshot) -> str:
+    if not snapshot.next:
+        return COMPLETED
+    return AWAITING_REVIEW if set(snapshot.next) <= set(REVIEW_NODES) else PAUSED
+
+
+def _create_session(workflow_id: str = None):
+    try:
+        return registry.create(workflow_id)
+    except SessionLimitError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+
+async def find_session(workflow_id: str):
+    """Registry lookup that falls back to the checkpoint, so any API instance
+    sharing the checkpoint database can serve a workflow."""
+    session = registry.get(workflow_id)
+    if session is not None:
+        return session
+
+    graph = await get_async_graph()
+    snapshot = await graph.aget_state(_config(workflow_id))
+    if not snapshot.values:
+        raise HTTPException(status_code=404, detail=f"Unknown workflow {workflow_id}")
+
+    session = _create_session(workflow_id)
+    session.next_nodes = list(snapshot.next)
+    session.status = _status_from_snapshot(snapshot)
+    return session
+
+
+async def run_session(session, graph_input, events: bool = False):
+    """
+    Streams the session's thread until the next review step or the end of the workflow.
+    - Yields `("updates", {node: values})` per finished node; with `events`, also
+      `("tasks", ...)` when a node starts and `("custom", token_event)` for each LLM token.
+    - Holds the session lock, so one thread never runs twice at the same time.
+    - When the run pauses for review, yields `("review", {"node": ..., ...})` with the artefact to review.
+    """
+    stream_mode = ["tasks", "updates", "custom"] if events else ["updates"]
+    async with session.lock:
+        session.status, session.error, session.cancel_requested = RUNNING, None, False
+        try:
+            async for mode, chunk in astream_workflow(
+                graph_input, session.workflow_id, stream_mode=stream_mode, interrupt_before=REVIEW_NODES
+            ):
+                if session.cancel_requested:
+                    session.status = CANCELLED
+                    return
+                session.touch()
+                if mode == "custom":
+                    if is_token_event(chunk):
+                        yield mode, chunk
+                    continue
+                if mode == "tasks":
+                    yield mode, chunk
+                    continue
+                if "__interrupt__" in chunk:
+                    continue
+                session.last_node = next(iter(chunk))
+                yield mode, chunk
+
+            graph = await get_async_graph()
+            snapshot = await graph.aget_state(_config(session.workflow_id))
+            session.next_nodes = list(snapshot.next)
+            session.status = _status_from_snapshot(snapshot)
+            if session.status == AWAITING_REVIEW:
+                values = snapshot.values
+                yield "review", {
+                    "node": snapshot.next[0],
+                    "user_stories": values.get("user_stories"),
+                    "design_documents": values.get("design_documents"),
+                }
+        except asyncio.CancelledError:
+            session.status = CANCELLED
+            raise
+        except Exception as e:
+            session.status, session.error = FAILED, str(e)
+            raise
+        finally:
+            session.touch()
+
+
+async def drive_session(session, graph_input) -> None:
+    """Background run of a session; progress is read back through `GET /sessions/{id}`."""
+    try:
+        async for mode, chunk in run_session(session, graph_input):
+            if mode == "updates":
+                print(f"🔄 [{session.workflow_id}] {list(chunk.keys())[0]}")
+    except asyncio.CancelledError:
+        print(f"⏹️ Workflow {session.workflow_id} cancelled")
+    except Exception as e:
+        print(f"❌ Workflow {session.workflow_id} failed: {e}")
+
+
+def start_session(session, graph_input) -> None:
+    session.status = RUNNING
+    session.task = asyncio.create_task(drive_session(session, graph_input))
+
+
+async def apply_review(session, review: ReviewDecision) -> None:
+    """Records the reviewer's decision as the paused review node's output,
+    which also evaluates that node's routing."""
+    graph = await get_async_graph()
+    config = _config(session.workflow_id)
+    snapshot = await graph.aget_state(config)
+    node = snapshot.next[0]
+
+    if node == "product_owner_review":
+        update = {"product_owner_decision": review.decision}
+        if review.decision == "reject":
+            update["user_stories_feedback"] = f"reject: {review.feedback}"
+    else:
+        update = {"design_decision": review.decision}
+        if review.decision == "reject":
+            update["design_feedback"] = snapshot.values.get("design_feedback", "") + f"\n[Design Review]: {review.feedback}"
+
+    await graph.aupdate_state(config, update, as_node=node)
+
+
+def _wants_sse(request: Request) -> bool:
+    return SSE_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _event_response(events: WorkflowEvents, chunks, sse: bool, summary=None) -> StreamingResponse:
+    """
+    Streams workflow events (see `api/events.py`) as NDJSON, or as server-sent events for
+    `Accept: text/event-stream` clients. `summary()` supplies the final status event.
+    """
+    encode = encode_sse if sse else encode_ndjson
+
+    async def event_generator():
+        try:
+            yield encode(events.snapshot())
+            async for mode, chunk in chunks:
+                for event in events.from_chunk(mode, chunk):
+                    yield encode(event)
+            if summary is not None:
+                yield encode(events.status(summary()))
+        except Exception as e:
+            print(f"❌ Error in workflow {events.workflow_id}: {e}")
+            yield encode(events.error(str(e)))
+
+    return StreamingResponse(
+        event_generator(),
+        media_type=SSE_MEDIA_TYPE if sse else NDJSON_MEDIA_TYPE,
+        headers={"X-Workflow-Id": events.workflow_id, "Cache-Control": "no-cache"},
+    )
+
+
+async def _stream_response(request: Request, session, graph_input) -> StreamingResponse:
+    """Runs the session, streaming its events; the first is a snapshot of the last checkpoint."""
+    graph = await get_async_graph()
+    snapshot = await graph.aget_state(_config(session.workflow_id))
+    events = WorkflowEvents(session.workflow_id, snapshot.values)
+    return _event_response(
+        events, run_session(session, graph_input, events=True), _wants_sse(request), summary=session.summary
+    )
+
+
+def _initial_state(data: WorkflowInput) -> SoftwareLifecycle:
+    return SoftwareLifecycle(
         requirements=data.requirements,
         user_stories_feedback=data.user_stories_feedback,
-        feedback_iteration=data.feedback_iteration,
         user_stories=data.previous_story  # Preserve previous story
     )
-    print(f"Initializing workflow with feedback: {global_state.user_stories_feedback}")
-    
-    config = {"configurable": {"thread_id": "1"}}
 
-    def stream_generator():
-        global global_state
-        try:
-            for chunk in graph.stream(global_state, config):
-                print("🔁 CHUNK:", chunk)
-                key = list(chunk.keys())[0]
-                
-                # Enhanced state preservation
-                new_state = chunk[key]
-                new_state.update({
-                    "user_stories_feedback": global_state.user_stories_feedback,
-                    "feedback_iteration": global_state.feedback_iteration,
-                    "previous_feedback": global_state.user_stories_feedback,
-                })
-                
-                # Update global state
-                global_state = global_state.model_copy(update=new_state)
-                print(f"State after update - Feedback: {global_state.user_stories_feedback}")
-                print(f"Current iteration: {global_state.feedback_iteration}")
-                
-                yield f"{chunk}\n"
-
-                if key == "product_owner_review":
-                    break
 
-        except Exception as e:
-            print(f"Error in workflow: {e}")
-            yield f"ERROR:: {str(e)}"
+@router.post("/run_ai_workflow/", response_class=StreamingResponse)
+async def run_ai_workflow(data: WorkflowInput, request: Request):
+    """Starts a new workflow and streams it up to the user story review.
+    The workflow id comes back in the X-Workflow-Id header."""
+    session = _create_session()
+    print(f"Initializing workflow {session.workflow_id} with feedback: {data.user_stories_feedback}")
+    return await _stream_response(request, session, _initial_state(data))
 
-    return StreamingResponse(stream_generator(), media_type="text/plain")
 
 @router.post("/send_feedback/", response_class=StreamingResponse)
-def send_feedback(data: FeedbackInput):
-    global global_state
-    
-    # Store feedback before stream starts
+async def send_feedback(data: FeedbackInput, request: Request):
+    """Applies product owner feedback ("reject: ..." or an approval) and streams the next leg."""
+    session = await find_session(data.workflow_id)
+    if session.busy:
+        raise HTTPException(status_code=409, detail=f"Workflow {data.workflow_id} is already running")
+    if session.status != AWAITING_REVIEW:
+        raise HTTPException(status_code=409, detail=f"Workflow {data.workflow_id} is not waiting for review")
+
     feedback = data.user_stories_feedback
-    iteration = data.feedback_iteration
-    
-    # Create new state with feedback
-    global_state = SoftwareLifecycle(
-        requirements=data.requirements,
-        user_stories=global_state.user_stories,
-        user_stories_feedback=feedback,
-        feedback_iteration=iteration,
-        previous_feedback=global_state.user_stories_feedback
-    )
-    
-    print(f"💬 New feedback received: {feedback}")
-    print(f"📝 Previous story: {global_state.user_stories}")
-    print(f"🔢 Iteration: {iteration}")
+    print(f"💬 [{data.workflow_id}] New feedback received: {feedback}")
+    if "reject:" in feedback:
+        review = ReviewDecision(decision="reject", feedback=feedback.replace("reject:", "").strip())
+    else:
+        review = ReviewDecision(decision="approve")
 
-    next_node = product_routing_cond(global_state)
-    config = {"configurable": {"thread_id": "1"}}
+    await apply_review(session, review)
+    return await _stream_response(request, session, None)
 
-    def stream_generator():
-        global global_state
-        try:
-            for chunk in graph.stream(global_state, config, start_at=next_node):
-                print(f"🔄 Processing chunk: {chunk}")
-                key = list(chunk.keys())[0]
-                
-                # Get new state from chunk
-                new_state = chunk[key]
-                
-                # CRITICAL: Preserve feedback in every state update
-                preserved_state = {
-                    "user_stories_feedback": feedback,
-                    "feedback_iteration": iteration,
-                    "previous_feedback": global_state.previous_feedback,
-                    "requires_review": True
-                }
-                
-                # Update chunk state with preserved feedback
-                new_state.update(preserved_state)
-                
-                # Update global state
-                global_state = SoftwareLifecycle(**new_state)
-                print(f"✨ Updated state - Feedback: {global_state.user_stories_feedback}")
-                
-                yield f"{chunk}\n"
 
-        except Exception as e:
-            print(f"❌ Error in feedback stream: {e}")
-            yield f"ERROR:: {str(e)}"
-            return
+@router.post("/resume_workflow/{thread_id}", response_class=StreamingResponse)
+async def resume_workflow(thread_id: str, request: Request):
+    """Continue a checkpointed thread from its last completed node, up to the next review step.
+    Review decisions go through `/send_feedback/` or `/sessions/{id}/resume`."""
+    session = await find_session(thread_id)
+    if session.busy:
+        raise HTTPException(status_code=409, detail=f"Workflow {thread_id} is already running")
+    if session.status == COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Workflow {thread_id} has already completed")
+    if session.status == AWAITING_REVIEW:
+        raise HTTPException(status_code=409, detail=f"Workflow {thread_id} is waiting for review; send a decision")
+
+    print(f"⏯️ Resuming thread {thread_id} at: {session.next_nodes}")
+    return await _stream_response(request, session, None)
+
+
+# --- Session endpoints: run in the background, poll for progress ---
+
+@router.post("/sessions")
+async def create_session(data: WorkflowInput):
+    """Starts a workflow in the background and returns its id."""
+    session = _create_session()
+    start_session(session, _initial_state(data))
+    return session.summary()
+
+
+@router.get("/sessions/{workflow_id}")
+async def get_session(workflow_id: str, include_state: bool = False):
+    """Status of a workflow; with `include_state`, also its latest checkpointed state."""
+    session = await find_session(workflow_id)
+    result = session.summary()
+    if include_state:
+        graph = await get_async_graph()
+        result["state"] = (await graph.aget_state(_config(workflow_id))).values
+    return result
+
+
+@router.get("/sessions/{workflow_id}/metrics")
+async def get_session_metrics(workflow_id: str):
+    """Time, LLM calls, tokens, cache hits, retries and cost of each node run, plus per-node totals."""
+    await find_session(workflow_id)
+    nodes = thread_metrics(workflow_id)
+    return {"nodes": nodes, "summary": summarize(nodes)}
+
+
+@router.post("/sessions/{workflow_id}/resume")
+async def resume_session(workflow_id: str, review: Optional[ReviewDecision] = None):
+    """Continues a paused workflow; at a review step the decision is required."""
+    session = await find_session(workflow_id)
+    if session.busy:
+        raise HTTPException(status_code=409, detail=f"Workflow {workflow_id} is already running")
+    if session.status == COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Workflow {workflow_id} has already completed")
+    if session.status == AWAITING_REVIEW:
+        if review is None or review.decision is None:
+            raise HTTPException(status_code=400, detail=f"Workflow {workflow_id} is waiting for review; send a decision")
+        await apply_review(session, review)
+
+    start_session(session, None)
+    return session.summary()
+
+
+@router.delete("/sessions/{workflow_id}")
+async def cancel_session(workflow_id: str):
+    """Stops a workflow and releases its slot; the checkpoint is kept for a later resume."""
+    session = registry.get(workflow_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Unknown workflow {workflow_id}")
+    session.cancel()
+    registry.remove(workflow_id)
+    return session.summary()
+
+
+# --- Job endpoints: queued runs executed by the worker pool ---
+
+_job_queue = None
+
+
+def get_job_queue() -> JobQueue:
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue()
+    return _job_queue
+
+
+def _job_status(job: dict) -> dict:
+    return {key: value for key, value in job.items() if key not in ("payload", "result")}
+
+
+@router.post("/jobs")
+async def submit_job(data: JobInput):
+    """Queues a workflow run and returns immediately with its job id."""
+    ensure_worker_pool()
+    job_id = get_job_queue().submit(data.model_dump())
+    return _job_status(get_job_queue().get(job_id))
+
+
+@router.get("/jobs")
+async def job_counts():
+    """Number of jobs per status (the queue depth is the `queued` count)."""
+    return get_job_queue().counts()
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status of a job, including the node it last finished and every node completed so far."""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return _job_status(job)
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Final state fields of a finished job."""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    if job["status"] not in FINISHED:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job['status']}")
+    return {"job_id": job_id, "status": job["status"], "error": job["error"], "result": job["result"]}
+
+
+@router.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancels a queued job, or stops a running one after its current node."""
+    job = get_job_queue().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return _job_status(job)
 
-    return StreamingResponse(stream_generator(), media_type="text/plain")
 
+@router.get("/rate_limits")
+async def rate_limits():
+    """Per-model request scheduling metrics: calls, 429s, queue depth and time spent waiting."""
+    return scheduler_stats()
@@ -0,0 +1,110 @@
+import os
+import tempfile
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from typing import Optional
+from langgraph.checkpoint.memory import MemorySaver
+from software_life_cycle.bench.scenarios import SCENARIOS, scenario_script
+from software_life_cycle.graph.builder import builder
+from software_life_cycle.LLM.fake import fake_client
+from software_life_cycle.LLM.llm import MODELS, set_llm
+from software_life_cycle.LLM.replay import TraceRecorder, replay_client
+from software_life_cycle.state.state import SoftwareLifecycle
+from software_life_cycle.utils.metrics import LLMMetrics, summarize, thread_metrics
+
+
+@contextmanager
+def _isolated(clients: dict):
+    """
+    `clients` (by MODELS key) in place of the shared ones, no QA cache, and a scratch working
+    directory for the files the workflow saves; everything is restored afterwards.
+    """
+    saved_cache = os.environ.get("SDLC_QA_CACHE")
+    saved_cwd = os.getcwd()
+    os.environ["SDLC_QA_CACHE"] = "0"
+    for name, client in clients.items():
+        set_llm(name, client)
+    with tempfile.TemporaryDirectory(prefix="sdlc-bench-") as scratch:
+        os.chdir(scratch)
+        try:
+            yield
+        finally:
+            os.chdir(saved_cwd)
+            for name in clients:
+                set_llm(name, None)
+            if saved_cache is None:
+                os.environ.pop("SDLC_QA_CACHE", None)
+            else:
+                os.environ["SDLC_QA_CACHE"] = saved_cache
+
+
+def _callbacks(model: str, record: Optional[str]) -> list:
+    return [LLMMetrics(model)] + ([TraceRecorder(model, os.path.abspath(record))] if record else [])
+
+
+def _run(label: str, requirements: str, clients: dict) -> dict:
+    """
+    Runs the whole graph with `clients` and returns its report: wall time, peak memory,
+    responses served, final QA result, the error that stopped the run (if any) and the per-node
+    summary (time, LLM calls, tokens, peak memory; see `utils/metrics.summarize`).
+    """
+    thread_id = f"bench-{label}-{uuid.uuid4().hex[:8]}"
+    config = {"configurable": {"thread_id": thread_id}, "recursion_limit": 100}
+    # Both human reviews approve up front so the run needs no input
+    state = SoftwareLifecycle(requirements=requirements, product_owner_decision="approve", design_decision="approve")
+
+    with _isolated(clients):
+        graph = builder.compile(checkpointer=MemorySaver())
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        started = time.perf_counter()
+        error = None
+        try:
+            for _ in graph.stream(state, config, stream_mode="updates"):
+                pass
+        except Exception as e:
+            error = str(e)
+        finally:
+            wall = time.perf_counter() - started
+            peak_kb = tracemalloc.get_traced_memory()[1] // 1024
+            if not tracing:
+                tracemalloc.stop()
+        final = graph.get_state(config).values
+
+    return {
+        "scenario": label,
+        "wall_seconds": round(wall, 3),
+        "peak_kb": peak_kb,
+        "served_calls": sum(client.calls() for client in clients.values()),
+        "qa_test_result": final.get("qa_test_result"),
+        "error": error,
+        "nodes": summarize(thread_metrics(thread_id)),
+    }
+
+
+def run_scenario(name: str, latency: str = "", seed: int = 0, record: Optional[str] = None) -> dict:
+    """Report of a scenario run against scripted LLMs; `record` also writes its LLM traffic to that trace."""
+    scenario = SCENARIOS[name]
+    script = {**scenario_script(**scenario), "latency": latency, "seed": seed}
+    clients = {key: fake_client(model, script, callbacks=_callbacks(model, record)) for key, model in MODELS.items()}
+    return {**_run(name, scenario["requirements"], clients), "latency": latency}
+
+
+def run_replay(trace: str, requirements: str, latency: str = "zero") -> dict:
+    """
+    Report of a run answered from a recorded trace (see `LLM/replay.py`). `requirements` must be
+    those of the recorded run, and that run must have approved both reviews without feedback.
+    """
+    trace = os.path.abspath(trace)
+    clients = {key: replay_client(model, trace, latency, callbacks=[LLMMetrics(model)]) for key, model in MODELS.items()}
+    report = _run("replay", requirements, clients)
+    return {**report, "latency": latency, "trace": trace, "misses": sum(client.misses() for client in clients.values())}
+
+
+def run_benchmarks(names=None, latency: str = "", seed: int = 0) -> list:
+    """Reports for the named scenarios (all of them by default), run one after another."""
+    return [run_scenario(name, latency, seed) for name in (names or list(SCENARIOS))]
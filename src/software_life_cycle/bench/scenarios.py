@@ -0,0 +1,79 @@
+import json
+
+ROLES = [
+    "Backend Developer", "Frontend Developer", "Database Engineer", "API Developer",
+    "AI Engineer", "Data Engineer", "Mobile Developer", "Integration Engineer",
+]
+
+# Benchmark scenarios: how many roles the design asks for, the size of each role's module,
+# and how many rounds the syntax check, code review and test review send back
+SCENARIOS = {
+    "small": {
+        "requirements": "A to-do list app where users can add, complete and delete tasks.",
+        "roles": 2, "functions": 5, "syntax_rounds": 0, "code_revisions": 0, "test_revisions": 0,
+    },
+    "eight_roles": {
+        "requirements": "An e-commerce platform with catalog, cart, checkout, payments, search, "
+                        "recommendations, a mobile app and partner integrations.",
+        "roles": 8, "functions": 20, "syntax_rounds": 0, "code_revisions": 0, "test_revisions": 0,
+    },
+    "revisions": {
+        "requirements": "A library management system for loans, reservations and fines.",
+        "roles": 3, "functions": 10, "syntax_rounds": 1, "code_revisions": 2, "test_revisions": 1,
+    },
+}
+
+
+def _module(functions: int) -> str:
+    body = "\n\n\n".join(
+        f"def compute_{i}(value: int) -> int:\n"
+        f"    \"\"\"Step {i} of the pipeline.\"\"\"\n"
+        f"    if value < 0:\n"
+        f"        raise ValueError(\"value must be positive\")\n"
+        f"    return value * {i + 1} + {i}"
+        for i in range(functions)
+    )
+    return f"Implementation:\n\n```python\n{body}\n```\n"
+
+
+BROKEN_CODE = "Implementation:\n\n```python\ndef compute(value)\n    return value\n```\n"
+
+TEST_CASES = (
+    "### Structured Unit Test Code:\n\n```python\nimport pytest\n\n\n"
+    "def test_addition():\n    assert 1 + 1 == 2\n\n\n"
+    "def test_division_by_zero():\n    with pytest.raises(ZeroDivisionError):\n        1 / 0\n```\n"
+)
+
+
+def _verdict(decision: str, role: str = "") -> str:
+    issues = [{"severity": "medium", "role": role, "description": "Missing input validation", "fix": "Validate inputs"}] \
+        if role else []
+    return json.dumps({"decision": decision, "summary": f"Benchmark verdict: {decision}", "issues": issues})
+
+
+def scenario_script(roles: int, functions: int, syntax_rounds: int, code_revisions: int, test_revisions: int,
+                    **_) -> dict:
+    """
+    Fake LLM script (see `LLM/fake.py`) that drives the whole graph to the end.
+    Rules match each node's system prompt; review rules reject the first rounds, then approve.
+    """
+    names = ROLES[:roles]
+    return {"rules": [
+        {"match": r"expert Agile coach", "responses": [
+            "As a user, I want to manage my items so that I stay organised.\n"
+            "Acceptance criteria:\n- Items can be created, updated and deleted\n- Invalid input shows an error"
+        ]},
+        {"match": r"creating clear, structured design documents", "responses": [
+            "# Design\n\n## Architecture\n" + "\n".join(f"- {name}: owns one service module" for name in names)
+        ]},
+        {"match": r"identify ONLY software development roles", "responses": ["\n".join(names)]},
+        {"match": r"engineer\. Generate optimized and structured code", "responses":
+            [BROKEN_CODE] * (roles * syntax_rounds) + [_module(functions)]},
+        {"match": r"expert software reviewer", "responses":
+            [_verdict("revise", names[0])] * code_revisions + [_verdict("approve")]},
+        {"match": r"cybersecurity expert", "responses": [_verdict("secure")]},
+        {"match": r"create structured unit test cases", "responses": [TEST_CASES]},
+        {"match": r"review the generated test cases", "responses":
+            [_verdict("revise")] * test_revisions + [_verdict("approve")]},
+        {"match": r"senior QA engineer running test suites", "responses": [_verdict("pass")]},
+    ]}
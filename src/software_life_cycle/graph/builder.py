@@ -1,30 +1,46 @@
 from langgraph.graph import START, StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
-from IPython.display import display, Image
+from functools import lru_cache
+from langchain_core.runnables import RunnableLambda
 from software_life_cycle.state.state import SoftwareLifecycle
-from software_life_cycle.node.user_story import input_requirements, auto_gen_us, product_owner_review, product_routing_cond
-from software_life_cycle.node.design_doc import create_design_doc, design_review, design_route
-from software_life_cycle.node.coder import orchestrate_code_generation, collect_code_results
-from software_life_cycle.node.code_review import code_review, code_route
-from software_life_cycle.node.code_security import code_security_review, security_route
-from software_life_cycle.node.test_case import generate_test_cases, review_test_cases, test_case_review_route
-from software_life_cycle.node.qa import qa_testing, qa_test_route
+from software_life_cycle.graph.checkpointer import build_checkpointer
+from software_life_cycle.utils.metrics import traced
+from software_life_cycle.node.user_story import input_requirements, auto_gen_us, aauto_gen_us, product_owner_review, product_routing_cond
+from software_life_cycle.node.design_doc import create_design_doc, acreate_design_doc, design_review, design_route
+from software_life_cycle.node.coder import orchestrate_code_generation, aorchestrate_code_generation, collect_code_results, acollect_code_results
+from software_life_cycle.node.code_review import validate_code, syntax_route, code_review, acode_review, code_route
+from software_life_cycle.node.code_security import code_security_review, acode_security_review, security_route
+from software_life_cycle.node.test_case import generate_test_cases, agenerate_test_cases, review_test_cases, areview_test_cases, test_case_review_route
+from software_life_cycle.node.qa import qa_testing, aqa_testing, qa_test_route
 import time
 
+
+def node(name, func, afunc=None):
+    """
+    Wraps a node's sync and async variants so the same graph serves `stream` and `astream`.
+    Every run is timed and its LLM usage recorded (see `utils/metrics.py`).
+    """
+    func, afunc = traced(name, func, afunc)
+    return RunnableLambda(func, afunc=afunc, name=name)
+
+
+# Human review steps; unattended runs (API, job workers) pause before them
+REVIEW_NODES = ["product_owner_review", "design_review"]
+
 builder = StateGraph(SoftwareLifecycle)
 
-builder.add_node("input_requirements", input_requirements)
-builder.add_node("auto_gen_us", auto_gen_us)
-builder.add_node("product_owner_review", product_owner_review)
-builder.add_node("create_design_doc", create_design_doc)
-builder.add_node("design_review", design_review)
-builder.add_node("orchestrate_code_generation", orchestrate_code_generation)
-builder.add_node("collect_code_results", collect_code_results)
-builder.add_node("code_review", code_review)
-builder.add_node("code_security_review", code_security_review)
-builder.add_node("generate_test_cases", generate_test_cases)
-builder.add_node("review_test_cases", review_test_cases)
-builder.add_node("qa_testing", qa_testing)
+builder.add_node("input_requirements", node("input_requirements", input_requirements))
+builder.add_node("auto_gen_us", node("auto_gen_us", auto_gen_us, aauto_gen_us))
+builder.add_node("product_owner_review", node("product_owner_review", product_owner_review))
+builder.add_node("create_design_doc", node("create_design_doc", create_design_doc, acreate_design_doc))
+builder.add_node("design_review", node("design_review", design_review))
+builder.add_node("orchestrate_code_generation", node("orchestrate_code_generation", orchestrate_code_generation, aorchestrate_code_generation))
+builder.add_node("collect_code_results", node("collect_code_results", collect_code_results, acollect_code_results))
+builder.add_node("validate_code", node("validate_code", validate_code))
+builder.add_node("code_review", node("code_review", code_review, acode_review))
+builder.add_node("code_security_review", node("code_security_review", code_security_review, acode_security_review))
+builder.add_node("generate_test_cases", node("generate_test_cases", generate_test_cases, agenerate_test_cases))
+builder.add_node("review_test_cases", node("review_test_cases", review_test_cases, areview_test_cases))
+builder.add_node("qa_testing", node("qa_testing", qa_testing, aqa_testing))
 
 
 # --- Existing Edges ---
@@ -48,7 +64,12 @@ builder.add_conditional_edges(
 
 
 builder.add_edge("orchestrate_code_generation", "collect_code_results")  
-builder.add_edge("collect_code_results", "code_review")  
+builder.add_edge("collect_code_results", "validate_code")
+builder.add_conditional_edges(
+    "validate_code",
+    syntax_route,
+    {"code_review": "code_review", "orchestrate_code_generation": "orchestrate_code_generation"}
+)
 builder.add_conditional_edges(
     "code_review",
     code_route,
@@ -71,15 +92,12 @@ builder.add_conditional_edges(
     {END: END, "generate_test_cases": "orchestrate_code_generation"}
 )
 
-print(" LangGraph Workflow Initializing ")
-
-try:
-    memory = MemorySaver()
-    graph = builder.compile(checkpointer=memory)
-    #display(Image(graph.get_graph().draw_mermaid_png()))
-    
-
-
 
-except Exception as e:
-    print("Error Compiling Graph:", str(e))
\ No newline at end of file
+@lru_cache(maxsize=None)
+def get_graph():
+    """The workflow compiled with the configured checkpointer, built on first use."""
+    print(" LangGraph Workflow Initializing ")
+    graph = builder.compile(checkpointer=build_checkpointer())
+    # from IPython.display import display, Image
+    # display(Image(graph.get_graph().draw_mermaid_png()))
+    return graph
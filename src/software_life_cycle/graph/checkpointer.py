@@ -0,0 +1,139 @@
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+# State models nested inside checkpoints that the serializer may rebuild
+CHECKPOINT_SERDE = JsonPlusSerializer(
+    allowed_msgpack_modules=[
+        ("software_life_cycle.state.state", "FeedbackEntry"),
+        ("software_life_cycle.state.state", "QACaseResult"),
+    ]
+)
+
+
+def _checkpoint_path() -> str:
+    path = os.getenv("SDLC_CHECKPOINT_DB", os.path.join(".cache", "checkpoints.sqlite"))
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return path
+
+
+def build_checkpointer():
+    """
+    Creates the checkpointer the graph is compiled with.
+    - SDLC_CHECKPOINTER=sqlite (default): checkpoints persist in SDLC_CHECKPOINT_DB,
+      so an interrupted thread can be resumed after a crash or restart.
+    - SDLC_CHECKPOINTER=memory: the previous in-process MemorySaver.
+    """
+    backend = os.getenv("SDLC_CHECKPOINTER", "sqlite").strip().lower()
+    if backend == "memory":
+        return MemorySaver(serde=CHECKPOINT_SERDE)
+
+    saver = SqliteSaver(sqlite3.connect(_checkpoint_path(), check_same_thread=False), serde=CHECKPOINT_SERDE)
+    saver.setup()
+    return saver
+
+
+async def build_async_checkpointer():
+    """
+    Async counterpart of `build_checkpointer` for `astream`, using the same backend
+    and database file, so threads started synchronously can be resumed asynchronously.
+    Must be awaited inside the event loop the graph will run on.
+    """
+    backend = os.getenv("SDLC_CHECKPOINTER", "sqlite").strip().lower()
+    if backend == "memory":
+        return MemorySaver(serde=CHECKPOINT_SERDE)
+
+    import aiosqlite
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+    saver = AsyncSqliteSaver(await aiosqlite.connect(_checkpoint_path()), serde=CHECKPOINT_SERDE)
+    await saver.setup()
+    return saver
+
+
+def prune_checkpoints(saver, max_age_days: float = None, keep_history: bool = None, exclude=()) -> dict:
+    """
+    Applies the retention policy to a SQLite checkpointer.
+    - Threads whose last checkpoint is older than `max_age_days`
+      (SDLC_CHECKPOINT_MAX_AGE_DAYS, default 7) are deleted.
+    - Unless `keep_history` (SDLC_CHECKPOINT_KEEP_HISTORY=1), other threads keep
+      only their latest checkpoint, which is all a resume needs.
+    Threads in `exclude` (e.g. the one currently running) are left untouched.
+    Never run on start-up: other processes may be running or resuming threads in the
+    same database. See `prune_inactive_checkpoints` and the `prune` CLI command.
+    """
+    if not isinstance(saver, SqliteSaver):
+        return {"deleted": 0, "compacted": 0}
+
+    if max_age_days is None:
+        max_age_days = float(os.getenv("SDLC_CHECKPOINT_MAX_AGE_DAYS", "7"))
+    if keep_history is None:
+        keep_history = os.getenv("SDLC_CHECKPOINT_KEEP_HISTORY", "0") == "1"
+
+    with saver.cursor(transaction=False) as cur:
+        thread_ids = [row[0] for row in cur.execute("SELECT DISTINCT thread_id FROM checkpoints").fetchall()]
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+    expired, active = [], []
+    for thread_id in thread_ids:
+        if thread_id in exclude:
+            continue
+        latest = saver.get_tuple({"configurable": {"thread_id": thread_id}})
+        if latest is None:
+            continue
+        if datetime.fromisoformat(latest.checkpoint["ts"]) < cutoff:
+            expired.append(thread_id)
+        else:
+            active.append(thread_id)
+
+    for thread_id in expired:
+        saver.delete_thread(thread_id)
+    if not keep_history:
+        for thread_id in active:
+            _keep_latest_checkpoint(saver, thread_id)
+
+    return {"deleted": len(expired), "compacted": 0 if keep_history else len(active)}
+
+
+def _keep_latest_checkpoint(saver, thread_id: str) -> None:
+    """Deletes every checkpoint of a thread but the newest one per namespace,
+    along with the pending writes that belonged to the deleted checkpoints."""
+    with saver.cursor() as cur:
+        cur.execute(
+            "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_id < ("
+            " SELECT MAX(latest.checkpoint_id) FROM checkpoints AS latest"
+            " WHERE latest.thread_id = checkpoints.thread_id AND latest.checkpoint_ns = checkpoints.checkpoint_ns)",
+            (thread_id,),
+        )
+        cur.execute(
+            "DELETE FROM writes WHERE thread_id = ? AND NOT EXISTS ("
+            " SELECT 1 FROM checkpoints AS kept WHERE kept.thread_id = writes.thread_id"
+            " AND kept.checkpoint_ns = writes.checkpoint_ns AND kept.checkpoint_id = writes.checkpoint_id)",
+            (thread_id,),
+        )
+
+
+def list_threads(saver) -> list:
+    """Thread ids that have at least one checkpoint, most recent first (SQLite only)."""
+    if not isinstance(saver, SqliteSaver):
+        return []
+    with saver.cursor(transaction=False) as cur:
+        rows = cur.execute(
+            "SELECT thread_id, MAX(checkpoint_id) AS last FROM checkpoints GROUP BY thread_id ORDER BY last DESC"
+        ).fetchall()
+    return [row[0] for row in rows]
+
+
+def prune_inactive_checkpoints(saver, max_age_days: float = None, keep_history: bool = None, job_db: str = None) -> dict:
+    """`prune_checkpoints`, skipping the threads of queued, running or paused jobs (`skipped` counts them)."""
+    from software_life_cycle.jobs.queue import JobQueue, default_job_db
+
+    job_db = job_db or default_job_db()
+    active = JobQueue(job_db).active_ids() if os.path.exists(job_db) else []
+    result = prune_checkpoints(saver, max_age_days, keep_history, exclude=set(active))
+    return {**result, "skipped": len(active)}
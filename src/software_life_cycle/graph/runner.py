@@ -0,0 +1,37 @@
+import asyncio
+import weakref
+from software_life_cycle.graph.builder import builder
+from software_life_cycle.graph.checkpointer import build_async_checkpointer
+
+# Compiled async graphs, one per event loop: the aiosqlite connection is bound to its loop
+_async_graphs = weakref.WeakKeyDictionary()
+
+
+async def get_async_graph():
+    """Compiles the workflow with the async checkpointer, once per running event loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in _async_graphs:
+        checkpointer = await build_async_checkpointer()
+        _async_graphs[loop] = builder.compile(checkpointer=checkpointer)
+    return _async_graphs[loop]
+
+
+async def astream_workflow(graph_input, thread_id: str, stream_mode: str = "updates", **kwargs):
+    """
+    Runs (or, with `graph_input=None`, resumes) a thread with `astream`.
+    - Yields the same per-node chunks as `graph.stream`.
+    - LLM calls inside a node are awaited, so one process can drive many threads concurrently.
+    """
+    graph = await get_async_graph()
+    config = {"configurable": {"thread_id": thread_id}}
+    async for chunk in graph.astream(graph_input, config, stream_mode=stream_mode, **kwargs):
+        yield chunk
+
+
+async def close_async_graph() -> None:
+    """Closes the current loop's checkpoint connection (call on application shutdown;
+    the aiosqlite worker thread otherwise keeps the process alive)."""
+    graph = _async_graphs.pop(asyncio.get_running_loop(), None)
+    conn = getattr(graph.checkpointer, "conn", None) if graph is not None else None
+    if conn is not None:
+        await conn.close()
@@ -0,0 +1,141 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Optional
+
+# Job statuses
+QUEUED, RUNNING, AWAITING_REVIEW, COMPLETED, FAILED, CANCELLED = (
+    "queued", "running", "awaiting_review", "completed", "failed", "cancelled"
+)
+FINISHED = (AWAITING_REVIEW, COMPLETED, FAILED, CANCELLED)
+
+
+def default_job_db() -> str:
+    return os.getenv("SDLC_JOB_DB", os.path.join(".cache", "jobs.sqlite"))
+
+
+class JobQueue:
+    """
+    SQLite-backed workflow job queue shared by the API and the worker processes.
+    - `submit` enqueues a payload; workers `claim` the oldest queued job atomically.
+    - Workers report the node they just finished through `progress`, and the
+      final state through `finish`, so status and results outlive the request.
+    Each process opens its own connection to the same database file.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or default_job_db()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " current_node TEXT,"
+            " nodes_completed TEXT NOT NULL DEFAULT '[]',"
+            " result TEXT,"
+            " error TEXT,"
+            " worker TEXT,"
+            " cancel_requested INTEGER NOT NULL DEFAULT 0,"
+            " created_at REAL NOT NULL,"
+            " started_at REAL,"
+            " finished_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_queued ON jobs (status, created_at)")
+        self._conn.commit()
+
+    def _execute(self, sql: str, params=()) -> list:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+            self._conn.commit()
+            return rows
+
+    def submit(self, payload: dict, job_id: str = None) -> str:
+        job_id = job_id or uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (id, status, payload, created_at) VALUES (?, ?, ?, ?)",
+            (job_id, QUEUED, json.dumps(payload), time.time()),
+        )
+        return job_id
+
+    def claim(self, worker: str) -> Optional[dict]:
+        """Marks the oldest queued job as running for `worker` and returns it, or None."""
+        rows = self._execute(
+            "UPDATE jobs SET status = ?, worker = ?, started_at = ?"
+            " WHERE id = (SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1)"
+            " RETURNING *",
+            (RUNNING, worker, time.time(), QUEUED),
+        )
+        return self._to_dict(rows[0]) if rows else None
+
+    def progress(self, job_id: str, node: str) -> None:
+        self._execute(
+            "UPDATE jobs SET current_node = ?, nodes_completed = json_insert(nodes_completed, '$[#]', ?) WHERE id = ?",
+            (node, node, job_id),
+        )
+
+    def finish(self, job_id: str, status: str, result: dict = None, error: str = None) -> None:
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+            (status, json.dumps(result) if result is not None else None, error, time.time(), job_id),
+        )
+
+    def cancel(self, job_id: str) -> Optional[dict]:
+        """Cancels a queued job outright; a running job stops after its current node."""
+        self._execute(
+            "UPDATE jobs SET status = CASE WHEN status = ? THEN ? ELSE status END,"
+            " cancel_requested = 1 WHERE id = ?",
+            (QUEUED, CANCELLED, job_id),
+        )
+        return self.get(job_id)
+
+    def cancel_requested(self, job_id: str) -> bool:
+        rows = self._execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,))
+        return bool(rows and rows[0][0])
+
+    def requeue_orphans(self, is_alive) -> int:
+        """
+        Puts jobs left `running` by workers that died (`is_alive(worker)` is False) back in the queue.
+        Their progress is cleared: the next run resumes from the checkpoint and reports the nodes it runs.
+        """
+        rows = self._execute("SELECT id, worker FROM jobs WHERE status = ?", (RUNNING,))
+        orphans = [row["id"] for row in rows if not is_alive(row["worker"])]
+        for job_id in orphans:
+            self._execute(
+                "UPDATE jobs SET status = ?, worker = NULL, started_at = NULL, current_node = NULL,"
+                " nodes_completed = '[]' WHERE id = ? AND status = ?",
+                (QUEUED, job_id, RUNNING),
+            )
+        return len(orphans)
+
+    def active_ids(self) -> list:
+        """Ids (and so checkpoint threads) of jobs that are queued, running or paused for review."""
+        rows = self._execute("SELECT id FROM jobs WHERE status IN (?, ?, ?)", (QUEUED, RUNNING, AWAITING_REVIEW))
+        return [row["id"] for row in rows]
+
+    def get(self, job_id: str) -> Optional[dict]:
+        rows = self._execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return self._to_dict(rows[0]) if rows else None
+
+    def counts(self) -> dict:
+        rows = self._execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+        return {status: count for status, count in rows}
+
+    @staticmethod
+    def _to_dict(row) -> dict:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["nodes_completed"] = json.loads(job["nodes_completed"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
@@ -0,0 +1,153 @@
+import multiprocessing
+import os
+import socket
+import time
+from software_life_cycle.jobs.queue import (
+    AWAITING_REVIEW, CANCELLED, COMPLETED, FAILED, JobQueue, default_job_db,
+)
+from software_life_cycle.state.state import SoftwareLifecycle
+
+# Worker processes the API starts on the first job submission (0: run `main.py workers` separately)
+JOB_WORKERS = max(0, int(os.getenv("SDLC_JOB_WORKERS", "2")))
+# How long an idle worker waits before polling the queue again
+JOB_POLL_SECONDS = float(os.getenv("SDLC_JOB_POLL_SECONDS", "1.0"))
+
+# State fields stored as the job's result
+RESULT_FIELDS = (
+    "user_stories", "design_documents", "generated_code", "test_cases",
+    "qa_test_result", "code_review_feedback", "security_feedback", "feedback",
+)
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def worker_alive(worker: str) -> bool:
+    """Whether the process behind a worker name still exists (workers on other hosts are assumed alive)."""
+    host, _, pid = (worker or "").rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def job_input(payload: dict) -> SoftwareLifecycle:
+    """Initial state for a job; with `auto_approve` the review steps approve themselves."""
+    decision = "approve" if payload.get("auto_approve", True) else ""
+    return SoftwareLifecycle(
+        requirements=payload["requirements"],
+        user_stories_feedback=payload.get("user_stories_feedback", ""),
+        product_owner_decision=decision,
+        design_decision=decision,
+    )
+
+
+def run_job(queue: JobQueue, job: dict, graph) -> str:
+    """
+    Runs one job on the job id's checkpoint thread and records the outcome.
+    - Each finished node is reported as progress; a cancel request is honoured between nodes.
+    - Without `auto_approve`, the job stops at the first review step as `awaiting_review`;
+      it can be continued through the session endpoints, which share the checkpoint.
+    - A requeued job whose thread already has a checkpoint resumes from it instead of starting over.
+    """
+    from software_life_cycle.graph.builder import REVIEW_NODES
+
+    job_id = job["id"]
+    config = {"configurable": {"thread_id": job_id}}
+    interrupt_before = [] if job["payload"].get("auto_approve", True) else REVIEW_NODES
+
+    try:
+        graph_input = None if graph.get_state(config).values else job_input(job["payload"])
+        for chunk in graph.stream(graph_input, config, interrupt_before=interrupt_before):
+            node = next(iter(chunk))
+            if node == "__interrupt__":
+                continue
+            queue.progress(job_id, node)
+            if queue.cancel_requested(job_id):
+                queue.finish(job_id, CANCELLED)
+                return CANCELLED
+
+        snapshot = graph.get_state(config)
+        result = {field: snapshot.values.get(field) for field in RESULT_FIELDS}
+        status = AWAITING_REVIEW if snapshot.next else COMPLETED
+        queue.finish(job_id, status, result=result)
+        return status
+    except Exception as e:
+        print(f"❌ Job {job_id} failed: {e}")
+        queue.finish(job_id, FAILED, error=str(e))
+        return FAILED
+
+
+def worker_loop(db_path: str = None, stop_event=None, max_jobs: int = None) -> None:
+    """Claims and runs jobs until `stop_event` is set (or `max_jobs` have run)."""
+    # Imported here so every worker process builds its own LLM clients and connections
+    from software_life_cycle.graph.builder import get_graph
+
+    graph = get_graph()
+
+    queue = JobQueue(db_path)
+    name = worker_name()
+    done = 0
+    print(f"👷 Worker {name} waiting for jobs")
+    while not (stop_event is not None and stop_event.is_set()):
+        job = queue.claim(name)
+        if job is None:
+            time.sleep(JOB_POLL_SECONDS)
+            continue
+
+        print(f"▶️ Worker {name} running job {job['id']}")
+        status = run_job(queue, job, graph)
+        print(f"⏹️ Job {job['id']} {status}")
+        done += 1
+        if max_jobs is not None and done >= max_jobs:
+            break
+
+
+class WorkerPool:
+    """A pool of worker processes consuming the job queue, so jobs run across cores."""
+
+    def __init__(self, workers: int = None, db_path: str = None):
+        self.workers = workers or JOB_WORKERS or 1
+        self.db_path = db_path or default_job_db()
+        self._context = multiprocessing.get_context("spawn")
+        self._stop = self._context.Event()
+        self._processes = []
+
+    def start(self) -> "WorkerPool":
+        requeued = JobQueue(self.db_path).requeue_orphans(worker_alive)
+        if requeued:
+            print(f"Requeued {requeued} job(s) left running by stopped workers")
+        for _ in range(self.workers):
+            process = self._context.Process(target=worker_loop, args=(self.db_path, self._stop), daemon=True)
+            process.start()
+            self._processes.append(process)
+        return self
+
+    def alive(self) -> int:
+        return sum(process.is_alive() for process in self._processes)
+
+    def stop(self, timeout: float = 30) -> None:
+        """Lets each worker finish its current job, then terminates any that do not exit in time."""
+        self._stop.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+
+_pool = None
+
+
+def ensure_worker_pool():
+    """Starts the embedded worker pool once, unless SDLC_JOB_WORKERS=0."""
+    global _pool
+    if _pool is None and JOB_WORKERS > 0:
+        _pool = WorkerPool(JOB_WORKERS).start()
+    return _pool
@@ -1,3 +1,4 @@
+import os
 import typer
 import uuid
 import json
@@ -6,9 +7,10 @@ from rich.console import Console
 from rich.panel import Panel
 from rich.markdown import Markdown
 from rich.syntax import Syntax
-from software_life_cycle.graph.builder import graph
 from software_life_cycle.state.state import SoftwareLifecycle
 import time
+# The graph, LangGraph and the LLM clients are imported inside the commands that need them,
+# so `--help` and argument errors do not pay for them (see tests/test_startup.py)
 console = Console()
 app = typer.Typer()
 displayed_content = set()
@@ -186,6 +188,128 @@ def display_final_results(state: SoftwareLifecycle):
     console.print("\n" + "="*50)
     console.print("✨ End of Implementation", style="bold green")
 
+# ---------- Workflow Execution ----------
+
+def stream_workflow(graph_input, thread_id: str) -> SoftwareLifecycle:
+    """Streams the graph for `thread_id`, rendering LLM tokens as they arrive and each node's output.
+    `graph_input=None` continues the thread from its last checkpoint."""
+    from software_life_cycle.api.events import NODE_END, WorkflowEvents, apply_event, changed_fields
+    from software_life_cycle.graph.builder import get_graph
+    from software_life_cycle.utils.streaming import STREAM_TOKENS, is_token_event
+
+    graph = get_graph()
+    config = {"configurable": {"thread_id": thread_id}}
+    stream_mode = ["updates", "custom"] if STREAM_TOKENS else ["updates"]
+    source = None
+    # Each node returns the whole state; only the fields it changed are displayed
+    events = WorkflowEvents(thread_id, graph.get_state(config).values)
+    values = apply_event({}, events.snapshot())
+    for mode, chunk in graph.stream(graph_input, config=config, stream_mode=stream_mode):
+        if mode == "custom":
+            if is_token_event(chunk):
+                if chunk["source"] != source:
+                    source = chunk["source"]
+                    console.print(f"\n── {source} ──", style="bold cyan", markup=False)
+                console.print(chunk["text"], end="", markup=False, highlight=False)
+            continue
+        if source is not None:
+            console.print()
+            source = None
+        operation = list(chunk.keys())[0]
+        if isinstance(chunk[operation], str) and ('=' * 10 in chunk[operation] or '📢' in chunk[operation]):
+            continue
+        changed = set()
+        for event in events.from_chunk(mode, chunk):
+            values = apply_event(values, event)
+            if event["type"] == NODE_END:
+                changed = changed_fields(event)
+        # The review node reports a decision even when it leaves the state as it was
+        if not changed and operation != "product_owner_review":
+            continue
+        content = values
+        if operation == "auto_gen_us":
+            story = content.get('user_stories', '')
+            display_content(story, "green", "📝 User Story", operation)
+        elif operation == "product_owner_review":
+            actual_status = content.get('status', 'pending')
+            display_status = "Approved" if actual_status == "approved" else "Changes Requested"
+            style = "green" if actual_status == "approved" else "yellow"
+            display_content(display_status, style, "👀 Product Owner Review")
+        elif operation == "create_design_doc":
+            if content.get('design_documents'):
+                display_content(content.get('design_documents'), "cyan", "🏗️ Design Document", operation)
+        elif operation == "code_review":
+            if content.get('generated_code') or content.get('code_review_feedback'):
+                display_content(content, "yellow", "🔍 Code Review", operation)
+        elif operation == "security_review":
+            if content.get('security_feedback'):
+                display_content(content, "red", "🔒 Security Review", operation)
+        elif operation == "test_case_generation":
+            if content.get('test_cases'):
+                display_content(content, "blue", "🧪 Test Cases", operation)
+        elif operation == "qa_testing":
+            if content.get('qa_test_result'):
+                display_content(content, "magenta", "✅ QA Testing", operation)
+        elif operation == "feedback":
+            feedback = content.get("feedback", "")
+            if feedback and feedback != "No feedback yet.":
+                display_content(feedback, "magenta", "💬 Feedback", operation)
+
+    # Get final updated state from the thread's latest checkpoint
+    state = SoftwareLifecycle(**graph.get_state(config).values)
+    return state.model_copy(update={
+            "finale_code": state.generated_code,
+            "final_test_cases": state.test_cases
+        })
+
+
+def display_metrics(thread_id: str) -> None:
+    """Per-node time, LLM calls, tokens and cost of this run (also written to SDLC_METRICS_PATH)."""
+    from rich.table import Table
+    from software_life_cycle.utils.metrics import summarize, thread_metrics
+    from software_life_cycle.utils.prompts import prefix_ratio
+
+    rows = summarize(thread_metrics(thread_id))
+    if not rows:
+        return
+    table = Table(title="Node Metrics")
+    table.add_column("Node", no_wrap=True)
+    for column in ("Runs", "Secs", "LLM Calls", "In Tok", "Out Tok", "Prefix", "Cached", "Retries", "Cost $"):
+        table.add_column(column, justify="right")
+    for row in rows:
+        ratio = prefix_ratio(row)
+        table.add_row(
+            row["node"], str(row["runs"]), f"{row['seconds']:.1f}", str(row["llm_calls"]), str(row["prompt_tokens"]),
+            str(row["completion_tokens"]), f"{ratio:.0%}" if ratio is not None else "-", str(row["cache_hits"]),
+            str(row["retries"]), f"{row['cost_usd']:.4f}",
+            style="bold" if row["node"] == "total" else None,
+        )
+    console.print(table)
+
+
+def finish_workflow(state: SoftwareLifecycle, start_time: float, thread_id: str) -> None:
+    from software_life_cycle.graph.builder import get_graph
+    from software_life_cycle.graph.checkpointer import prune_inactive_checkpoints
+    from software_life_cycle.LLM.llm import get_response_cache
+    from software_life_cycle.LLM.rate_limit import scheduler_stats
+
+    # Show the final output
+    display_final_results(state)
+    console.print("\n Workflow Complete!", style="bold green")
+    end_time = time.time()
+    elapsed_time = end_time - start_time
+    print(f"\n WORKFLOW COMPLETED IN {elapsed_time/60:.2f} minutes")
+    display_metrics(thread_id)
+    response_cache = get_response_cache()
+    if response_cache is not None:
+        stats = response_cache.stats()
+        print(f" LLM CACHE: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} entries")
+    for model, stats in scheduler_stats().items():
+        print(f" RATE LIMIT {model}: {stats['calls']} calls, {stats['throttled']} throttled, "
+              f"max queue {stats['max_queued']}, waited {stats['wait_seconds']}s")
+    if os.getenv("SDLC_CHECKPOINT_AUTO_PRUNE", "0") == "1":
+        prune_inactive_checkpoints(get_graph().checkpointer)
+
 # ---------- CLI Entry Point ----------
 
 @app.command()
@@ -207,58 +331,162 @@ def run(requirements: str = typer.Option(..., prompt="Enter project requirements
         )
         thread_id = str(uuid.uuid4())
         console.print(Panel(f"{requirements}", title=" Starting Workflow", style="blue"))
+        console.print(f"Thread ID: {thread_id} (resume with: resume --thread-id {thread_id})", style="dim")
+
+        state = stream_workflow(state, thread_id)
+        finish_workflow(state, start_time, thread_id)
+
+    except Exception as e:
+        console.print(f"\n Error in workflow: {str(e)}", style="bold red")
+        return 1
+    return 0
+
+
+@app.command()
+def resume(thread_id: str = typer.Option(None, help="Thread to resume; defaults to the most recent one")):
+    """Resume a workflow thread from its last completed node."""
+    from software_life_cycle.graph.builder import get_graph
+    from software_life_cycle.graph.checkpointer import list_threads
+
+    try:
+        start_time = time.time()
+        displayed_content.clear()
+
+        graph = get_graph()
+        thread_id = thread_id or next(iter(list_threads(graph.checkpointer)), None)
+        if not thread_id:
+            console.print("No saved workflow threads found.", style="bold red")
+            return 1
+
+        snapshot = graph.get_state({"configurable": {"thread_id": thread_id}})
+        if not snapshot.values:
+            console.print(f"No checkpoint found for thread {thread_id}.", style="bold red")
+            return 1
+        if not snapshot.next:
+            console.print(f"Thread {thread_id} already completed.", style="yellow")
+        else:
+            console.print(Panel(f"Resuming at: {', '.join(snapshot.next)}", title=f" Thread {thread_id}", style="blue"))
 
-        for chunk in graph.stream(state, config={"configurable": {"thread_id": thread_id}}):
-            operation = list(chunk.keys())[0]
-            content = chunk[operation]
-            if isinstance(content, str) and ('=' * 10 in content or '📢' in content):
-                continue
-            if operation == "auto_gen_us":
-                story = content.get('user_stories', '')
-                display_content(story, "green", "📝 User Story", operation)
-            elif operation == "product_owner_review":
-                actual_status = content.get('status', 'pending')
-                display_status = "Approved" if actual_status == "approved" else "Changes Requested"
-                style = "green" if actual_status == "approved" else "yellow"
-                display_content(display_status, style, "👀 Product Owner Review")
-            elif operation == "create_design_doc":
-                if content.get('design_documents'):
-                    display_content(content.get('design_documents'), "cyan", "🏗️ Design Document", operation)
-            elif operation == "code_review":
-                if content.get('generated_code') or content.get('code_review_feedback'):
-                    display_content(content, "yellow", "🔍 Code Review", operation)
-            elif operation == "security_review":
-                if content.get('security_feedback'):
-                    display_content(content, "red", "🔒 Security Review", operation)
-            elif operation == "test_case_generation":
-                if content.get('test_cases'):
-                    display_content(content, "blue", "🧪 Test Cases", operation)
-            elif operation == "qa_testing":
-                if content.get('qa_test_result'):
-                    display_content(content, "magenta", "✅ QA Testing", operation)
-            elif operation == "feedback":
-                feedback = content.get("feedback", "")
-                if feedback and feedback != "No feedback yet.":
-                    display_content(feedback, "magenta", "💬 Feedback", operation)
-
-        # Get final updated state
-        state = state.model_copy(update={
-                "finale_code": state.generated_code,
-                "final_test_cases": state.test_cases
-            })
-
-        # Show the final output
-        display_final_results(state)
-        console.print("\n Workflow Complete!", style="bold green")
-        end_time = time.time()
-        elapsed_time = end_time - start_time
-        print(f"\n WORKFLOW COMPLETED IN {elapsed_time/60:.2f} minutes")
+        state = stream_workflow(None, thread_id)
+        finish_workflow(state, start_time, thread_id)
 
     except Exception as e:
         console.print(f"\n Error in workflow: {str(e)}", style="bold red")
         return 1
     return 0
 
+
+@app.command()
+def qa(
+    code_dir: str = typer.Option("output/generated_code", help="Directory with the saved generated code"),
+    tests_dir: str = typer.Option("output/test_cases", help="Directory with the saved test_case_N.py files"),
+    workers: int = typer.Option(None, help="Parallel pytest shards (default: SDLC_QA_WORKERS)"),
+):
+    """Run a saved generated test suite in the QA sandbox, sharded across processes."""
+    from rich.table import Table
+    from software_life_cycle.utils.sandbox import get_qa_cache, run_saved_suite
+
+    report = run_saved_suite(code_dir, tests_dir, workers=workers, cache=get_qa_cache())
+    if report is None:
+        console.print(f"No test files found in {tests_dir}.", style="bold red")
+        raise typer.Exit(code=1)
+
+    table = Table(title="QA Results")
+    for column in ("Test", "Outcome", "Seconds", "Message"):
+        table.add_column(column)
+    styles = {"passed": "green", "skipped": "dim"}
+    for result in report["results"]:
+        message = (result["message"].splitlines() or [""])[0]
+        table.add_row(result["test"], result["outcome"], f"{result['duration']:.2f}", message,
+                      style=styles.get(result["outcome"], "red"))
+    console.print(table)
+    console.print(report["summary"])
+    raise typer.Exit(code=0 if report["summary"]["passed"] == report["summary"]["total"] else 1)
+
+
+@app.command()
+def prune(
+    max_age_days: float = typer.Option(None, help="Delete threads idle for longer (default: SDLC_CHECKPOINT_MAX_AGE_DAYS)"),
+    keep_history: bool = typer.Option(False, help="Only delete expired threads; keep every checkpoint of the rest"),
+):
+    """Apply the checkpoint retention policy, skipping threads of queued, running or paused jobs.
+    Run it while no API process is serving workflows: their sessions are not visible here."""
+    from software_life_cycle.graph.checkpointer import build_checkpointer, prune_inactive_checkpoints
+
+    result = prune_inactive_checkpoints(build_checkpointer(), max_age_days, keep_history or None)
+    console.print(f"Deleted {result['deleted']} thread(s), compacted {result['compacted']}, "
+                  f"skipped {result['skipped']} active job(s).", style="blue")
+    return 0
+
+
+@app.command()
+def workers(count: int = typer.Option(2, help="Number of worker processes")):
+    """Run a pool of worker processes that execute queued workflow jobs."""
+    from software_life_cycle.jobs.worker import WorkerPool
+
+    pool = WorkerPool(count).start()
+    console.print(f"Started {count} workflow worker(s) on {pool.db_path}. Press Ctrl+C to stop.", style="blue")
+    try:
+        while pool.alive():
+            time.sleep(1)
+    except KeyboardInterrupt:
+        console.print("Stopping workers after their current jobs...", style="yellow")
+    finally:
+        pool.stop()
+    return 0
+
+
+@app.command()
+def bench(
+    scenario: list[str] = typer.Option(None, help="Scenario to run (repeatable); default: all of them"),
+    latency: str = typer.Option("", help='Fake LLM latency, e.g. "fixed:0.2", "uniform:0.1:0.5", "lognormal:0.3:0.5"; '
+                                         'with --trace: "zero", "recorded" or "scaled:F"'),
+    output: str = typer.Option(None, help="Also write the reports to this JSON file"),
+    trace: str = typer.Option(None, help="Replay this recorded trace (SDLC_LLM_RECORD) instead of the scenarios"),
+    requirements: str = typer.Option(None, help="Requirements of the recorded run (with --trace)"),
+):
+    """Benchmark the full workflow offline against scripted LLMs or a recorded trace."""
+    from rich.table import Table
+    from software_life_cycle.bench.runner import run_benchmarks, run_replay
+    from software_life_cycle.bench.scenarios import SCENARIOS
+    from software_life_cycle.utils.prompts import prefix_ratio
+
+    unknown = [name for name in scenario or [] if name not in SCENARIOS]
+    if unknown:
+        console.print(f"Unknown scenario(s): {', '.join(unknown)}. Choose from: {', '.join(SCENARIOS)}", style="bold red")
+        raise typer.Exit(code=1)
+    if trace and not requirements:
+        console.print("--trace needs the --requirements of the recorded run.", style="bold red")
+        raise typer.Exit(code=1)
+
+    reports = [run_replay(trace, requirements, latency or "zero")] if trace else run_benchmarks(scenario, latency)
+    for report in reports:
+        table = Table(title=f"{report['scenario']}: {report['wall_seconds']:.2f}s wall, "
+                            f"{report['peak_kb']} KB peak, QA {report['qa_test_result']}")
+        table.add_column("Node", no_wrap=True)
+        for column in ("Runs", "Secs", "LLM Calls", "In Tok", "Out Tok", "Prefix", "Peak KB"):
+            table.add_column(column, justify="right")
+        for row in report["nodes"]:
+            ratio = prefix_ratio(row)
+            table.add_row(
+                row["node"], str(row["runs"]), f"{row['seconds']:.3f}", str(row["llm_calls"]),
+                str(row["prompt_tokens"]), str(row["completion_tokens"]), f"{ratio:.0%}" if ratio is not None else "-",
+                str(row["peak_kb"]),
+                style="bold" if row["node"] == "total" else None,
+            )
+        console.print(table)
+        if report.get("misses"):
+            console.print(f"{report['misses']} request(s) were not in the trace: the run diverged from the recording.",
+                          style="bold red")
+        if report["error"]:
+            console.print(f"Run stopped: {report['error']}", style="bold red")
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+        console.print(f"Wrote {len(reports)} report(s) to {output}", style="dim")
+    if any(report["error"] or report.get("misses") for report in reports):
+        raise typer.Exit(code=1)
+
 if __name__ == "__main__":
     raise SystemExit(app())
 
@@ -1,12 +1,21 @@
-from langchain_core.messages import HumanMessage, SystemMessage
 from software_life_cycle.state.state import SoftwareLifecycle
-from software_life_cycle.LLM.llm import llm_coder
+from software_life_cycle.LLM.router import RoutedClient
 from typing import Literal
 import json
 import re
 from software_life_cycle.utils.batching import chunk_generated_code
-
-llm = llm_coder
+from software_life_cycle.utils.chunk_executor import ainvoke_chunks, invoke_chunks
+from software_life_cycle.utils.concurrency import env_int
+from software_life_cycle.utils.feedback import record_feedback
+from software_life_cycle.utils.prompts import assemble
+from software_life_cycle.utils.syntax_check import check_generated_code, format_errors
+from software_life_cycle.utils.verdicts import (
+    CodeReviewVerdict, aparse_verdicts, combined_decision, format_instructions, parse_verdicts, verdict_text,
+)
+
+llm = RoutedClient("code_review")
+# Failed syntax checks sent back to code generation before the code goes to review regardless
+SYNTAX_CHECK_MAX_ATTEMPTS = env_int("SDLC_SYNTAX_CHECK_ATTEMPTS", 2)
 # def batch_code_for_review(code_dict: dict, token_limit: int = 5500) -> dict:
 #     """Split code into batches if it exceeds token limit, otherwise return as is."""
 #     # Estimate tokens (roughly 4 chars per token)
@@ -102,77 +111,115 @@ llm = llm_coder
 #         "feedback": updated_feedback,
 #         "code_review_attempt": state.code_review_attempt + 1
 #     })
-def code_review(state: SoftwareLifecycle) -> SoftwareLifecycle:
-    """AI reviews the generated code and decides whether to approve or request changes."""
-    print("*" * 50 + f" AI CODE REVIEW (Attempt {state.code_review_attempt + 1}/3) " + "*" * 50)
+def validate_code(state: SoftwareLifecycle) -> SoftwareLifecycle:
+    """Local syntax check of every role's code blocks before spending an LLM review on them."""
+    print("*" * 50 + " SYNTAX CHECK " + "*" * 50)
 
     if not state.generated_code:
-        print("No generated code available for review.")
-        return state
+        return state.model_copy(update={"syntax_errors": []})
+
+    errors = check_generated_code(state.generated_code)
+    if not errors:
+        print("✅ All code blocks parse.")
+        return state.model_copy(update={"syntax_errors": []})
 
-    code_batches = chunk_generated_code(state.generated_code, token_limit=5800)
+    report = format_errors(errors)
+    print(f"❌ Syntax errors found:\n{report}")
+    attempt = state.syntax_check_attempt + 1
+    return state.model_copy(update={
+        "syntax_errors": report.splitlines(),
+        **record_feedback(state, "syntax_check", attempt, f"Fix these syntax errors:\n{report}"),
+        "syntax_check_attempt": attempt
+    })
 
-    if isinstance(code_batches, dict) and any("Batch_" in key for key in code_batches):
+
+def syntax_route(state: SoftwareLifecycle) -> Literal["code_review", "orchestrate_code_generation"]:
+    """Broken code goes straight back to code generation; parsable code goes to the LLM review."""
+    if state.syntax_errors and state.syntax_check_attempt <= SYNTAX_CHECK_MAX_ATTEMPTS:
+        print("Syntax errors found! Re-running Code Generation.")
+        return "orchestrate_code_generation"
+    if state.syntax_errors:
+        print("Syntax errors remain after the maximum attempts. Continuing to code review.")
+    return "code_review"
+
+
+def code_review_messages(state: SoftwareLifecycle) -> list:
+    """Builds one review prompt per code batch (a single prompt when the code fits)."""
+    code_batches = chunk_generated_code(state.generated_code, token_limit=5800, model=llm.model_name)
+
+    if len(code_batches) > 1:
         print("Large code detected. Splitting into safe-size batches...")
-        batch_reviews = []
-        for batch_key, batch_code in code_batches.items():
-            batch_prompt = f"### Code Review Batch: {batch_key}\n{json.dumps(batch_code, indent=2)}\n\n"
-
-            if state.feedback.strip():
-                batch_prompt += (
-                    f"### Previous Feedback:\n{state.feedback.strip()}\n"
-                    f"### Please consider this feedback while reviewing the code.\n"
-                )
-
-            messages = [
-                SystemMessage(content="You are an expert software reviewer. Review code for correctness, efficiency, maintainability, and security."),
-                HumanMessage(content=batch_prompt)
-            ]
-            try:
-                response = llm.invoke(messages).content.strip()
-                batch_reviews.append(f"[{batch_key}]: {response}")
-            except Exception as e:
-                print(f"Error in LLM for {batch_key}: {e}")
-                batch_reviews.append(f"[{batch_key}]: ERROR during review")
-
-        ai_response = "\n\n".join(batch_reviews)
+        tails = [[(f"Code Review Batch: Batch_{idx}", json.dumps(batch_code, indent=2))]
+                 for idx, batch_code in enumerate(code_batches)]
+    else:
+        tails = [[("Generated Code", json.dumps(state.generated_code, indent=2))]]
+
+    feedback = ""
+    if state.feedback.strip():
+        feedback = f"{state.feedback.strip()}\n### Please consider this feedback while reviewing the code."
+
+    # Every batch shares the instructions and feedback; only the code differs
+    return [
+        assemble(
+            "You are an expert software reviewer. "
+            "Review code for correctness, efficiency, maintainability, and security. "
+            "Make sure to keep the feedback extremely concise and clear.",
+            instructions=format_instructions(CodeReviewVerdict),
+            context=[("Previous Feedback", feedback)],
+            tail=tail,
+        )
+        for tail in tails
+    ]
+
+
+def apply_code_review(state: SoftwareLifecycle, verdicts: list) -> SoftwareLifecycle:
+    """Combines the batch verdicts into the review decision and feedback log."""
+    if len(verdicts) > 1:
+        ai_response = "\n\n".join(
+            f"[Batch_{idx}]: {verdict_text(verdict)}" for idx, verdict in enumerate(verdicts)
+        )
     else:
-        code_content = json.dumps(state.generated_code, indent=2)
-        prompt_content = f"Here is the generated code:\n{code_content}\n"
-
-        if state.feedback.strip():
-            prompt_content += (
-                f"\n### Previous Feedback:\n{state.feedback.strip()}\n"
-                f"### Please consider this feedback while reviewing the code.\n"
-            )
-
-        messages = [
-            SystemMessage(content="You are an expert software reviewer. "
-            "Review code for correctness, efficiency, maintainability, and security."
-            "make sure to keep the feedback extremely concise and clear"),
-            HumanMessage(content=prompt_content)
-        ]
-        try:
-            ai_response = llm.invoke(messages).content.strip()
-        except Exception as e:
-            print(f"Error during review: {e}")
-            ai_response = "ERROR"
+        ai_response = verdict_text(verdicts[0] if verdicts else None)
 
     print(f"🔍 LLM Code Review Decision:\n{ai_response}")
 
-    decision = "revise"
-    if "approve" in ai_response.lower():
-        decision = "approve"
-
-    updated_feedback = state.feedback + f"\n[Code Review Attempt {state.code_review_attempt + 1}]: {ai_response}"
+    decision = combined_decision(verdicts, "approve", "revise")
 
     return state.model_copy(update={
         "code_review_feedback": decision,
-        "feedback": updated_feedback,
+        **record_feedback(state, "code_review", state.code_review_attempt + 1, ai_response),
         "code_review_attempt": state.code_review_attempt + 1
     })
 
 
+def code_review(state: SoftwareLifecycle) -> SoftwareLifecycle:
+    """AI reviews the generated code and decides whether to approve or request changes."""
+    print("*" * 50 + f" AI CODE REVIEW (Attempt {state.code_review_attempt + 1}/3) " + "*" * 50)
+
+    if not state.generated_code:
+        print("No generated code available for review.")
+        return state
+
+    messages = code_review_messages(state)
+    responses = invoke_chunks(llm, messages, "LLM code review")
+    verdicts = parse_verdicts(llm, CodeReviewVerdict, responses, "LLM code review", llm.escalation, messages)
+    return apply_code_review(state, verdicts)
+
+
+async def acode_review(state: SoftwareLifecycle) -> SoftwareLifecycle:
+    """Async variant of `code_review`."""
+    print("*" * 50 + f" AI CODE REVIEW (Attempt {state.code_review_attempt + 1}/3) " + "*" * 50)
+
+    if not state.generated_code:
+        print("No generated code available for review.")
+        return state
+
+    messages = code_review_messages(state)
+    responses = await ainvoke_chunks(llm, messages, "LLM code review")
+    verdicts = await aparse_verdicts(llm, CodeReviewVerdict, responses, "LLM code review", llm.escalation, messages)
+    return apply_code_review(state, verdicts)
+
+
 def code_route(state: SoftwareLifecycle) -> Literal["code_security_review", "orchestrate_code_generation"]:
     """LLM decision determines if the code is accepted or needs improvement."""
     print("*" * 50 + " AI CODE REVIEW DECISION " + "*" * 50)
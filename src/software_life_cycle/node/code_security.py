@@ -1,9 +1,20 @@
-from langchain_core.messages import HumanMessage, SystemMessage
 from software_life_cycle.state.state import SoftwareLifecycle
-from software_life_cycle.LLM.llm import llm
+from software_life_cycle.LLM.router import RoutedClient
 import json
 from software_life_cycle.utils.batching import chunk_generated_code
+from software_life_cycle.utils.chunk_executor import ainvoke_chunks, invoke_chunks
+from software_life_cycle.utils.feedback import record_feedback
+from software_life_cycle.utils.prompts import assemble
+from software_life_cycle.utils.security_scan import format_report, needs_llm_review, scan_code
+from software_life_cycle.utils.verdicts import (
+    SecurityVerdict, aparse_verdicts, combined_decision, format_instructions, parse_verdicts, verdict_text,
+)
 from typing import Literal
+import os
+
+llm = RoutedClient("code_security_review")
+# Skip the LLM for chunks the static scan finds clean (SDLC_SECURITY_PRESCREEN=0 reviews everything)
+SECURITY_PRESCREEN = os.getenv("SDLC_SECURITY_PRESCREEN", "1") != "0"
 
 # def chunk_generated_code(data, token_limit: int = 5500) -> list:
 #     """
@@ -52,66 +63,133 @@ from typing import Literal
 
 
 #step 8: security review code
-def code_security_review(state: SoftwareLifecycle) -> SoftwareLifecycle:
-    """LLM analyzes the generated code for security vulnerabilities."""
-    print("*" * 50 + f" AI SECURITY REVIEW (Attempt {state.code_security_attempt + 1}/3) " + "*" * 50)
-
-    if not state.generated_code:
-        print("No generated code available for security review.")
-        return state
+def prescreen_chunks(state: SoftwareLifecycle) -> tuple:
+    """Splits the generated code into review chunks and runs the static scan on each."""
+    code_chunks = chunk_generated_code(state.generated_code, token_limit=5500, model=llm.model_name)
+    return code_chunks, [scan_code(chunk) for chunk in code_chunks]
+
+
+def escalated_chunks(scans: list) -> list:
+    """Indexes of the chunks the LLM still has to review: those with findings or ambiguous code."""
+    if not SECURITY_PRESCREEN:
+        return list(range(len(scans)))
+    return [idx for idx, scan in enumerate(scans) if needs_llm_review(scan)]
+
+
+def security_review_messages(state: SoftwareLifecycle, code_chunks: list = None, scans: list = None,
+                             indexes: list = None) -> list:
+    """Builds one security review prompt per escalated code chunk, including its static findings."""
+    if code_chunks is None:
+        code_chunks, scans = prescreen_chunks(state)
+    if indexes is None:
+        indexes = escalated_chunks(scans)
+
+    instructions = "\n".join([
+        "**Security Checks:**",
+        "SQL Injection",
+        "XSS (Cross-site scripting)",
+        "Hardcoded Secrets",
+        "Weak Authentication",
+        "",
+        "Keep each issue extremely concise and clear.",
+        "",
+        format_instructions(SecurityVerdict),
+    ])
+    feedback = ""
+    if state.feedback.strip():
+        feedback = f"{state.feedback.strip()}\n### Ensure any identified vulnerabilities are mitigated."
+
+    chunk_messages = []
+    for idx in indexes:
+        chunk = code_chunks[idx]
+        chunk_str = json.dumps(chunk, indent=2) if isinstance(chunk, dict) else chunk
+        tail = [(f"Generated Code (Chunk {idx+1})", chunk_str)]
+        if scans[idx]["findings"] or scans[idx]["ambiguous"]:
+            tail.append(("Static Analysis (confirm or dismiss each item)", format_report(scans[idx])))
+
+        chunk_messages.append(assemble(
+            "You are a cybersecurity expert. Analyze the given code for security vulnerabilities.",
+            instructions=instructions,
+            context=[("Previous Feedback", feedback)],
+            tail=tail,
+        ))
+
+    return chunk_messages
+
+
+def apply_security_review(state: SoftwareLifecycle, verdicts: list, scans: list = None,
+                          indexes: list = None) -> SoftwareLifecycle:
+    """
+    Combines the chunk verdicts into the security decision and feedback log.
+    Chunks the static scan cleared count as secure; the decision follows the LLM verdicts
+    on the escalated chunks, and an escalated chunk left without a verdict means `fix`.
+    """
+    if indexes is None:
+        indexes = list(range(len(verdicts)))
+    reviewed = dict(zip(indexes, verdicts))
+    scans = scans or [None] * len(verdicts)
 
-    code_chunks = chunk_generated_code(state.generated_code, token_limit=5500)
     batch_responses = []
-
-    for idx, chunk in enumerate(code_chunks):
-        chunk_str = json.dumps(chunk, indent=2) if isinstance(chunk, dict) else chunk
-        prompt_content = f"Here is the generated code (Chunk {idx+1}):\n{chunk_str}\n\n"
-
-        if state.feedback.strip():
-            prompt_content += (
-                f"### Previous Feedback:\n{state.feedback.strip()}\n"
-                f"### Ensure any identified vulnerabilities are mitigated.\n"
-            )
-
-        prompt_content += """
-        **Security Checks:**
-        SQL Injection  
-        XSS (Cross-site scripting)  
-        Hardcoded Secrets  
-        Weak Authentication
-
-        **Response Format:**
-        - Decision: ('secure' or 'fix')
-        - Feedback: Bullet points explaining security risks and fixes.
-          make sure to keep the feedback extremely concise and clear
-        """
-
-        messages = [
-            SystemMessage(content="You are a cybersecurity expert. Analyze the given code for security vulnerabilities."),
-            HumanMessage(content=prompt_content)
-        ]
-
-        try:
-            response = llm.invoke(messages).content.strip()
-            print(f"Security review response for chunk {idx+1}")
-            batch_responses.append(f"[Chunk {idx+1}]: {response}")
-        except Exception as e:
-            print(f"Error in LLM security review for chunk {idx+1}: {e}")
-            batch_responses.append(f"[Chunk {idx+1}]: ERROR during security review")
+    for idx, scan in enumerate(scans):
+        if idx not in reviewed:
+            batch_responses.append(f"[Chunk {idx+1}]: Decision: secure (static pre-screen found no issues)")
+            continue
+        text = verdict_text(reviewed[idx])
+        if scan is not None and scan["findings"]:
+            text += f"\nStatic findings:\n{format_report({'findings': scan['findings'], 'ambiguous': []})}"
+        batch_responses.append(f"[Chunk {idx+1}]: {text}")
 
     full_response = "\n\n".join(batch_responses)
     print(f"🔐 Combined Security Review Response:\n{full_response}")
 
-    updated_feedback = state.feedback + f"\n[Security Review]: {full_response}"
-    decision = "secure" if "secure" in full_response.lower() else "fix"
+    decision = combined_decision(verdicts, "secure", "fix", on_missing="reject") if verdicts else "secure"
 
     return state.model_copy(update={
         "security_feedback": decision,
-        "feedback": updated_feedback,
+        **record_feedback(state, "security_review", state.code_security_attempt + 1, full_response),
         "code_security_attempt": state.code_security_attempt + 1
     })
 
 
+def _print_prescreen(scans: list, indexes: list) -> None:
+    findings = sum(len(scan["findings"]) for scan in scans)
+    print(f"🔎 Static pre-screen: {findings} finding(s); {len(indexes)}/{len(scans)} chunk(s) sent to the LLM")
+
+
+def code_security_review(state: SoftwareLifecycle) -> SoftwareLifecycle:
+    """Static pre-screen of the generated code, then an LLM review of the chunks it could not clear."""
+    print("*" * 50 + f" AI SECURITY REVIEW (Attempt {state.code_security_attempt + 1}/3) " + "*" * 50)
+
+    if not state.generated_code:
+        print("No generated code available for security review.")
+        return state
+
+    code_chunks, scans = prescreen_chunks(state)
+    indexes = escalated_chunks(scans)
+    _print_prescreen(scans, indexes)
+    messages = security_review_messages(state, code_chunks, scans, indexes)
+    responses = invoke_chunks(llm, messages, "LLM security review")
+    verdicts = parse_verdicts(llm, SecurityVerdict, responses, "LLM security review", llm.escalation, messages)
+    return apply_security_review(state, verdicts, scans, indexes)
+
+
+async def acode_security_review(state: SoftwareLifecycle) -> SoftwareLifecycle:
+    """Async variant of `code_security_review`."""
+    print("*" * 50 + f" AI SECURITY REVIEW (Attempt {state.code_security_attempt + 1}/3) " + "*" * 50)
+
+    if not state.generated_code:
+        print("No generated code available for security review.")
+        return state
+
+    code_chunks, scans = prescreen_chunks(state)
+    indexes = escalated_chunks(scans)
+    _print_prescreen(scans, indexes)
+    messages = security_review_messages(state, code_chunks, scans, indexes)
+    responses = await ainvoke_chunks(llm, messages, "LLM security review")
+    verdicts = await aparse_verdicts(llm, SecurityVerdict, responses, "LLM security review", llm.escalation, messages)
+    return apply_security_review(state, verdicts, scans, indexes)
+
+
 def security_route(state: SoftwareLifecycle) -> Literal["generate_test_cases", "orchestrate_code_generation"]:
     """LLM decision determines if the code is secure or needs improvements."""
     print("*" * 50 + " AI SECURITY REVIEW DECISION " + "*" * 50)
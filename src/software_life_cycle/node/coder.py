@@ -1,87 +1,220 @@
-from langchain_core.messages import HumanMessage, SystemMessage
 from software_life_cycle.state.state import SoftwareLifecycle
 from typing import Literal
-from software_life_cycle.LLM.llm import llm_docs, llm_coder
+from software_life_cycle.LLM.router import RoutedClient, ainvoke_checked, invoke_checked
+from software_life_cycle.utils.concurrency import env_int, gather_bounded, parallel_map
+from software_life_cycle.utils.feedback import roles_flagged_by_feedback
+from software_life_cycle.utils.prompts import assemble
+from software_life_cycle.utils.streaming import astream_completion, stream_completion
+import hashlib
+
+# Max number of role workers generating code at the same time
+CODEGEN_CONCURRENCY = env_int("SDLC_CODEGEN_CONCURRENCY", 4)
+# Longest role list / role title accepted from the role model before asking the larger one
+MAX_WORKER_ROLES = env_int("SDLC_MAX_WORKER_ROLES", 12)
+MAX_ROLE_WORDS = 6
+
+roles_llm = RoutedClient("generate_worker_roles")
+coder_llm = RoutedClient("code_generation")
 
 
 #step 6: generate the code form design docs
+def worker_roles_messages(state: SoftwareLifecycle) -> list:
+    """Builds the prompt asking the LLM for the development roles in the design."""
+    return assemble(
+        "You are a highly experienced software architect. "
+        "Your task is to identify ONLY software development roles required to implement the system. "
+        "DO NOT include roles related to Testing, QA, Technical Writing, DevOps, Management, Project Management, "
+        "Scrum Master, UX/UI, Product Owner, Business Analyst, or any non-development role. "
+        "Your response should ONLY include job titles related to hands-on coding and software development.",
+        instructions="Analyze the design document below and identify ONLY the software development roles "
+                     "(Backend, Frontend, AI Engineer, Database Engineer, etc.) "
+                     "without listing any testing, documentation, or management roles. "
+                     "Provide a structured list, one role per line, without explanations.",
+        design=state.design_documents,
+    )
+
+
+def valid_worker_roles(text: str) -> bool:
+    """A usable role list: one short job title per line, at most MAX_WORKER_ROLES of them."""
+    roles = [line.strip() for line in (text or "").splitlines() if line.strip()]
+    return 0 < len(roles) <= MAX_WORKER_ROLES and all(len(role.split()) <= MAX_ROLE_WORDS for role in roles)
+
+
+def _design_hash(state: SoftwareLifecycle) -> str:
+    return hashlib.sha256(state.design_documents.encode("utf-8")).hexdigest()
+
+
+def _cached_worker_roles(state: SoftwareLifecycle):
+    """State with worker tasks rebuilt from the cached role list, or None if the design changed."""
+    if state.worker_roles and state.worker_roles_design_hash == _design_hash(state):
+        print(f"Reusing Worker Roles (design unchanged): {state.worker_roles}")
+        return state.model_copy(update={
+            "worker_tasks": {role: f"Generate code for {role} \n" for role in state.worker_roles}
+        })
+    return None
+
+
+def _store_worker_roles(state: SoftwareLifecycle, worker_roles: str) -> SoftwareLifecycle:
+    worker_roles_dict = {role.strip(): f"Generate code for {role} \n" for role in worker_roles.split("\n") if role.strip()}
+
+    print(f"Assigned Worker Roles: {list(worker_roles_dict.keys())}")
+
+    # Store worker roles in state
+    return state.model_copy(update={
+        "worker_tasks": worker_roles_dict,
+        "worker_roles": list(worker_roles_dict.keys()),
+        "worker_roles_design_hash": _design_hash(state)
+    })
+
+
 def generate_worker_roles(state: SoftwareLifecycle) -> SoftwareLifecycle:
-    """AI dynamically determines required worker roles based on design docs and stores them in state."""
+    """AI dynamically determines required worker roles based on design docs and stores them in state.
+    The role list is reused across revision loops until the design document changes."""
     print("*" * 50, "WORKER ROLE IDENTIFICATION", "*" * 50)
 
     if not state.design_documents:
         print("Missing design documents. Worker role assignment aborted.")
         return state
 
-    messages = [
-        SystemMessage(content="You are a highly experienced software architect. "
-                              "Your task is to identify ONLY software development roles required to implement the system. "
-                              "DO NOT include roles related to Testing, QA, Technical Writing, DevOps, Management, Project Management, "
-                              "Scrum Master, UX/UI, Product Owner, Business Analyst, or any non-development role. "
-                              "Your response should ONLY include job titles related to hands-on coding and software development."),
-        HumanMessage(content=f"Analyze the following design document:\n\n"
-                             f"{state.design_documents}\n\n"
-                             "Identify ONLY the software development roles (Backend, Frontend, AI Engineer, Database Engineer, etc.) "
-                             "without listing any testing, documentation, or management roles. "
-                             "Provide a structured list, one role per line, without explanations."),
-    ]
-
-    worker_roles = llm_docs.invoke(messages).content
-    worker_roles_dict = {role.strip(): f"Generate code for {role} \n" for role in worker_roles.split("\n") if role.strip()}
+    cached = _cached_worker_roles(state)
+    if cached is not None:
+        return cached
 
-    print(f"Assigned Worker Roles: {list(worker_roles_dict.keys())}")
+    worker_roles = invoke_checked(roles_llm, worker_roles_messages(state), valid_worker_roles, "Worker roles")
+    return _store_worker_roles(state, worker_roles)
 
-    # Store worker roles in state
-    state = state.model_copy(update={"worker_tasks": worker_roles_dict})
+
+async def agenerate_worker_roles(state: SoftwareLifecycle) -> SoftwareLifecycle:
+    """Async variant of `generate_worker_roles`."""
+    print("*" * 50, "WORKER ROLE IDENTIFICATION", "*" * 50)
+
+    if not state.design_documents:
+        print("Missing design documents. Worker role assignment aborted.")
+        return state
+
+    cached = _cached_worker_roles(state)
+    if cached is not None:
+        return cached
+
+    worker_roles = await ainvoke_checked(roles_llm, worker_roles_messages(state), valid_worker_roles, "Worker roles")
+    return _store_worker_roles(state, worker_roles)
+
+
+def assign_worker_tasks(state: SoftwareLifecycle) -> SoftwareLifecycle:
+    """Picks the roles to (re)generate; their prompts are assembled by `worker_messages`."""
+    if not state.worker_tasks:
+        print("No worker roles found. Skipping code generation.")
+        return state
+
+    # Only re-dispatch roles the reviewers flagged; keep code for the rest
+    roles = list(state.worker_tasks.keys())
+    previous_code = state.generated_code or {}
+    missing = [role for role in roles if role not in previous_code]
+    flagged = roles_flagged_by_feedback(state.feedback_log, roles, state.code_generation_round) if previous_code else []
+    if flagged:
+        state.roles_to_regenerate = [role for role in roles if role in flagged or role in missing]
+    else:
+        if previous_code:
+            print("Feedback could not be attributed to specific roles. Regenerating all roles.")
+        state.roles_to_regenerate = roles
+
+    print(f"Workers Assigned: {roles}")
+    print(f"Workers To Regenerate: {state.roles_to_regenerate}")
     return state
 
 
 def orchestrate_code_generation(state: SoftwareLifecycle) -> SoftwareLifecycle:
     """Assigns worker roles and tasks dynamically based on AI-generated roles."""
     print("*" * 50, "ORCHESTRATOR: CODE GENERATION", "*" * 50)
+    return assign_worker_tasks(generate_worker_roles(state))
 
-    state = generate_worker_roles(state)
 
-    if not state.worker_tasks:
-        print("No worker roles found. Skipping code generation.")
-        return state
+async def aorchestrate_code_generation(state: SoftwareLifecycle) -> SoftwareLifecycle:
+    """Async variant of `orchestrate_code_generation`."""
+    print("*" * 50, "ORCHESTRATOR: CODE GENERATION", "*" * 50)
+    return assign_worker_tasks(await agenerate_worker_roles(state))
 
-    # Include accumulated feedback in worker tasks
-    state.worker_tasks = {
-        role: state.design_documents + f"\n{task_desc}\n\n[Accumulated Feedback]: {state.feedback}"
-        for role, task_desc in state.worker_tasks.items()
-    }
 
-    print(f"Workers Assigned: {list(state.worker_tasks.keys())}")
-    return state
+def worker_messages(state: SoftwareLifecycle, role: str, task: str) -> list:
+    """
+    One role's code generation prompt. The design document and accumulated feedback are held once
+    in state and come before the role, so every role's prompt shares them as a common prefix.
+    """
+    return assemble(
+        "You are a software engineer. Generate optimized and structured code.",
+        instructions="Implement the part of the system described in the design document that your role owns.",
+        design=state.design_documents,
+        context=[("Accumulated Feedback", state.feedback)],
+        tail=[("Your Role", role), ("Task", task)],
+    )
 
-def dynamic_worker(task: str, role: str) -> str:
+
+def dynamic_worker(messages: list, role: str) -> str:
     """Generic worker node that generates code for the assigned role."""
     print(f"-" * 50, f"{role.upper()} CODE GENERATION", "-" * 50)
 
-    messages = [
-        SystemMessage(content=f"You are a {role} engineer. Generate optimized and structured code."),
-        HumanMessage(content=task),
-    ]
+    generated_code = stream_completion(coder_llm, messages, role)
+    print(f"{role.capitalize()} Code Generated!")
+    print(f"{role.capitalize()} Code Generated:\n{generated_code}\n")
+    return generated_code
+
 
-    generated_code = llm_coder.invoke(messages).content
+async def adynamic_worker(messages: list, role: str) -> str:
+    """Async variant of `dynamic_worker`."""
+    print(f"-" * 50, f"{role.upper()} CODE GENERATION", "-" * 50)
+
+    generated_code = await astream_completion(coder_llm, messages, role)
     print(f"{role.capitalize()} Code Generated!")
     print(f"{role.capitalize()} Code Generated:\n{generated_code}\n")
     return generated_code
 
 
+def _pending_workers(state: SoftwareLifecycle) -> list:
+    """(role, task) pairs that need a worker run this round."""
+    previous_code = state.generated_code or {}
+    regenerate = set(state.roles_to_regenerate or state.worker_tasks.keys())
+    return [(role, task) for role, task in state.worker_tasks.items() if role in regenerate or role not in previous_code]
+
+
+def _merge_generated_code(state: SoftwareLifecycle, roles: list, results: list) -> SoftwareLifecycle:
+    previous_code = state.generated_code or {}
+    new_code = {role: code for (role, _), code in zip(roles, results)}
+    generated_code = {role: new_code.get(role, previous_code.get(role)) for role in state.worker_tasks}
+    print(f"Regenerated: {list(new_code.keys())}, kept unchanged: {[r for r in generated_code if r not in new_code]}")
+
+    # Store generated code in state
+    state = state.model_copy(update={
+        "generated_code": generated_code,
+        "code_generation_round": state.code_generation_round + 1
+    })
+    print(f"Collected Generated Code: {list(generated_code.keys())}")
+    print("Code Generation Completed Successfully!")
+    return state
+
+
 def collect_code_results(state: SoftwareLifecycle) -> SoftwareLifecycle:
-    """Collects code from dynamically assigned workers."""
+    """Collects code from dynamically assigned workers, running them concurrently."""
     print("*" * 50, "COLLECTING GENERATED CODE", "*" * 50)
 
     if not state.worker_tasks:
         print("No assigned worker tasks found. Skipping code collection.")
         return state
 
-    generated_code = {role: dynamic_worker(task, role) for role, task in state.worker_tasks.items()}
+    roles = _pending_workers(state)
+    results = parallel_map(lambda item: dynamic_worker(worker_messages(state, *item), item[0]), roles, CODEGEN_CONCURRENCY)
+    return _merge_generated_code(state, roles, results)
 
-    # Store generated code in state
-    state = state.model_copy(update={"generated_code": generated_code})
-    print(f"Collected Generated Code: {list(generated_code.keys())}")
-    print("Code Generation Completed Successfully!")
-    return state
+
+async def acollect_code_results(state: SoftwareLifecycle) -> SoftwareLifecycle:
+    """Async variant of `collect_code_results`."""
+    print("*" * 50, "COLLECTING GENERATED CODE", "*" * 50)
+
+    if not state.worker_tasks:
+        print("No assigned worker tasks found. Skipping code collection.")
+        return state
+
+    roles = _pending_workers(state)
+    results = await gather_bounded(
+        lambda item: adynamic_worker(worker_messages(state, *item), item[0]), roles, CODEGEN_CONCURRENCY
+    )
+    return _merge_generated_code(state, roles, results)
@@ -1,51 +1,58 @@
-from langchain_core.messages import HumanMessage, SystemMessage
 from software_life_cycle.state.state import SoftwareLifecycle
 from typing import Literal
-from software_life_cycle.LLM.llm import llm_docs
+from software_life_cycle.LLM.router import RoutedClient
+from software_life_cycle.utils.prompts import assemble
+from software_life_cycle.utils.streaming import astream_completion, stream_completion
 
-#step 4: create design document for functional and technical
-def create_design_doc(state: SoftwareLifecycle) -> SoftwareLifecycle:
-    """Generate a revised design document based on user stories and design feedback."""
-    #print("*" * 50 + " GENERATING DESIGN DOCUMENT " + "*" * 50)
-
-    if not state.user_stories:
-        print("User stories missing. Cannot generate design document.")
-        return state
+llm = RoutedClient("create_design_doc")
 
-    # Base prompt
-    base_content = "\n".join([
+#step 4: create design document for functional and technical
+def design_doc_messages(state: SoftwareLifecycle) -> list:
+    """Builds the design document prompt from the user stories and design feedback."""
+    instructions = "\n".join([
         "# Design Document Template",
         "",
-        "Create a detailed design document for these user stories:",
-        state.user_stories,
+        "Create a detailed design document for the user stories below.",
         "",
         "## Important Rules",
         "- Do not include any testing sections",
         "- Do not include error handling unless explicitly requested",
         "- Use markdown formatting",
-        "",
-
     ])
 
     # Add feedback if available
+    feedback = []
     if hasattr(state, 'design_feedback') and state.design_feedback != "No design feedback yet.":
-        base_content += "\n\n## Previous Feedback\n" + state.design_feedback
-        base_content += "\n\nEnsure all feedback is incorporated and remove any mentioned sections."
+        feedback = [("Previous Feedback", state.design_feedback
+                     + "\n\nEnsure all feedback is incorporated and remove any mentioned sections.")]
 
-    messages = [
-        SystemMessage(content="\n".join([
+    return assemble(
+        "\n".join([
             "You are a software architect creating clear, structured design documents.",
             "Focus on practical, implementable designs.",
             "Use markdown formatting for better readability.",
             "Strictly follow the requested sections only.",
             "Remove any sections mentioned in feedback."
-        ])),
-        HumanMessage(content=base_content)
-    ]
+        ]),
+        instructions=instructions,
+        context=[("User Stories", state.user_stories)],
+        tail=feedback,
+    )
+
+
+def create_design_doc(state: SoftwareLifecycle) -> SoftwareLifecycle:
+    """Generate a revised design document based on user stories and design feedback."""
+    #print("*" * 50 + " GENERATING DESIGN DOCUMENT " + "*" * 50)
+
+    if not state.user_stories:
+        print("User stories missing. Cannot generate design document.")
+        return state
+
+    messages = design_doc_messages(state)
 
     try:
         # Generate design document
-        revised_design = llm_docs.invoke(messages).content
+        revised_design = stream_completion(llm, messages, "create_design_doc")
         print("Design Document Generated!")
 
         # Store the updated design document
@@ -59,6 +66,27 @@ def create_design_doc(state: SoftwareLifecycle) -> SoftwareLifecycle:
         return state
 
 
+async def acreate_design_doc(state: SoftwareLifecycle) -> SoftwareLifecycle:
+    """Async variant of `create_design_doc`."""
+    if not state.user_stories:
+        print("User stories missing. Cannot generate design document.")
+        return state
+
+    messages = design_doc_messages(state)
+
+    try:
+        revised_design = await astream_completion(llm, messages, "create_design_doc")
+        print("Design Document Generated!")
+        return state.model_copy(update={
+            "design_documents": revised_design,
+            "design_attempt": getattr(state, 'design_attempt', 0) + 1
+        })
+
+    except Exception as e:
+        print(f"\nError generating design document: {str(e)}")
+        return state
+
+
 #step 5: create a design review
 def design_review(state: SoftwareLifecycle) -> SoftwareLifecycle:
   """Review design documents and approve or reject them."""
@@ -69,6 +97,10 @@ def design_route(state: SoftwareLifecycle) -> Literal["orchestrate_code_generati
     """LLM decision determines if the design is accepted or needs revision."""
     #print("*" * 50 + " DESIGN REVIEW " + "*" * 50)
 
+    if state.design_decision:
+        print(f"Design decision from API: {state.design_decision}")
+        return "orchestrate_code_generation" if state.design_decision == "approve" else "create_design_doc"
+
     while True:
         feedback = input("Approve the design? (yes/no): ").strip().lower()
 
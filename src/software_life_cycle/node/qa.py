@@ -1,13 +1,22 @@
+import asyncio
 from typing import Literal
-from software_life_cycle.state.state import SoftwareLifecycle
+from software_life_cycle.state.state import QACaseResult, SoftwareLifecycle
 from typing import Literal
 from langgraph.graph import END
-from langchain_core.messages import HumanMessage, SystemMessage
 from software_life_cycle.node.file_saver import save_final_outputs
-from software_life_cycle.LLM.llm import llm_coder
+from software_life_cycle.LLM.router import RoutedClient
 from software_life_cycle.utils.batching import chunk_generated_code
+from software_life_cycle.utils.tokens import count_tokens
+from software_life_cycle.utils.chunk_executor import ainvoke_chunks, invoke_chunks
+from software_life_cycle.utils.feedback import record_feedback
+from software_life_cycle.utils.prompts import assemble
+from software_life_cycle.utils.sandbox import get_qa_cache, run_test_suite
+from software_life_cycle.utils.verdicts import (
+    QAVerdict, aparse_verdicts, combined_decision, format_instructions, parse_verdicts, verdict_text,
+)
 import json
 
+llm = RoutedClient("qa_testing")
 
 
 # def chunk_generated_code(data, token_limit: int = 5500) -> list:
@@ -58,18 +67,11 @@ import json
 
 # Step 11: QA Testing
 
-def qa_testing(state: SoftwareLifecycle) -> SoftwareLifecycle:
-    """AI executes test cases on the generated code and determines if any failures occur."""
-    print("*" * 50 + f" AI QA TESTING (Attempt {state.qa_attempts + 1}/3) " + "*" * 50)
-
-    if not state.generated_code or not state.test_cases:
-        print("Missing generated code or test cases. Skipping QA Testing.")
-        return state
-
+def qa_messages(state: SoftwareLifecycle) -> list:
+    """Builds one QA prompt per code chunk, sizing chunks to leave room for the test cases and feedback."""
     # Estimate token size of test cases and feedback
-    estimated_token = lambda text: len(str(text)) // 4
-    test_case_tokens = estimated_token(state.test_cases)
-    feedback_tokens = estimated_token(state.feedback)
+    test_case_tokens = count_tokens(state.test_cases, llm.model_name)
+    feedback_tokens = count_tokens(state.feedback, llm.model_name)
 
     total_available = 6000
     reserved = test_case_tokens + feedback_tokens + 1000  # 1000 extra for prompt, instructions, metadata
@@ -78,61 +80,109 @@ def qa_testing(state: SoftwareLifecycle) -> SoftwareLifecycle:
     print(f"📏 Test case tokens: {test_case_tokens}, Feedback tokens: {feedback_tokens}")
     print(f"🧮 Using token limit {code_token_limit} for each code chunk")
 
-    code_chunks = chunk_generated_code(state.generated_code, token_limit=code_token_limit)
-    combined_feedback = []
+    code_chunks = chunk_generated_code(state.generated_code, token_limit=code_token_limit, model=llm.model_name)
+
+    feedback = ""
+    if state.feedback.strip():
+        feedback = f"{state.feedback}\n\nEnsure previous issues are re-validated in this batch."
 
+    # The test cases and feedback are the same for every batch, so they precede the code
+    chunk_messages = []
     for idx, chunk in enumerate(code_chunks):
         code_str = json.dumps(chunk, indent=2) if isinstance(chunk, dict) else chunk
+        chunk_messages.append(assemble(
+            "You're a senior QA engineer running test suites on submitted code.",
+            instructions="You are a QA automation engineer. Execute the test cases below on the code chunk "
+                         "and report the result.\n\n" + format_instructions(QAVerdict),
+            context=[("Test Cases", state.test_cases), ("Previous QA Feedback", feedback)],
+            tail=[(f"Code (Batch {idx+1})", code_str)],
+        ))
+
+    return chunk_messages
+
 
-        prompt_content = f"""
-                You are a QA automation engineer. Execute the following test cases on this code 
-                chunk (Batch {idx+1}) and report the result.
-
-                ### Test Cases:
-                {state.test_cases}
-
-                ### Code:
-                {code_str}
-                """
-
-        if state.feedback.strip():
-            prompt_content += f"""
-                        ### Previous QA Feedback:
-                        {state.feedback}
-
-                        Ensure previous issues are re-validated in this batch.
-                        """
-
-        messages = [
-            SystemMessage(content="You're a senior QA engineer running test suites on submitted code."),
-            HumanMessage(content=prompt_content + """
-                                    **Response Format:**
-                                    - Decision: ('pass' or 'fail')
-                                    - Feedback: Bullet points on failures or confirmations of success.
-                                    """)
-                                            ]
-
-        try:
-            response = llm_coder.invoke(messages).content.strip()
-            print(f" QA Test Result for Chunk {idx+1}")
-            combined_feedback.append(f"[Batch {idx+1} QA Result]:\n{response}")
-        except Exception as e:
-            print(f" Error during QA test for chunk {idx+1}: {e}")
-            combined_feedback.append(f"[Batch {idx+1}]: ERROR during QA test")
+def apply_qa_results(state: SoftwareLifecycle, verdicts: list) -> SoftwareLifecycle:
+    """Combines the chunk QA verdicts into the pass/fail decision and feedback log."""
+    combined_feedback = [
+        f"[Batch {idx+1} QA Result]:\n{verdict_text(verdict)}" for idx, verdict in enumerate(verdicts)
+    ]
 
     final_feedback = "\n\n".join(combined_feedback)
     print(f" Final QA Decision:\n{final_feedback}")
 
-    decision = "fail" if any("fail" in fb.lower() for fb in combined_feedback) else "pass"
-    updated_feedback = state.feedback + f"\n[QA Testing]: {final_feedback}"
+    decision = combined_decision(verdicts, "pass", "fail")
+
+    return state.model_copy(update={
+        "qa_test_result": decision,
+        **record_feedback(state, "qa_testing", state.qa_attempts + 1, final_feedback),
+        "qa_attempts": state.qa_attempts + 1
+    })
+
+
+def apply_execution_report(state: SoftwareLifecycle, report: dict) -> SoftwareLifecycle:
+    """Turns the executed test results into the pass/fail decision and feedback log."""
+    results, summary = report["results"], report["summary"]
+    problems = [result for result in results if result["outcome"] in ("failed", "error", "timeout")]
+    decision = "pass" if summary["passed"] and not problems else "fail"
+
+    lines = [
+        f"Decision: {decision}",
+        f"Ran {summary['total']} tests: {summary['passed']} passed, {summary['failed']} failed, "
+        f"{summary['error']} errors, {summary['timeout']} timed out, {summary['skipped']} skipped "
+        f"({summary['files']} files in {summary['shards']} shards, {summary['cached_files']} from cache)",
+    ]
+    lines += [
+        f"- {result['test']} [{result['outcome']}]: {(result['message'].splitlines() or [''])[0]}"
+        for result in problems
+    ]
+    final_feedback = "\n".join(lines)
+    print(f" Final QA Decision:\n{final_feedback}")
 
     return state.model_copy(update={
         "qa_test_result": decision,
-        "feedback": updated_feedback,
+        "qa_results": [QACaseResult(**result) for result in results],
+        "qa_summary": summary,
+        **record_feedback(state, "qa_testing", state.qa_attempts + 1, final_feedback),
         "qa_attempts": state.qa_attempts + 1
     })
 
 
+def qa_testing(state: SoftwareLifecycle) -> SoftwareLifecycle:
+    """Runs the generated test cases against the generated code in the QA sandbox.
+    Falls back to an LLM review when there are no runnable Python tests."""
+    print("*" * 50 + f" QA TESTING (Attempt {state.qa_attempts + 1}/3) " + "*" * 50)
+
+    if not state.generated_code or not state.test_cases:
+        print("Missing generated code or test cases. Skipping QA Testing.")
+        return state
+
+    report = run_test_suite(state.generated_code, state.test_cases, cache=get_qa_cache())
+    if report is not None:
+        return apply_execution_report(state, report)
+
+    print("No runnable Python test cases found. Falling back to LLM QA review.")
+    messages = qa_messages(state)
+    responses = invoke_chunks(llm, messages, "QA test")
+    return apply_qa_results(state, parse_verdicts(llm, QAVerdict, responses, "QA test", llm.escalation, messages))
+
+
+async def aqa_testing(state: SoftwareLifecycle) -> SoftwareLifecycle:
+    """Async variant of `qa_testing`; the pytest processes are awaited from a worker thread."""
+    print("*" * 50 + f" QA TESTING (Attempt {state.qa_attempts + 1}/3) " + "*" * 50)
+
+    if not state.generated_code or not state.test_cases:
+        print("Missing generated code or test cases. Skipping QA Testing.")
+        return state
+
+    report = await asyncio.to_thread(run_test_suite, state.generated_code, state.test_cases, cache=get_qa_cache())
+    if report is not None:
+        return apply_execution_report(state, report)
+
+    print("No runnable Python test cases found. Falling back to LLM QA review.")
+    messages = qa_messages(state)
+    responses = await ainvoke_chunks(llm, messages, "QA test")
+    return apply_qa_results(state, await aparse_verdicts(llm, QAVerdict, responses, "QA test", llm.escalation, messages))
+
 
 def qa_test_route(state: SoftwareLifecycle) -> Literal["END", "orchestrate_code_generation"]:
     """Routes based on QA test results: Pass -> Save Files & END, Fail -> Fix Code."""
@@ -1,9 +1,16 @@
 from typing import Literal
-from langchain_core.messages import HumanMessage, SystemMessage
 from software_life_cycle.state.state import SoftwareLifecycle
-from software_life_cycle.LLM.llm import llm_coder
+from software_life_cycle.LLM.router import RoutedClient
 from langgraph.graph import END
 from software_life_cycle.utils.batching import chunk_generated_code
+from software_life_cycle.utils.chunk_executor import ainvoke_chunks, invoke_chunks
+from software_life_cycle.utils.prompts import assemble
+from software_life_cycle.utils.verdicts import (
+    UnitTestReviewVerdict, aparse_verdicts, combined_decision, format_instructions, parse_verdicts, verdict_text,
+)
+
+llm = RoutedClient("generate_test_cases")
+review_llm = RoutedClient("review_test_cases")
 
 
 # def chunk_generated_code(data, token_limit: int = 5500) -> list:
@@ -53,6 +60,55 @@ from software_life_cycle.utils.batching import chunk_generated_code
 
 
 #step 9: testcase geenration
+def unit_test_messages(state: SoftwareLifecycle) -> list:
+    """Builds one test generation prompt per code chunk."""
+    # Chunk the generated code to avoid token overflow
+    chunks = chunk_generated_code(state.generated_code, token_limit=5500, model=llm.model_name)
+
+    feedback = ""
+    if state.test_case_feedback.strip() and state.test_case_feedback != "No test case feedback yet.":
+        print("THE REVIEW AND THE CHANGES:")
+        print(state.test_case_feedback)
+        feedback = (f"{state.test_case_feedback}\n\n"
+                    "Ensure missing test cases are added and existing ones are refined.")
+
+    instructions = "\n".join([
+        "**Instructions:**",
+        "Generate executable unit test cases for the code chunk below. "
+        "Use `pytest` or `unittest` conventions depending on the language. Include:",
+        "- Well-structured, named test functions",
+        "- Edge case coverage",
+        "- Error handling validation",
+        "",
+        "**Response Format:**",
+        "- ### Decision: approve/revise",
+        "- ### Feedback:",
+        "- Bullet points listing improvements (if any)",
+        "- ### Structured Unit Test Code:",
+    ])
+
+    return [
+        assemble(
+            "You are a senior software engineer. Your task is to create structured unit test cases.",
+            instructions=instructions,
+            context=[("Test Case Feedback From Previous Reviews", feedback)],
+            tail=[(f"Code Chunk (Batch {idx+1})", chunk)],
+        )
+        for idx, chunk in enumerate(chunks)
+    ]
+
+
+def apply_test_cases(state: SoftwareLifecycle, responses: list) -> SoftwareLifecycle:
+    """Stores the combined test cases generated for all chunks."""
+    test_case_results = [response for response in responses if response is not None]
+
+    combined_test_case_response = "\n\n".join(test_case_results)
+
+    # Store structured test cases in state
+    state = state.model_copy(update={"test_cases": combined_test_case_response})
+    return state
+
+
 def generate_test_cases(state: SoftwareLifecycle) -> SoftwareLifecycle:
     """Generates structured test cases based on requirements and previous feedback."""
     print("*" * 50 + " TEST CASE GENERATION " + "*" * 50)
@@ -61,92 +117,65 @@ def generate_test_cases(state: SoftwareLifecycle) -> SoftwareLifecycle:
         print("No generated code available. Skipping test case generation.")
         return state
 
-    # Chunk the generated code to avoid token overflow
-    chunks = chunk_generated_code(state.generated_code, token_limit=5500)
-    test_case_results = []
-
-    for idx, chunk in enumerate(chunks):
-        prompt_content = f"Generate structured test cases for the following code chunk (Batch {idx+1}):\n{chunk}\n\n"
-        
-        if state.test_case_feedback.strip() and state.test_case_feedback != "No test case feedback yet.":
-            print("THE REVIEW AND THE CHANGES:")
-            print(state.test_case_feedback)
-            prompt_content += f"Additionally, apply the following **test case feedback** from previous reviews:\n{state.test_case_feedback}\n\n"
-            prompt_content += "Ensure missing test cases are added and existing ones are refined."
-
-        messages = [
-            SystemMessage(content="You are a senior software engineer. Your task is to create structured unit test cases."),
-            HumanMessage(content=prompt_content + """
-                                **Instructions:**
-                                Generate executable unit test cases for the above code. Use `pytest` or `unittest` conventions depending on the language. Include:
-                                - Well-structured, named test functions
-                                - Edge case coverage
-                                - Error handling validation
-
-                                **Response Format:**
-                                - ### Decision: approve/revise
-                                - ### Feedback:
-                                - Bullet points listing improvements (if any)
-                                - ### Structured Unit Test Code:"""
-                                )
-        ]
-
-        response = llm_coder.invoke(messages).content.strip()
-        print(f" Test Cases Generated for Chunk {idx+1}")
-        test_case_results.append(response)
+    responses = invoke_chunks(llm, unit_test_messages(state), "Test case generation")
+    return apply_test_cases(state, responses)
 
-    combined_test_case_response = "\n\n".join(test_case_results)
 
-    # Store structured test cases in state
-    state = state.model_copy(update={"test_cases": combined_test_case_response})
-    return state
+async def agenerate_test_cases(state: SoftwareLifecycle) -> SoftwareLifecycle:
+    """Async variant of `generate_test_cases`."""
+    print("*" * 50 + " TEST CASE GENERATION " + "*" * 50)
 
+    if not state.generated_code:
+        print("No generated code available. Skipping test case generation.")
+        return state
 
-#step 10: testcase review code
+    responses = await ainvoke_chunks(llm, unit_test_messages(state), "Test case generation")
+    return apply_test_cases(state, responses)
 
-def review_test_cases(state: SoftwareLifecycle) -> SoftwareLifecycle:
-    """AI reviews the generated test cases and decides whether to approve or request changes."""
-    print("*" * 50 + f" AI TEST CASE REVIEW (Attempt {state.test_review_attempt + 1}/3) " + "*" * 50)
 
-    if not state.test_cases:
-        print(" No test cases available for review.")
-        return state
+#step 10: testcase review code
 
+def unit_test_review_messages(state: SoftwareLifecycle) -> list:
+    """Builds one review prompt per chunk of the generated test cases."""
     # Convert test cases string into a dict-like structure so we can chunk it
     fake_code_dict = {"test_cases": state.test_cases}
-    chunks = chunk_generated_code(fake_code_dict, token_limit=5500)
-
-    all_feedback = []
-
+    chunks = chunk_generated_code(fake_code_dict, token_limit=5500, model=review_llm.model_name)
+
+    instructions = "\n".join([
+        "**Review Criteria:**",
+        "✅ Completeness (Do test cases cover all functionalities?)",
+        "✅ Correctness (Are expected results correct?)",
+        "✅ Edge Cases (Are boundary conditions tested?)",
+        "✅ Security (Do test cases validate security concerns?)",
+        "",
+        "Keep each issue extremely concise and clear.",
+        "",
+        format_instructions(UnitTestReviewVerdict),
+    ])
+
+    chunk_messages = []
     for i, chunk in enumerate(chunks):
-        print(f" Sending chunk {i+1}/{len(chunks)} to LLM...")
+        print(f" Preparing chunk {i+1}/{len(chunks)} for LLM review...")
         chunk_content = "\n\n".join(str(v) for v in chunk.values())
+        chunk_messages.append(assemble(
+            "You are a senior QA engineer. Your task is to review the generated test cases.",
+            instructions=instructions,
+            tail=[(f"Test Cases (Chunk {i+1})", chunk_content)],
+        ))
+
+    return chunk_messages
+
 
-        messages = [
-            SystemMessage(content="You are a senior QA engineer. Your task is to review the generated test cases."),
-            HumanMessage(content=f"""Here are the test cases (Chunk {i+1}):\n{chunk_content}\n\n
-                                    **Review Criteria:**
-                                    ✅ Completeness (Do test cases cover all functionalities?)
-                                    ✅ Correctness (Are expected results correct?)
-                                    ✅ Edge Cases (Are boundary conditions tested?)
-                                    ✅ Security (Do test cases validate security concerns?)
-
-                                    **Response Format:**
-                                    - Decision: ('approve' or 'revise')
-                                    - Feedback: Bullet points explaining necessary improvements, 
-                                      make sure to keep the feedback extremely concise and clear
-                                    """)
-        ]
-
-        response = llm_coder.invoke(messages).content.strip()
-        all_feedback.append(f"[Chunk {i+1} Review]: {response}")
+def apply_test_review(state: SoftwareLifecycle, verdicts: list) -> SoftwareLifecycle:
+    """Combines the chunk verdicts into the test review decision and feedback."""
+    all_feedback = [f"[Chunk {i+1} Review]: {verdict_text(verdict)}" for i, verdict in enumerate(verdicts)]
 
     full_review = "\n\n".join(all_feedback)
     print(f"🔍 LLM Combined Test Case Review:\n{full_review}")
 
     # Append review to feedback
     updated_test_case_feedback = state.test_case_feedback + f"\n[Test Case Review]: {full_review}"
-    decision = "revise" if any("revise" in fb.lower() for fb in all_feedback) else "approve"
+    decision = combined_decision(verdicts, "approve", "revise")
 
     return state.model_copy(update={
         "test_review_feedback": decision,
@@ -155,6 +184,36 @@ def review_test_cases(state: SoftwareLifecycle) -> SoftwareLifecycle:
     })
 
 
+def review_test_cases(state: SoftwareLifecycle) -> SoftwareLifecycle:
+    """AI reviews the generated test cases and decides whether to approve or request changes."""
+    print("*" * 50 + f" AI TEST CASE REVIEW (Attempt {state.test_review_attempt + 1}/3) " + "*" * 50)
+
+    if not state.test_cases:
+        print(" No test cases available for review.")
+        return state
+
+    messages = unit_test_review_messages(state)
+    responses = invoke_chunks(review_llm, messages, "Test case review")
+    verdicts = parse_verdicts(review_llm, UnitTestReviewVerdict, responses, "Test case review", review_llm.escalation, messages)
+    return apply_test_review(state, verdicts)
+
+
+async def areview_test_cases(state: SoftwareLifecycle) -> SoftwareLifecycle:
+    """Async variant of `review_test_cases`."""
+    print("*" * 50 + f" AI TEST CASE REVIEW (Attempt {state.test_review_attempt + 1}/3) " + "*" * 50)
+
+    if not state.test_cases:
+        print(" No test cases available for review.")
+        return state
+
+    messages = unit_test_review_messages(state)
+    responses = await ainvoke_chunks(review_llm, messages, "Test case review")
+    verdicts = await aparse_verdicts(
+        review_llm, UnitTestReviewVerdict, responses, "Test case review", review_llm.escalation, messages,
+    )
+    return apply_test_review(state, verdicts)
+
+
 def test_case_review_route(state: SoftwareLifecycle) -> Literal["qa_testing", "generate_test_cases"]:
     """Route based on test case review."""
     print("*" * 50 + " TEST CASE REVIEW DECISION " + "*" * 50)
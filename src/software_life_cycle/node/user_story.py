@@ -1,7 +1,10 @@
-from langchain_core.messages import HumanMessage, SystemMessage
 from software_life_cycle.state.state import SoftwareLifecycle
-from software_life_cycle.LLM.llm import llm
+from software_life_cycle.LLM.router import RoutedClient
 from typing import Literal
+from software_life_cycle.utils.prompts import assemble
+from software_life_cycle.utils.streaming import astream_completion, stream_completion
+
+llm = RoutedClient("auto_gen_us")
 
 # Step 1: taking the input from the user
 def input_requirements(state: SoftwareLifecycle) -> SoftwareLifecycle:
@@ -13,11 +16,9 @@ def input_requirements(state: SoftwareLifecycle) -> SoftwareLifecycle:
 
 
 # Step 2: making the user stories
-def auto_gen_us(state: SoftwareLifecycle) -> SoftwareLifecycle:
-    """Generate user stories with feedback incorporation"""
-    #print("\n" + "=" * 20 + " USER STORY GENERATION " + "=" * 20)
-
-    base_prompt = [
+def user_story_messages(state: SoftwareLifecycle) -> list:
+    """Builds the user story prompt, including product owner feedback when present."""
+    instructions = "\n".join([
         "Generate a detailed user story with:",
         "1. User Story (As a [role], I want [feature], so that [benefit])",
         "2. Acceptance Criteria (numbered list)",
@@ -26,38 +27,45 @@ def auto_gen_us(state: SoftwareLifecycle) -> SoftwareLifecycle:
         "   - User input errors",
         "   - Network/resource errors",
         "4. Definition of Done",
-        f"\nRequirements: {state.requirements}"
-    ]
+    ])
+    revision = []
 
     if state.user_stories_feedback != "No user story feedback yet.":
         feedback = state.user_stories_feedback
         if "reject:" in feedback:
             feedback = feedback.replace("reject:", "").strip()
             print(f"Processing Feedback: {feedback}")
-            
-            base_prompt.extend([
-                "\nPrevious Story:",
-                state.user_stories,
-                "\nFeedback to address:",
-                feedback,
-                "\nRevision Guidelines:",
-                "1. Address the feedback completely",
-                "2. Maintain existing good elements",
-                "3. Include specific error scenarios",
-                "4. Ensure measurable acceptance criteria"
-            ])
-
-    messages = [
-        SystemMessage(content="\n".join([
+
+            revision = [
+                ("Previous Story", state.user_stories),
+                ("Feedback to address", feedback),
+                ("Revision Guidelines", "\n".join([
+                    "1. Address the feedback completely",
+                    "2. Maintain existing good elements",
+                    "3. Include specific error scenarios",
+                    "4. Ensure measurable acceptance criteria"
+                ])),
+            ]
+
+    return assemble(
+        "\n".join([
             "You are an expert Agile coach specializing in user story creation.",
             "Focus on creating comprehensive stories with error handling.",
             "Each revision should improve upon the previous version."
-        ])),
-        HumanMessage(content="\n".join(base_prompt))
-    ]
+        ]),
+        instructions=instructions,
+        context=[("Requirements", state.requirements)],
+        tail=revision,
+    )
+
+
+def auto_gen_us(state: SoftwareLifecycle) -> SoftwareLifecycle:
+    """Generate user stories with feedback incorporation"""
+    #print("\n" + "=" * 20 + " USER STORY GENERATION " + "=" * 20)
+    messages = user_story_messages(state)
 
     try:
-        revised_story = llm.invoke(messages).content
+        revised_story = stream_completion(llm, messages, "auto_gen_us")
         #print("\nGenerated User Story:\n")
         #print(revised_story)
 
@@ -73,6 +81,23 @@ def auto_gen_us(state: SoftwareLifecycle) -> SoftwareLifecycle:
         })
 
 
+async def aauto_gen_us(state: SoftwareLifecycle) -> SoftwareLifecycle:
+    """Async variant of `auto_gen_us`."""
+    messages = user_story_messages(state)
+
+    try:
+        revised_story = await astream_completion(llm, messages, "auto_gen_us")
+        return state.model_copy(update={
+            "user_stories": revised_story,
+            "feedback": "Story generated successfully"
+        })
+    except Exception as e:
+        print(f"Error in story generation: {e}")
+        return state.model_copy(update={
+            "feedback": f"Error in story generation: {str(e)}"
+        })
+
+
 # Step 3: Product owner review (manual CLI feedback)
 def product_owner_review(state: SoftwareLifecycle) -> SoftwareLifecycle:
     """Handle product owner review process"""
@@ -83,6 +108,10 @@ def product_routing_cond(state: SoftwareLifecycle) -> Literal["create_design_doc
     print("*" * 50 + " PRODUCT OWNER ROUTING " + "*" * 50)
     #print(f"Current User Story: {state.user_stories}")
 
+    if state.product_owner_decision:
+        print(f"Product owner decision from API: {state.product_owner_decision}")
+        return "create_design_doc" if state.product_owner_decision == "approve" else "auto_gen_us"
+
     while True:
         feedback = input("Do you approve the user story? (yes/no): ").strip().lower()
 
@@ -1,6 +1,22 @@
 import pydantic
 from pydantic import BaseModel, Field
-from typing import Dict, Literal, Optional
+from typing import Dict, List, Literal, Optional
+
+
+class FeedbackEntry(BaseModel):
+    """One review/QA verdict recorded in the feedback log."""
+    phase: str
+    attempt: int = 0
+    content: str = ""
+    generation: int = 0  # code generation round the verdict was given for
+
+
+class QACaseResult(BaseModel):
+    """Outcome of one executed test case."""
+    test: str
+    outcome: Literal["passed", "failed", "error", "skipped", "timeout"]
+    message: str = ""
+    duration: float = 0.0
 
 
 class SoftwareLifecycle(BaseModel):
@@ -8,7 +24,13 @@ class SoftwareLifecycle(BaseModel):
     user_stories: str = None
     design_documents: str = None
     worker_tasks: Dict[str, str] = None
+    worker_roles: List[str] = Field(default_factory=list)
+    worker_roles_design_hash: str = ""
+    roles_to_regenerate: List[str] = Field(default_factory=list)
+    code_generation_round: int = 0
     generated_code: Dict[str, str] = None
+    syntax_errors: List[str] = Field(default_factory=list)
+    syntax_check_attempt: int = 0
     code_review_feedback: Literal["approve", "revise"] = "revise"
     code_review_attempt: int = 0
     security_feedback: Literal["secure", "fix"] = "fix"
@@ -16,13 +38,19 @@ class SoftwareLifecycle(BaseModel):
     test_review_attempt: int = 0
     test_cases: str = None
     feedback: str = "No feedback yet."
+    feedback_log: List[FeedbackEntry] = Field(default_factory=list)
     test_review_feedback: Literal["approve", "revise"] = "revise"
     qa_test_result: Literal["pass", "fail"] = "fail"
     qa_attempts: int = 0
+    qa_results: List[QACaseResult] = Field(default_factory=list)
+    qa_summary: Dict[str, int] = Field(default_factory=dict)
     design_attempt: int = Field(default=0)
     design_feedback: str = Field(default="No design feedback yet.")
     status: str = Field(default="pending")
     user_stories_feedback: str = Field(default="")
+    # Review decisions supplied through the API ("approve"/"reject"); empty means ask on the CLI
+    product_owner_decision: str = ""
+    design_decision: str = ""
     test_case_feedback: str = "No test case feedback yet."
     finale_code: Optional[str] = Field(default="")
     final_test_cases: Optional[str] = Field(default="")
@@ -1,9 +1,11 @@
 import streamlit as st
 import requests
 import logging
-import ast
 import json
 from datetime import datetime
+from software_life_cycle.api.events import (
+    EVENT_SCHEMA_VERSION, ERROR, NODE_END, NODE_START, REVIEW, TOKEN, apply_event, changed_fields, iter_events,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -31,48 +33,61 @@ def display_streamed_output(response):
     output_container = st.empty()
     full_output = ""
     needs_review = False
+    token_source = None
+    workflow_state = {}
 
     try:
-        for line in response.iter_lines():
-            if line:
-                decoded = line.decode("utf-8")
-                logger.debug(f"Received line: {decoded}")
-                
-                try:
-                    data = ast.literal_eval(decoded)
-                    
-                    # Handle user story generation
-                    if 'auto_gen_us' in data:
-                        new_story = data['auto_gen_us']['user_stories']
-                        st.session_state.last_generated_story = new_story
-                        st.session_state.workflow_stage = "story_generated"
-                        logger.debug(f"New user story generated: {new_story}")
-                    
-                    # Handle product owner review
-                    if 'product_owner_review' in data:
-                        needs_review = True
-                        user_stories = data['product_owner_review']['user_stories']
-                        logger.debug(f"Updating user stories to: {user_stories}")
-                        
-                        st.session_state.update({
-                            "current_user_stories": user_stories,
-                            "show_feedback_form": True,
-                            "product_owner_review": True,
-                            "workflow_stage": "awaiting_review"
-                        })
-                        
-                        # Track history
-                        st.session_state.feedback_history.append({
-                            'story': user_stories,
-                            'iteration': st.session_state.feedback_iteration,
-                            'timestamp': str(datetime.now())
-                        })
-                        
-                except (ValueError, SyntaxError) as e:
-                    logger.debug(f"Not JSON data: {e}")
-                
-                full_output += decoded + "\n"
-                output_container.code(full_output, language="text")
+        for event in iter_events(response.iter_lines()):
+            logger.debug(f"Received event: {event['type']} #{event['seq']}")
+            if event.get("v") != EVENT_SCHEMA_VERSION:
+                logger.warning(f"Unexpected event schema version: {event.get('v')}")
+            st.session_state.workflow_id = event.get("workflow_id")
+            # Node updates only carry what changed; rebuild the full state from them
+            workflow_state = apply_event(workflow_state, event)
+
+            if event["type"] == TOKEN:
+                if event["source"] != token_source:
+                    token_source = event["source"]
+                    full_output += f"\n── {token_source} ──\n"
+                full_output += event["text"]
+
+            elif event["type"] == NODE_START:
+                full_output += f"\n▶ {event['node']}\n"
+
+            elif event["type"] == NODE_END:
+                token_source = None
+                full_output += f"\n✔ {event['node']}\n"
+                # Handle user story generation
+                if event["node"] == "auto_gen_us" and "user_stories" in changed_fields(event):
+                    new_story = workflow_state["user_stories"]
+                    st.session_state.last_generated_story = new_story
+                    st.session_state.workflow_stage = "story_generated"
+                    logger.debug(f"New user story generated: {new_story}")
+
+            # Handle product owner review
+            elif event["type"] == REVIEW and event["node"] == "product_owner_review":
+                needs_review = True
+                user_stories = event["user_stories"]
+                logger.debug(f"Updating user stories to: {user_stories}")
+
+                st.session_state.update({
+                    "current_user_stories": user_stories,
+                    "show_feedback_form": True,
+                    "product_owner_review": True,
+                    "workflow_stage": "awaiting_review"
+                })
+
+                # Track history
+                st.session_state.feedback_history.append({
+                    'story': user_stories,
+                    'iteration': st.session_state.feedback_iteration,
+                    'timestamp': str(datetime.now())
+                })
+
+            elif event["type"] == ERROR:
+                st.error(f"Workflow error: {event['detail']}")
+
+            output_container.code(full_output, language="text")
 
         if needs_review and st.session_state.workflow_stage == "awaiting_review":
             logger.debug(f"Story review needed. Iteration: {st.session_state.feedback_iteration}")
@@ -126,6 +141,7 @@ def collect_user_story_feedback():
     
     # Return consistent feedback structure
     feedback_data = {
+        "workflow_id": st.session_state.workflow_id,
         "approved": approval == "Yes",
         "feedback": feedback_text if approval == "No" else "",
         "user_stories_feedback": "Approved" if approval == "Yes" else f"reject: {feedback_text}",
@@ -1,44 +1,109 @@
-def chunk_generated_code(data, token_limit: int = 5500) -> list:
+import re
+from software_life_cycle.utils.tokens import count_tokens
+
+# Lines where a new top-level unit starts (code definitions, fences, markdown headings)
+_TOP_LEVEL_BOUNDARY = re.compile(r"^(?:@|def |async def |class |function |export |func |```|#{1,6} )")
+# Lines where a nested unit (method, inner function) starts
+_NESTED_BOUNDARY = re.compile(r"^\s+(?:@|def |async def |class |function |public |private |protected )")
+_BOUNDARIES = [_TOP_LEVEL_BOUNDARY, _NESTED_BOUNDARY]
+
+# Tokens taken by the JSON key, quotes and separators around each role entry
+ENTRY_OVERHEAD_TOKENS = 8
+
+
+def _segment(lines: list, boundary) -> list:
+    """Groups lines into segments that each start at a boundary line,
+    keeping decorators attached to the definition below them."""
+    segments, current = [], []
+    for line in lines:
+        if current and boundary.match(line):
+            previous = next((l for l in reversed(current) if l.strip()), "")
+            if not previous.lstrip().startswith("@"):
+                segments.append(current)
+                current = []
+        current.append(line)
+    if current:
+        segments.append(current)
+    return segments
+
+
+def _pieces(lines: list, token_limit: int, model, level: int = 0) -> list:
+    """Recursively splits lines at top-level, then nested boundaries, then single lines,
+    until every piece fits in `token_limit`."""
+    text = "".join(lines)
+    if len(lines) == 1 or count_tokens(text, model) <= token_limit:
+        return [text]
+    if level == len(_BOUNDARIES):
+        return list(lines)
+
+    pieces = []
+    for segment in _segment(lines, _BOUNDARIES[level]):
+        pieces.extend(_pieces(segment, token_limit, model, level + 1))
+    return pieces
+
+
+def split_at_code_boundaries(text: str, token_limit: int, model: str = None) -> list:
+    """
+    Splits a single oversized text into consecutive parts of at most `token_limit` tokens.
+    - Prefers function/class/heading boundaries so definitions stay whole.
+    - Falls back to line boundaries only inside a definition that is itself too large.
+    """
+    pieces = _pieces(text.splitlines(keepends=True), token_limit, model)
+
+    parts, current, current_tokens = [], "", 0
+    for piece in pieces:
+        tokens = count_tokens(piece, model)
+        if current and current_tokens + tokens > token_limit:
+            parts.append(current)
+            current, current_tokens = "", 0
+        current += piece
+        current_tokens += tokens
+    if current:
+        parts.append(current)
+    return [part.rstrip("\n") for part in parts if part.strip()]
+
+
+def chunk_generated_code(data, token_limit: int = 5500, model: str = None) -> list:
     """
     Splits a dictionary or string into chunks based on token limits.
-    - For `dict`, splits by key-value.
-    - For `str`, splits by lines.
+    - For `dict`, packs key-value entries into as few chunks as possible
+      (first-fit decreasing); an entry larger than the limit is first split
+      at function/class boundaries into "<key> (part i/n)" entries.
+    - For `str`, splits at function/class boundaries, then by lines.
+    Token counts come from the model's tokenizer (see utils/tokens.py).
     """
-    estimated_tokens = lambda text: len(str(text)) // 4
-    batches = []
-
-    if isinstance(data, dict):
-        current_batch = {}
-        current_tokens = 0
-
-        for key, value in data.items():
-            tokens = estimated_tokens(value)
-            if current_tokens + tokens > token_limit:
-                if current_batch:
-                    batches.append(current_batch)
-                    current_batch = {}
-                    current_tokens = 0
-            current_batch[key] = value
-            current_tokens += tokens
-
-        if current_batch:
-            batches.append(current_batch)
-
-    elif isinstance(data, str):
-        lines = data.splitlines()
-        current_batch = []
-        current_tokens = 0
-
-        for line in lines:
-            tokens = estimated_tokens(line)
-            if current_tokens + tokens > token_limit:
-                batches.append("\n".join(current_batch))
-                current_batch = []
-                current_tokens = 0
-            current_batch.append(line)
-            current_tokens += tokens
-
-        if current_batch:
-            batches.append("\n".join(current_batch))
-
-    return batches
\ No newline at end of file
+    if isinstance(data, str):
+        return split_at_code_boundaries(data, token_limit, model)
+
+    if not isinstance(data, dict):
+        return []
+
+    entries = []
+    for key, value in data.items():
+        tokens = count_tokens(value, model) + ENTRY_OVERHEAD_TOKENS
+        if tokens > token_limit and isinstance(value, str):
+            parts = split_at_code_boundaries(value, token_limit - ENTRY_OVERHEAD_TOKENS, model)
+            for i, part in enumerate(parts):
+                part_key = f"{key} (part {i+1}/{len(parts)})" if len(parts) > 1 else key
+                entries.append((part_key, part, count_tokens(part, model) + ENTRY_OVERHEAD_TOKENS))
+        else:
+            entries.append((key, value, tokens))
+
+    # First-fit decreasing: place the largest entries first, each into the first chunk with room
+    bins = []
+    for idx in sorted(range(len(entries)), key=lambda i: entries[i][2], reverse=True):
+        tokens = entries[idx][2]
+        for chunk in bins:
+            if chunk["tokens"] + tokens <= token_limit:
+                chunk["tokens"] += tokens
+                chunk["entries"].append(idx)
+                break
+        else:
+            bins.append({"tokens": tokens, "entries": [idx]})
+
+    # Keep the original role order inside and across chunks
+    bins.sort(key=lambda chunk: min(chunk["entries"]))
+    return [
+        {entries[idx][0]: entries[idx][1] for idx in sorted(chunk["entries"])}
+        for chunk in bins
+    ]
@@ -0,0 +1,59 @@
+import asyncio
+import threading
+import weakref
+from typing import List, Optional
+from software_life_cycle.utils.concurrency import env_int, gather_bounded, parallel_map
+
+# Chunks of a single node sent to the LLM at the same time
+CHUNK_CONCURRENCY = env_int("SDLC_CHUNK_CONCURRENCY", 4)
+
+# Global cap on in-flight chunk requests, shared by every node in the process
+LLM_MAX_INFLIGHT = env_int("SDLC_LLM_MAX_INFLIGHT", 4)
+_inflight = threading.BoundedSemaphore(LLM_MAX_INFLIGHT)
+# Async equivalent, one per event loop since asyncio primitives are loop-bound
+_async_inflight = weakref.WeakKeyDictionary()
+
+
+def _loop_inflight() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    if loop not in _async_inflight:
+        _async_inflight[loop] = asyncio.Semaphore(LLM_MAX_INFLIGHT)
+    return _async_inflight[loop]
+
+
+def invoke_chunks(llm, chunk_messages: List[list], label: str) -> List[Optional[str]]:
+    """
+    Sends one prompt per code chunk to `llm` concurrently.
+    - Returns the stripped response text for each chunk, in chunk order.
+    - A chunk whose call raises yields `None` instead of failing the whole node.
+    """
+    def run(item):
+        idx, messages = item
+        try:
+            with _inflight:
+                response = llm.invoke(messages).content.strip()
+            print(f"{label} response for chunk {idx+1}")
+            return response
+        except Exception as e:
+            print(f"Error in {label} for chunk {idx+1}: {e}")
+            return None
+
+    return parallel_map(run, list(enumerate(chunk_messages)), CHUNK_CONCURRENCY)
+
+
+async def ainvoke_chunks(llm, chunk_messages: List[list], label: str) -> List[Optional[str]]:
+    """Async `invoke_chunks`: same ordering and per-chunk failure isolation, using `ainvoke`."""
+    inflight = _loop_inflight()
+
+    async def run(item):
+        idx, messages = item
+        try:
+            async with inflight:
+                response = (await llm.ainvoke(messages)).content.strip()
+            print(f"{label} response for chunk {idx+1}")
+            return response
+        except Exception as e:
+            print(f"Error in {label} for chunk {idx+1}: {e}")
+            return None
+
+    return await gather_bounded(run, list(enumerate(chunk_messages)), CHUNK_CONCURRENCY)
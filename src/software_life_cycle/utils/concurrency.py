@@ -0,0 +1,44 @@
+import asyncio
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Iterable, List, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def env_int(name: str, default: int) -> int:
+    """Read a positive integer setting from the environment."""
+    try:
+        return max(1, int(os.getenv(name, default)))
+    except ValueError:
+        return default
+
+
+def parallel_map(fn: Callable[[T], R], items: Iterable[T], max_workers: int) -> List[R]:
+    """
+    Runs `fn` over `items` on a bounded thread pool.
+    - Results come back in input order, whatever order the calls finish in.
+    - Each call runs in a copy of the caller's context, so LangGraph config
+      and other context variables are visible inside the worker threads.
+    """
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, fn, item) for item in items]
+        return [future.result() for future in futures]
+
+
+async def gather_bounded(fn: Callable[[T], Awaitable[R]], items: Iterable[T], max_concurrency: int) -> List[R]:
+    """Async counterpart of `parallel_map`: awaits `fn` over `items` with at most
+    `max_concurrency` in flight, returning results in input order."""
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(item):
+        async with semaphore:
+            return await fn(item)
+
+    return list(await asyncio.gather(*(run(item) for item in items)))
@@ -0,0 +1,112 @@
+import re
+from software_life_cycle.state.state import FeedbackEntry, SoftwareLifecycle
+from software_life_cycle.utils.concurrency import env_int
+from software_life_cycle.utils.tokens import count_tokens
+
+# Token budget for the compacted feedback that gets embedded in prompts
+FEEDBACK_TOKEN_BUDGET = env_int("SDLC_FEEDBACK_TOKEN_BUDGET", 1500)
+# Entries kept in state.feedback_log; older ones are dropped
+FEEDBACK_MAX_ENTRIES = env_int("SDLC_FEEDBACK_MAX_ENTRIES", 12)
+
+PHASE_LABELS = {
+    "syntax_check": "Syntax Check",
+    "code_review": "Code Review",
+    "security_review": "Security Review",
+    "qa_testing": "QA Testing",
+}
+
+# Words too generic to tell one worker role from another
+_GENERIC_ROLE_WORDS = {"developer", "engineer", "programmer", "specialist", "senior", "lead", "software", "the", "and"}
+
+_ISSUE_LINE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+_NORMALIZE = re.compile(r"[^a-z0-9]+")
+
+
+def _normalize(line: str) -> str:
+    return _NORMALIZE.sub(" ", _ISSUE_LINE.sub("", line).lower()).strip()
+
+
+def compact_feedback(entries: list, token_budget: int = None, model: str = None) -> str:
+    """
+    Renders the feedback log for prompts under `token_budget` tokens.
+    - The latest entry of each phase is kept in full.
+    - Older entries are summarised down to their bullet/numbered issue lines.
+    - Lines already present in a newer entry are dropped.
+    - When over budget, the oldest sections go first and the last one kept is truncated.
+    """
+    if not entries:
+        return "No feedback yet."
+    token_budget = token_budget or FEEDBACK_TOKEN_BUDGET
+
+    latest = {entry.phase: idx for idx, entry in enumerate(entries)}
+    seen = set()
+    sections = []
+    for idx in reversed(range(len(entries))):
+        entry = entries[idx]
+        lines = entry.content.splitlines()
+        if idx != latest[entry.phase]:
+            lines = [line for line in lines if _ISSUE_LINE.match(line)]
+
+        kept = []
+        for line in lines:
+            key = _normalize(line)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            kept.append(line.rstrip())
+        if kept:
+            label = PHASE_LABELS.get(entry.phase, entry.phase.replace("_", " ").title())
+            sections.append((f"[{label} Attempt {entry.attempt}]:", kept))
+
+    # Newest sections claim the budget first
+    rendered, used = [], 0
+    for header, lines in sections:
+        header_tokens = count_tokens(header, model)
+        if used + header_tokens >= token_budget:
+            break
+        body = []
+        used += header_tokens
+        for line in lines:
+            tokens = count_tokens(line, model) + 1
+            if used + tokens > token_budget:
+                break
+            body.append(line)
+            used += tokens
+        if body:
+            rendered.append(header + "\n" + "\n".join(body))
+        if len(body) < len(lines):
+            break
+
+    return "\n\n".join(reversed(rendered)) if rendered else "No feedback yet."
+
+
+def record_feedback(state: SoftwareLifecycle, phase: str, attempt: int, content: str) -> dict:
+    """State update appending a verdict to the bounded feedback log and
+    refreshing the compacted `feedback` text used in prompts."""
+    entry = FeedbackEntry(phase=phase, attempt=attempt, content=content, generation=state.code_generation_round)
+    log = list(state.feedback_log) + [entry]
+    log = log[-FEEDBACK_MAX_ENTRIES:]
+    return {"feedback_log": log, "feedback": compact_feedback(log)}
+
+
+def _role_pattern(role: str):
+    """Regex matching a role by its distinctive words, e.g. "Backend Developer" -> backend."""
+    words = re.findall(r"[a-z0-9+#.]+", role.lower())
+    distinctive = [w for w in words if w not in _GENERIC_ROLE_WORDS] or words
+    if not distinctive:
+        return None
+    return re.compile(r"(?<![a-z0-9])" + r"\W+".join(re.escape(w) for w in distinctive) + r"(?![a-z0-9])")
+
+
+def roles_flagged_by_feedback(entries: list, roles: list, generation: int) -> list:
+    """Roles mentioned by the review/QA verdicts given for code generation round `generation`.
+    An empty result means the feedback could not be attributed to specific roles."""
+    text = "\n".join(entry.content for entry in entries if entry.generation == generation).lower()
+    if not text:
+        return []
+    flagged = []
+    for role in roles:
+        pattern = _role_pattern(role)
+        if pattern is not None and pattern.search(text):
+            flagged.append(role)
+    return flagged
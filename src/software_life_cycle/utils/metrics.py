@@ -0,0 +1,223 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from typing import Callable, List, Optional
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables.config import ensure_config
+from software_life_cycle.utils.concurrency import env_int
+from software_life_cycle.utils.prompts import PrefixTracker, prompt_text
+
+# Per-node metrics (SDLC_METRICS=0 turns the node wrapper into a passthrough)
+METRICS_ENABLED = os.getenv("SDLC_METRICS", "1") != "0"
+# JSON lines file that receives one record per node run (empty = not written)
+METRICS_PATH = os.getenv("SDLC_METRICS_PATH", "output/metrics.jsonl")
+# Threads whose records are kept in memory for `thread_metrics`
+METRICS_THREADS = env_int("SDLC_METRICS_THREADS", 256)
+
+# USD per million (input, output) tokens
+MODEL_PRICES = {
+    "llama-3.2-90b-vision-preview": (0.90, 0.90),
+    "gemma2-9b-it": (0.20, 0.20),
+    "qwen-2.5-coder-32b": (0.79, 0.79),
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+}
+
+COUNTERS = (
+    "llm_calls", "llm_errors", "prompt_tokens", "completion_tokens", "cache_hits", "retries", "escalations",
+    "prompt_chars", "prefix_chars", "wait_seconds", "cost_usd",
+)
+
+_current = contextvars.ContextVar("sdlc_node_metrics", default=None)
+_threads: "OrderedDict[str, dict]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _configured_prices() -> dict:
+    """MODEL_PRICES, overridden by SDLC_MODEL_PRICES='{"model": [input, output], ...}'."""
+    prices = dict(MODEL_PRICES)
+    overrides = os.getenv("SDLC_MODEL_PRICES")
+    if overrides:
+        try:
+            prices.update({model: tuple(value) for model, value in json.loads(overrides).items()})
+        except (ValueError, TypeError) as e:
+            print(f"Ignoring invalid SDLC_MODEL_PRICES ({e})")
+    return prices
+
+
+class NodeMetrics:
+    """Counters for one run of one node; LLM calls made anywhere inside the run add to it."""
+
+    def __init__(self, thread_id: str, node: str, attempt: int):
+        self.thread_id = thread_id
+        self.node = node
+        self.attempt = attempt
+        self.started_at = time.time()
+        self.seconds = 0.0
+        self.peak_kb = 0
+        self.error = None
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self._lock = threading.Lock()
+
+    def add(self, **amounts) -> None:
+        # Chunked nodes call the LLM from several threads at once
+        with self._lock:
+            for key, amount in amounts.items():
+                self.counts[key] += amount
+
+    def to_dict(self) -> dict:
+        record = {
+            "thread_id": self.thread_id, "node": self.node, "attempt": self.attempt,
+            "started_at": round(self.started_at, 3), "seconds": round(self.seconds, 3), "peak_kb": self.peak_kb,
+            "error": self.error,
+            **self.counts,
+        }
+        record["wait_seconds"] = round(record["wait_seconds"], 3)
+        record["cost_usd"] = round(record["cost_usd"], 6)
+        return record
+
+
+def record(**amounts) -> None:
+    """Adds to the counters of the node run in progress (no-op outside a traced node)."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add(**amounts)
+
+
+def _thread(thread_id: str) -> dict:
+    # Caller holds _lock; the least recently used threads are dropped
+    if thread_id not in _threads:
+        _threads[thread_id] = {"attempts": {}, "records": []}
+    _threads.move_to_end(thread_id)
+    while len(_threads) > METRICS_THREADS:
+        _threads.popitem(last=False)
+    return _threads[thread_id]
+
+
+def _start(node: str) -> NodeMetrics:
+    thread_id = str(ensure_config().get("configurable", {}).get("thread_id", ""))
+    with _lock:
+        attempts = _thread(thread_id)["attempts"]
+        attempts[node] = attempt = attempts.get(node, 0) + 1
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    return NodeMetrics(thread_id, node, attempt)
+
+
+def _finish(metrics: NodeMetrics, started: float, error: Optional[Exception]) -> None:
+    metrics.seconds = time.perf_counter() - started
+    # Peak Python heap during the run, when tracemalloc is on (the benchmark turns it on)
+    if tracemalloc.is_tracing():
+        metrics.peak_kb = tracemalloc.get_traced_memory()[1] // 1024
+    metrics.error = str(error) if error is not None else None
+    data = metrics.to_dict()
+    with _lock:
+        _thread(metrics.thread_id)["records"].append(data)
+        if METRICS_PATH:
+            directory = os.path.dirname(METRICS_PATH)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(METRICS_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(data) + "\n")
+
+
+def traced(name: str, func: Callable, afunc: Callable = None) -> tuple:
+    """
+    Sync and async wrappers of a node that time each run and collect its LLM usage.
+    The async wrapper is None when the node has no async variant.
+    """
+    if not METRICS_ENABLED:
+        return func, afunc
+
+    def run(state):
+        metrics = _start(name)
+        token, started, error = _current.set(metrics), time.perf_counter(), None
+        try:
+            return func(state)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            _current.reset(token)
+            _finish(metrics, started, error)
+
+    async def arun(state):
+        metrics = _start(name)
+        token, started, error = _current.set(metrics), time.perf_counter(), None
+        try:
+            return await afunc(state)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            _current.reset(token)
+            _finish(metrics, started, error)
+
+    return run, (arun if afunc is not None else None)
+
+
+class LLMMetrics(BaseCallbackHandler):
+    """
+    Callback attached to each chat client: counts calls, tokens, cost and cache hits for the node run in progress.
+    LangChain zeroes `total_cost` on responses served from the cache, which is how hits are told apart.
+    Each prompt is also compared with the model's recent ones: the characters of its longest prefix
+    already sent (what a provider prefix cache can reuse) are counted in the node's metrics.
+    """
+
+    run_inline = True
+
+    def __init__(self, model: str):
+        self.model = model
+        self.prefixes = PrefixTracker()
+
+    def on_chat_model_start(self, serialized, messages, **kwargs) -> None:
+        text = prompt_text(messages[0])
+        shared = self.prefixes.observe(text)
+        record(prompt_chars=len(text), prefix_chars=shared)
+
+    def on_llm_end(self, response, **kwargs) -> None:
+        generations = response.generations[0] if response.generations else []
+        message = getattr(generations[0], "message", None) if generations else None
+        usage = getattr(message, "usage_metadata", None) or {}
+        if usage.get("total_cost") == 0:
+            record(cache_hits=1)
+            return
+        if not usage:
+            token_usage = (response.llm_output or {}).get("token_usage") or {}
+            usage = {"input_tokens": token_usage.get("prompt_tokens", 0),
+                     "output_tokens": token_usage.get("completion_tokens", 0)}
+        prompt, completion = usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+        price_in, price_out = _configured_prices().get(self.model, (0.0, 0.0))
+        record(llm_calls=1, prompt_tokens=prompt, completion_tokens=completion,
+               cost_usd=(prompt * price_in + completion * price_out) / 1_000_000)
+
+    def on_llm_error(self, error, **kwargs) -> None:
+        record(llm_calls=1, llm_errors=1)
+
+
+def thread_metrics(thread_id: str) -> List[dict]:
+    """Finished node runs of a thread in this process, in the order they finished."""
+    with _lock:
+        return list(_threads[thread_id]["records"]) if thread_id in _threads else []
+
+
+def summarize(records: List[dict]) -> List[dict]:
+    """
+    One row per node (runs, time and every counter summed, the highest peak memory),
+    in first-run order, plus a "total" row.
+    """
+    rows = OrderedDict()
+    for data in records + [{**data, "node": "total"} for data in records]:
+        row = rows.setdefault(data["node"], {
+            "node": data["node"], "runs": 0, "seconds": 0.0, "peak_kb": 0, **dict.fromkeys(COUNTERS, 0),
+        })
+        row["runs"] += 1
+        row["seconds"] += data["seconds"]
+        row["peak_kb"] = max(row["peak_kb"], data.get("peak_kb", 0))
+        for key in COUNTERS:
+            row[key] += data[key]
+    return list(rows.values())
@@ -0,0 +1,75 @@
+import threading
+from collections import deque
+from typing import Iterable, Optional, Tuple
+from langchain_core.messages import HumanMessage, SystemMessage
+
+# Prompts per model kept to measure how much of a new prompt repeats an earlier one
+PREFIX_HISTORY = 64
+
+Segment = Tuple[str, Optional[str]]
+
+
+def section(title: str, text) -> str:
+    """A titled prompt segment; "" when there is nothing to say."""
+    text = str(text or "").strip()
+    return f"### {title}:\n{text}" if text else ""
+
+
+def _normalized(text) -> str:
+    return " ".join(str(text or "").split())
+
+
+def assemble(system: str, instructions: str = "", design: str = "", context: Iterable[Segment] = (),
+             tail: Iterable[Segment] = ()) -> list:
+    """
+    [system, human] messages laid out from the most to the least stable part, so that calls of a node
+    (its chunks, its roles, its next attempt) share the longest possible prefix for provider-side caching:
+    node instructions, design document, shared `context` segments, then the variable `tail` (chunk, role).
+    Empty segments and context identical to an earlier segment (up to whitespace) are left out.
+    """
+    parts = [instructions.strip(), section("Design Document", design)]
+    seen = {_normalized(instructions), _normalized(design)}
+    for title, text in context:
+        key = _normalized(text)
+        if key and key not in seen:
+            seen.add(key)
+            parts.append(section(title, text))
+    parts += [section(title, text) for title, text in tail]
+    return [SystemMessage(content=system), HumanMessage(content="\n\n".join(part for part in parts if part))]
+
+
+def prompt_text(messages) -> str:
+    return "\n".join(f"{message.type}: {message.content}" for message in messages)
+
+
+def common_prefix(a: str, b: str) -> int:
+    """Length of the longest common prefix of two strings."""
+    size = min(len(a), len(b))
+    low, high = 0, size
+    # Binary search on slice equality: C-speed comparisons instead of a Python loop per character
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[:mid] == b[:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+class PrefixTracker:
+    """Recent prompts of one model; `observe` says how many leading characters a prompt shares with one of them."""
+
+    def __init__(self, history: int = PREFIX_HISTORY):
+        self._prompts = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    def observe(self, text: str) -> int:
+        with self._lock:
+            shared = max((common_prefix(text, earlier) for earlier in self._prompts), default=0)
+            self._prompts.append(text)
+        return shared
+
+
+def prefix_ratio(row: dict) -> Optional[float]:
+    """Share of a metrics row's prompt characters that repeated the prefix of an earlier prompt."""
+    return row["prefix_chars"] / row["prompt_chars"] if row.get("prompt_chars") else None
@@ -0,0 +1,360 @@
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+import re
+import shutil
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional, Tuple
+from software_life_cycle.node.file_saver import extract_multiple_code_blocks, sanitize_filename
+from software_life_cycle.utils.concurrency import env_int, parallel_map
+
+# pytest processes run at the same time
+QA_WORKERS = env_int("SDLC_QA_WORKERS", os.cpu_count() or 2)
+# Wall-clock seconds one pytest process may take before it is killed
+QA_TIMEOUT = env_int("SDLC_QA_TIMEOUT", 60)
+# Address-space limit per pytest process, in MB
+QA_MEMORY_MB = env_int("SDLC_QA_MEMORY_MB", 1024)
+
+# Installed at the root of every workspace: Python imports it at startup and refuses outbound connections
+_NO_NETWORK = '''import socket
+
+def _blocked(*args, **kwargs):
+    raise OSError("network access is disabled in the QA sandbox")
+
+socket.socket.connect = _blocked
+socket.socket.connect_ex = _blocked
+socket.create_connection = _blocked
+socket.getaddrinfo = _blocked
+'''
+
+
+def _module_name(role: str, index: int, count: int) -> str:
+    name = re.sub(r"\W", "_", sanitize_filename(role).strip().lower()).strip("_") or "module"
+    if name[0].isdigit():
+        name = f"m_{name}"
+    return f"{name}_{index + 1}" if count > 1 else name
+
+
+def _is_test_source(code: str) -> bool:
+    return bool(re.search(r"^\s*(?:async\s+)?def test_|^class Test|import (?:pytest|unittest)", code, re.MULTILINE))
+
+
+def _imported_modules(source: str) -> set:
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return set()
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            names.add(node.module.split(".")[0])
+    return names
+
+
+def _importable(name: str) -> bool:
+    if name in sys.stdlib_module_names:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def collect_sources(generated_code: Dict[str, str], test_cases: str) -> Tuple[dict, dict]:
+    """
+    Pulls the Python sources out of the workflow state with `extract_multiple_code_blocks`.
+    - Python blocks of each role become modules named after the role.
+    - Test blocks become `test_case_<n>.py`.
+    Returns ({module file: source}, {test file: source}).
+    """
+    code_files = {}
+    for role, content in (generated_code or {}).items():
+        blocks = [block for block in extract_multiple_code_blocks(content) if block["extension"] == "py"]
+        for index, block in enumerate(blocks):
+            if not _is_test_source(block["code"]):
+                code_files[f"{_module_name(role, index, len(blocks))}.py"] = block["code"] + "\n"
+
+    test_files = {}
+    for index, block in enumerate(extract_multiple_code_blocks(test_cases or "")):
+        if block["extension"] == "py" and _is_test_source(block["code"]):
+            test_files[f"test_case_{index + 1}.py"] = block["code"] + "\n"
+    return code_files, test_files
+
+
+def collect_saved_sources(code_dir: str, tests_dir: str) -> Tuple[dict, dict]:
+    """Same as `collect_sources`, for a suite saved by `save_final_outputs` (output/generated_code, output/test_cases)."""
+    def read(directory, keep):
+        if not os.path.isdir(directory):
+            return {}
+        files = {}
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".py") and keep(name):
+                with open(os.path.join(directory, name), encoding="utf-8") as f:
+                    files[name] = f.read()
+        return files
+
+    return read(code_dir, lambda name: not name.startswith("test_")), read(tests_dir, lambda name: name.startswith("test_"))
+
+
+def write_workspace(directory: str, code_files: dict, test_files: dict) -> None:
+    """
+    Writes the sources into `directory`, plus the sandbox support files.
+    A module the tests import that does not exist becomes a shim re-exporting every
+    generated module, since the test writer could only guess the real module names.
+    """
+    for name, source in {**code_files, **test_files}.items():
+        with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+            f.write(source)
+
+    existing = {name[:-3] for name in code_files} | {name[:-3] for name in test_files}
+    missing = set().union(set(), *map(_imported_modules, test_files.values())) - existing
+    shim = "".join(f"from {name[:-3]} import *  # noqa\n" for name in code_files)
+    for name in sorted(missing):
+        if not _importable(name):
+            with open(os.path.join(directory, f"{name}.py"), "w", encoding="utf-8") as f:
+                f.write(shim)
+
+    with open(os.path.join(directory, "sitecustomize.py"), "w", encoding="utf-8") as f:
+        f.write(_NO_NETWORK)
+    # Keeps pytest from picking up configuration from directories above the workspace
+    with open(os.path.join(directory, "pytest.ini"), "w", encoding="utf-8") as f:
+        f.write("[pytest]\n")
+
+
+# Runs pytest in the child interpreter after applying the resource limits there, since
+# `preexec_fn` is unsafe in threaded parents. argv: memory MB, CPU seconds, pytest args...
+_BOOTSTRAP = """import runpy, sys
+try:
+    import resource
+except ImportError:
+    resource = None
+if resource is not None:
+    memory, cpu = int(sys.argv[1]) * 1024 * 1024, int(sys.argv[2])
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+sys.argv = ["pytest", *sys.argv[3:]]
+runpy.run_module("pytest", run_name="__main__", alter_sys=True)
+"""
+
+
+def _kill_process_tree(process: subprocess.Popen) -> None:
+    """Kills the pytest process and everything the generated tests spawned from it."""
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+
+
+def _sandbox_env(workspace: str) -> dict:
+    keep = ("PATH", "LANG", "LC_ALL", "SYSTEMROOT", "TMPDIR")
+    env = {key: os.environ[key] for key in keep if key in os.environ}
+    env.update({
+        "HOME": workspace,
+        "PYTHONPATH": workspace,
+        "PYTHONDONTWRITEBYTECODE": "1",
+        "PYTHONHASHSEED": "0",
+        "NO_PROXY": "*",
+    })
+    return env
+
+
+def parse_junit(path: str) -> List[dict]:
+    """Per-test results from a pytest JUnit XML report."""
+    results = []
+    for case in ET.parse(path).getroot().iter("testcase"):
+        outcome, message = "passed", ""
+        for tag in ("failure", "error", "skipped"):
+            element = case.find(tag)
+            if element is not None:
+                outcome = {"failure": "failed", "error": "error", "skipped": "skipped"}[tag]
+                message = (element.get("message") or element.text or "").strip()
+                break
+        classname = case.get("classname", "")
+        results.append({
+            "test": f"{classname}::{case.get('name')}" if classname else case.get("name"),
+            "outcome": outcome,
+            "message": message[:500],
+            "duration": float(case.get("time") or 0.0),
+        })
+    return results
+
+
+def run_pytest(workspace: str, targets: List[str], report_name: str, timeout: int = None) -> List[dict]:
+    """
+    Runs pytest on `targets` inside `workspace` in a separate, resource-limited process.
+    A crash or timeout is reported as a single `error`/`timeout` result for the targets.
+    """
+    timeout = timeout or QA_TIMEOUT
+    report = os.path.join(workspace, report_name)
+    command = [
+        sys.executable, "-c", _BOOTSTRAP, str(QA_MEMORY_MB), str(timeout), "-q", "-p", "no:cacheprovider",
+        f"--junitxml={report}", "-o", "junit_family=xunit1", *targets,
+    ]
+    if os.getenv("SDLC_QA_UNSHARE", "0") == "1" and shutil.which("unshare"):
+        command = ["unshare", "--map-root-user", "--net", *command]
+
+    # Its own session (and process group), so a timeout can kill the whole tree
+    process = subprocess.Popen(
+        command, cwd=workspace, env=_sandbox_env(workspace), stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        text=True, start_new_session=os.name == "posix",
+    )
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        _kill_process_tree(process)
+        process.communicate()
+        return [{"test": target, "outcome": "timeout", "message": f"killed after {timeout}s", "duration": float(timeout)}
+                for target in targets]
+
+    if os.path.exists(report):
+        results = parse_junit(report)
+        if results:
+            return results
+    output = (stdout + stderr).strip()
+    return [{"test": target, "outcome": "error", "message": output[-500:], "duration": 0.0} for target in targets]
+
+
+def summarize(results: List[dict]) -> dict:
+    counts = {outcome: 0 for outcome in ("passed", "failed", "error", "skipped", "timeout")}
+    for result in results:
+        counts[result["outcome"]] = counts.get(result["outcome"], 0) + 1
+    counts["total"] = len(results)
+    return counts
+
+
+class QAResultCache:
+    """
+    SQLite store of per-test-file results, keyed by the hash of the code and test sources,
+    so a test file whose code and content did not change is not run again.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS qa_results (key TEXT PRIMARY KEY, results TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[List[dict]]:
+        with self._lock:
+            row = self._conn.execute("SELECT results FROM qa_results WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, results: List[dict]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO qa_results (key, results, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(results), time.time()),
+            )
+            self._conn.commit()
+
+
+_qa_cache = None
+
+
+def get_qa_cache() -> Optional[QAResultCache]:
+    """Process-wide result cache (SDLC_QA_CACHE_PATH); None when SDLC_QA_CACHE=0."""
+    global _qa_cache
+    if os.getenv("SDLC_QA_CACHE", "1") == "0":
+        return None
+    if _qa_cache is None:
+        _qa_cache = QAResultCache(os.getenv("SDLC_QA_CACHE_PATH", os.path.join(".cache", "qa_results.sqlite")))
+    return _qa_cache
+
+
+def suite_key(code_files: dict, test_name: str, test_source: str) -> str:
+    """Hash of everything a test file's outcome depends on: every code module plus the test itself."""
+    digest = hashlib.sha256()
+    for name in sorted(code_files):
+        digest.update(f"{name}\x00{code_files[name]}\x00".encode("utf-8"))
+    digest.update(f"{test_name}\x00{test_source}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def shard(test_files: dict, shards: int) -> List[List[str]]:
+    """Splits test files into at most `shards` groups of similar size (largest file first)."""
+    groups = [[] for _ in range(max(1, min(shards, len(test_files))))]
+    sizes = [0] * len(groups)
+    for name in sorted(test_files, key=lambda name: len(test_files[name]), reverse=True):
+        target = sizes.index(min(sizes))
+        groups[target].append(name)
+        sizes[target] += len(test_files[name])
+    return [sorted(group) for group in groups if group]
+
+
+def _results_by_file(results: List[dict], test_names: List[str]) -> Dict[str, List[dict]]:
+    by_file = {name: [] for name in test_names}
+    for result in results:
+        stem = result["test"].split("::")[0].split(".")[0]
+        by_file.setdefault(f"{stem}.py", []).append(result)
+    return by_file
+
+
+def run_suite(code_files: dict, test_files: dict, workers: int = None, cache: QAResultCache = None) -> Optional[dict]:
+    """
+    Runs `test_files` against `code_files` in a temporary workspace.
+    - Files with a cached result for the same code+test hash are not run again.
+    - The rest are sharded across `workers` (SDLC_QA_WORKERS) pytest processes.
+    - Returns {"results": [...per test...], "summary": {...counts...}},
+      or None when there are no Python test files.
+    """
+    if not test_files:
+        return None
+
+    keys = {name: suite_key(code_files, name, source) for name, source in test_files.items()}
+    cached = {name: cache.get(keys[name]) for name in test_files} if cache is not None else {}
+    cached = {name: results for name, results in cached.items() if results is not None}
+    pending = {name: source for name, source in test_files.items() if name not in cached}
+
+    by_file = dict(cached)
+    shards = shard(pending, workers or QA_WORKERS) if pending else []
+    if shards:
+        with tempfile.TemporaryDirectory(prefix="sdlc_qa_") as workspace:
+            write_workspace(workspace, code_files, test_files)
+            runs = parallel_map(
+                lambda item: run_pytest(workspace, item[1], f"shard_{item[0]}.junit.xml"),
+                list(enumerate(shards)),
+                len(shards),
+            )
+        for group, results in zip(shards, runs):
+            for name, file_results in _results_by_file(results, group).items():
+                by_file[name] = file_results
+                # Timeouts and whole-file crashes may be environmental; only settled outcomes are cached
+                settled = file_results and all(r["outcome"] != "timeout" and "::" in r["test"] for r in file_results)
+                if cache is not None and settled:
+                    cache.put(keys[name], file_results)
+
+    results = [result for name in sorted(by_file) for result in by_file[name]]
+    summary = summarize(results)
+    summary.update({"files": len(test_files), "cached_files": len(cached), "shards": len(shards)})
+    return {"results": results, "summary": summary}
+
+
+def run_test_suite(generated_code: Dict[str, str], test_cases: str, workers: int = None,
+                   cache: QAResultCache = None) -> Optional[dict]:
+    """Executes the test cases in the workflow state against the generated code (see `run_suite`)."""
+    return run_suite(*collect_sources(generated_code, test_cases), workers=workers, cache=cache)
+
+
+def run_saved_suite(code_dir: str = "output/generated_code", tests_dir: str = "output/test_cases",
+                    workers: int = None, cache: QAResultCache = None) -> Optional[dict]:
+    """Executes a suite saved by `save_final_outputs` (see `run_suite`)."""
+    return run_suite(*collect_saved_sources(code_dir, tests_dir), workers=workers, cache=cache)
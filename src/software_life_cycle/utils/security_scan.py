@@ -0,0 +1,216 @@
+import ast
+import re
+from typing import List
+
+# Fenced code block delimiters inside the generated markdown
+_FENCE = re.compile(r"^\s*```\s*([\w+#.-]*)\s*$")
+_PYTHON_LANGS = {"python", "py", "python3"}
+
+_SECRET_NAME = re.compile(r"(?i)(passw(or)?d|passwd|secret|api[_-]?key|access[_-]?key|auth[_-]?token|private[_-]?key|client[_-]?secret)")
+_PLACEHOLDER = re.compile(r"(?i)^(|x+|\*+|changeme|your[_ -].*|<.*>|\$\{.*\}|test|example|dummy|none|null)$")
+_SQL_KEYWORD = re.compile(r"(?i)\b(select|insert|update|delete|replace)\b")
+
+# Language-independent line rules: (rule id, severity, pattern, message)
+PATTERN_RULES = [
+    ("secret-aws-key", "high", re.compile(r"AKIA[0-9A-Z]{16}"), "AWS access key in source"),
+    ("secret-private-key", "high", re.compile(r"-----BEGIN (?:RSA |EC |DSA |OPENSSH )?PRIVATE KEY-----"), "Private key in source"),
+    ("secret-api-token", "high", re.compile(r"\b(?:sk|gsk|ghp|xox[bap])[-_][A-Za-z0-9]{16,}"), "API token in source"),
+    ("secret-assignment", "high",
+     re.compile(r"""(?i)(passw(or)?d|secret|api[_-]?key|auth[_-]?token|client[_-]?secret)["']?\s*[:=]\s*["'][^"'\s$<{]{4,}["']"""),
+     "Hardcoded credential"),
+    ("xss-inner-html", "high", re.compile(r"\.(?:inner|outer)HTML\s*[+]?=|dangerouslySetInnerHTML|document\.write\s*\("),
+     "Unescaped HTML injection (XSS)"),
+    ("code-eval", "high", re.compile(r"\beval\s*\(|\bnew\s+Function\s*\("), "Dynamic code evaluation"),
+    ("sql-concat", "high",
+     re.compile(r"""(?i)["'`]\s*(?:select|insert|update|delete)\b[^"'`]*["'`]\s*\+|`[^`]*\b(?:select|insert|update|delete)\b[^`]*\$\{"""),
+     "SQL built by string concatenation (SQL injection)"),
+    ("weak-hash", "medium", re.compile(r"(?i)\b(?:md5|sha1)\s*\(|createHash\(\s*['\"](?:md5|sha1)['\"]"), "Weak hash (MD5/SHA-1)"),
+    ("tls-disabled", "medium", re.compile(r"verify\s*=\s*False|rejectUnauthorized\s*:\s*false|InsecureSkipVerify\s*:\s*true"),
+     "TLS certificate verification disabled"),
+]
+
+# Constructs that are not wrong by themselves but need a reviewer to judge the context
+AMBIGUOUS_RULES = [
+    ("auth-logic", re.compile(r"(?i)\b(?:login|authenticate|check_password|verify_password|jwt|session\[|set_cookie|bcrypt)\b"),
+     "Authentication/session handling"),
+    ("raw-sql", re.compile(r"(?i)\b(?:execute|executemany|raw|query)\s*\(\s*[\"'`f]"), "Raw SQL statement"),
+    ("html-render", re.compile(r"(?i)render_template_string|\|\s*safe\b|mark_safe\(|Markup\(|v-html|\[innerHTML\]"),
+     "Template rendering without autoescape"),
+    ("deserialization", re.compile(r"\b(?:pickle|marshal|shelve)\.loads?\(|yaml\.load\("), "Deserialization of untrusted data"),
+    ("file-path", re.compile(r"(?i)\b(?:open|send_file|send_from_directory)\s*\([^)]*(?:request|params|args|input)"),
+     "File access from user input"),
+]
+_AST_COVERED = {"raw-sql", "deserialization"}
+# Key formats are recognisable in any language; the rest of the Python rules come from the ast
+_TOKEN_RULES = [rule for rule in PATTERN_RULES if rule[0] in ("secret-aws-key", "secret-private-key", "secret-api-token")]
+
+
+def _finding(location: str, line: int, rule: str, severity: str, message: str) -> dict:
+    return {"file": location, "line": line, "rule": rule, "severity": severity, "message": message}
+
+
+def code_blocks(content: str) -> List[tuple]:
+    """(language, first line number, code) for each fenced block; unfenced content is one block of unknown language."""
+    if "```" not in content:
+        return [("", 1, content)]
+    blocks, lang, start, lines = [], None, 0, []
+    for number, line in enumerate(content.splitlines(), start=1):
+        match = _FENCE.match(line)
+        if lang is None and match:
+            lang, start, lines = match.group(1).lower(), number + 1, []
+        elif lang is not None and line.strip().startswith("```"):
+            blocks.append((lang, start, "\n".join(lines)))
+            lang = None
+        elif lang is not None:
+            lines.append(line)
+    if lang is not None and lines:
+        blocks.append((lang, start, "\n".join(lines)))
+    return blocks
+
+
+def _call_name(node: ast.Call) -> str:
+    func = node.func
+    parts = []
+    while isinstance(func, ast.Attribute):
+        parts.append(func.attr)
+        func = func.value
+    if isinstance(func, ast.Name):
+        parts.append(func.id)
+    return ".".join(reversed(parts))
+
+
+def _keyword(node: ast.Call, name: str):
+    return next((kw.value for kw in node.keywords if kw.arg == name), None)
+
+
+def _is_dynamic_string(node) -> bool:
+    """f-strings, concatenation, %-formatting or .format() — strings built from values at runtime."""
+    if isinstance(node, ast.JoinedStr):
+        return any(isinstance(value, ast.FormattedValue) for value in node.values)
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Mod)):
+        return True
+    return isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "format"
+
+
+def _literal_text(node) -> str:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        return "".join(value.value for value in node.values if isinstance(value, ast.Constant))
+    if isinstance(node, ast.BinOp):
+        return _literal_text(node.left) + _literal_text(node.right)
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+        return _literal_text(node.func.value)
+    return ""
+
+
+def _python_findings(location: str, offset: int, tree: ast.AST) -> List[dict]:
+    findings = []
+
+    def add(node, rule, severity, message):
+        findings.append(_finding(location, offset + node.lineno - 1, rule, severity, message))
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            name = _call_name(node)
+            short = name.rsplit(".", 1)[-1]
+            if name in ("eval", "exec"):
+                add(node, "code-eval", "high", f"`{name}` executes dynamic code")
+            elif name in ("os.system", "os.popen") or (
+                name.startswith("subprocess.") and isinstance(_keyword(node, "shell"), ast.Constant)
+                and _keyword(node, "shell").value is True
+            ):
+                add(node, "command-injection", "high", f"`{name}` runs a shell command")
+            elif short in ("execute", "executemany", "executescript", "raw") and node.args \
+                    and _is_dynamic_string(node.args[0]) and _SQL_KEYWORD.search(_literal_text(node.args[0])):
+                add(node, "sql-injection", "high", "SQL query built from runtime values; use parameters")
+            elif name in ("pickle.loads", "pickle.load", "marshal.loads"):
+                add(node, "unsafe-deserialization", "medium", f"`{name}` can execute code from untrusted data")
+            elif name == "yaml.load" and _keyword(node, "Loader") is None:
+                add(node, "unsafe-deserialization", "medium", "`yaml.load` without a safe Loader")
+            elif name in ("hashlib.md5", "hashlib.sha1", "md5", "sha1"):
+                add(node, "weak-hash", "medium", f"`{name}` is too weak for passwords or signatures")
+            elif isinstance(_keyword(node, "verify"), ast.Constant) and _keyword(node, "verify").value is False:
+                add(node, "tls-disabled", "medium", "TLS certificate verification disabled")
+            elif short == "run" and isinstance(_keyword(node, "debug"), ast.Constant) and _keyword(node, "debug").value is True:
+                add(node, "debug-enabled", "medium", "Application started with debug=True")
+            elif name in ("render_template_string", "Markup", "mark_safe"):
+                add(node, "xss-unescaped", "medium", f"`{name}` bypasses template autoescaping")
+
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)) and isinstance(node.value, ast.Constant) \
+                and isinstance(node.value.value, str):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                name = target.id if isinstance(target, ast.Name) else getattr(target, "attr", "")
+                if _SECRET_NAME.search(name or "") and not _PLACEHOLDER.match(node.value.value.strip()):
+                    add(node, "hardcoded-secret", "high", f"Hardcoded credential in `{name}`")
+
+        elif isinstance(node, ast.keyword) and node.arg and _SECRET_NAME.search(node.arg) \
+                and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str) \
+                and not _PLACEHOLDER.match(node.value.value.strip()):
+            findings.append(_finding(location, offset + node.value.lineno - 1, "hardcoded-secret", "high",
+                                     f"Hardcoded credential passed as `{node.arg}`"))
+    return findings
+
+
+def _pattern_findings(location: str, offset: int, code: str, rules) -> List[dict]:
+    findings = []
+    for number, line in enumerate(code.splitlines()):
+        for rule, severity, pattern, message in rules:
+            if pattern.search(line):
+                findings.append(_finding(location, offset + number, rule, severity, message))
+    return findings
+
+
+def scan_source(location: str, content: str) -> dict:
+    """
+    Scans one role's generated content.
+    - Python blocks get the `ast` rules (plus the secret patterns); other languages get the
+      line patterns. A Python block that does not parse is reported as ambiguous.
+    - Returns {"findings": [...], "ambiguous": [...]}, each item with file/line/rule/message.
+    """
+    findings, ambiguous = [], []
+    for lang, offset, code in code_blocks(content or ""):
+        if lang in _PYTHON_LANGS:
+            try:
+                tree = ast.parse(code)
+            except SyntaxError as e:
+                ambiguous.append(_finding(location, offset + (e.lineno or 1) - 1, "unparsable", "info",
+                                          f"Python block does not parse: {e.msg}"))
+                findings.extend(_pattern_findings(location, offset, code, PATTERN_RULES))
+            else:
+                findings.extend(_python_findings(location, offset, tree))
+                findings.extend(_pattern_findings(location, offset, code, _TOKEN_RULES))
+        else:
+            findings.extend(_pattern_findings(location, offset, code, PATTERN_RULES))
+        # The ast rules already tell safe and unsafe SQL/deserialization apart in Python
+        rules = [r for r in AMBIGUOUS_RULES if lang not in _PYTHON_LANGS or r[0] not in _AST_COVERED]
+        ambiguous.extend(_pattern_findings(
+            location, offset, code, [(rule, "info", pattern, message) for rule, pattern, message in rules]
+        ))
+
+    return {"findings": findings, "ambiguous": ambiguous}
+
+
+def scan_code(data) -> dict:
+    """Scans a chunk of generated code: a {role: content} dict or a single string."""
+    items = data.items() if isinstance(data, dict) else [("code", data)]
+    report = {"findings": [], "ambiguous": []}
+    for location, content in items:
+        result = scan_source(location, content if isinstance(content, str) else str(content))
+        report["findings"].extend(result["findings"])
+        report["ambiguous"].extend(result["ambiguous"])
+    return report
+
+
+def needs_llm_review(report: dict) -> bool:
+    return bool(report["findings"] or report["ambiguous"])
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"- [{f['severity']}] {f['file']}:{f['line']} {f['rule']}: {f['message']}" for f in report["findings"]
+    ] + [
+        f"- [needs review] {f['file']}:{f['line']} {f['rule']}: {f['message']}" for f in report["ambiguous"]
+    ]
+    return "\n".join(lines) if lines else "No static findings."
@@ -0,0 +1,94 @@
+import os
+from langchain_core.callbacks import BaseCallbackHandler, BaseCallbackManager
+from langchain_core.runnables.config import ensure_config
+from langgraph.config import get_stream_writer
+
+# Stream LLM tokens to the graph's "custom" stream (SDLC_STREAM_TOKENS=0 turns it off)
+STREAM_TOKENS = os.getenv("SDLC_STREAM_TOKENS", "1") != "0"
+
+
+def token_event(source: str, text: str) -> dict:
+    """Custom stream event carrying a piece of an LLM completion; `source` names the node or worker role."""
+    return {"type": "token", "source": source, "text": text}
+
+
+def is_token_event(chunk) -> bool:
+    return isinstance(chunk, dict) and chunk.get("type") == "token"
+
+
+class TokenWriter(BaseCallbackHandler):
+    """
+    Forwards each new LLM token to a LangGraph stream writer.
+    The `tap_output_*` methods mark it as a streaming handler, which makes `invoke` call the
+    model's streaming API; unlike `stream=True` this leaves the response cache key unchanged.
+    """
+
+    run_inline = True
+
+    def __init__(self, writer, source: str):
+        self.writer = writer
+        self.source = source
+        self.streamed = False
+
+    def on_llm_new_token(self, token: str, **kwargs) -> None:
+        if token:
+            self.streamed = True
+            self.writer(token_event(self.source, token))
+
+    def tap_output_iter(self, run_id, output):
+        return output
+
+    def tap_output_aiter(self, run_id, output):
+        return output
+
+
+def _stream_writer():
+    """The running graph's stream writer, or None outside a graph run."""
+    if not STREAM_TOKENS:
+        return None
+    try:
+        return get_stream_writer()
+    except (RuntimeError, KeyError):
+        return None
+
+
+def _streaming_config(handler: TokenWriter) -> dict:
+    """The caller's runnable config with `handler` added to its callbacks (tracing and parent runs are kept)."""
+    config = ensure_config()
+    callbacks = config.get("callbacks")
+    if isinstance(callbacks, BaseCallbackManager):
+        callbacks = callbacks.copy()
+        callbacks.add_handler(handler, inherit=False)
+    else:
+        callbacks = list(callbacks or []) + [handler]
+    return {**config, "callbacks": callbacks}
+
+
+def _finish(writer, handler: TokenWriter, content: str) -> str:
+    # A response served from the cache is not streamed; send it as a single event
+    if not handler.streamed and content:
+        writer(token_event(handler.source, content))
+    return content
+
+
+def stream_completion(llm, messages: list, source: str) -> str:
+    """
+    `llm.invoke(messages).content`, with the tokens written to the graph's custom stream as they arrive.
+    The response cache and rate limiter still apply; outside a graph run it is a plain `invoke`.
+    """
+    writer = _stream_writer()
+    if writer is None:
+        return llm.invoke(messages).content
+    handler = TokenWriter(writer, source)
+    response = llm.invoke(messages, config=_streaming_config(handler))
+    return _finish(writer, handler, response.content)
+
+
+async def astream_completion(llm, messages: list, source: str) -> str:
+    """Async variant of `stream_completion`."""
+    writer = _stream_writer()
+    if writer is None:
+        return (await llm.ainvoke(messages)).content
+    handler = TokenWriter(writer, source)
+    response = await llm.ainvoke(messages, config=_streaming_config(handler))
+    return _finish(writer, handler, response.content)
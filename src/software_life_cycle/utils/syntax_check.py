@@ -0,0 +1,168 @@
+import json
+from typing import List
+from software_life_cycle.utils.concurrency import env_int, parallel_map
+from software_life_cycle.utils.security_scan import code_blocks
+
+# Roles checked at the same time
+SYNTAX_CHECK_WORKERS = env_int("SDLC_SYNTAX_CHECK_WORKERS", 4)
+
+_PYTHON_LANGS = {"python", "py", "python3"}
+_JSON_LANGS = {"json"}
+# Languages with C-style brackets, strings and comments
+_BRACE_LANGS = {
+    "javascript", "js", "jsx", "typescript", "ts", "tsx", "java", "c", "cpp", "c++", "cs", "csharp",
+    "go", "kotlin", "swift", "php", "scala", "dart",
+}
+# Languages with /regex/ literals
+_REGEX_LANGS = {"javascript", "js", "jsx", "typescript", "ts", "tsx"}
+# A '/' after one of these (or at the start) opens a regex literal rather than dividing
+_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^")
+_REGEX_KEYWORDS = {"return", "typeof", "case", "do", "else", "in", "of", "new", "delete", "void", "throw", "yield", "await"}
+_PAIRS = {")": "(", "]": "[", "}": "{"}
+
+
+def _error(location: str, line: int, language: str, message: str) -> dict:
+    return {"file": location, "line": line, "language": language, "message": message}
+
+
+def check_python(code: str) -> List[tuple]:
+    """(line, message) for the first syntax error `compile` reports, if any."""
+    try:
+        compile(code, "<generated>", "exec", dont_inherit=True)
+    except SyntaxError as e:
+        text = f" -> {e.text.strip()}" if e.text and e.text.strip() else ""
+        return [(e.lineno or 1, f"SyntaxError: {e.msg}{text}")]
+    except ValueError as e:
+        return [(1, f"SyntaxError: {e}")]
+    return []
+
+
+def check_json(code: str) -> List[tuple]:
+    try:
+        json.loads(code)
+    except ValueError as e:
+        return [(getattr(e, "lineno", 1), f"Invalid JSON: {getattr(e, 'msg', e)}")]
+    return []
+
+
+def _starts_regex(code: str, i: int) -> bool:
+    """Whether the '/' at `i` opens a regex literal, judged by the token before it."""
+    j = i - 1
+    while j >= 0 and code[j] in " \t\r\n":
+        j -= 1
+    if j < 0 or code[j] in _REGEX_PRECEDERS:
+        return True
+    end = j + 1
+    while j >= 0 and (code[j].isalnum() or code[j] in "_$"):
+        j -= 1
+    return code[j + 1:end] in _REGEX_KEYWORDS
+
+
+def _skip_regex(code: str, i: int) -> int:
+    """Index just past the regex literal starting at `i`, or -1 if it ends on the same line unclosed."""
+    i, n, in_class = i + 1, len(code), False
+    while i < n and code[i] != "\n":
+        ch = code[i]
+        if ch == "\\":
+            i += 1
+        elif ch == "[":
+            in_class = True
+        elif ch == "]":
+            in_class = False
+        elif ch == "/" and not in_class:
+            return i + 1
+        i += 1
+    return -1
+
+
+def check_brackets(code: str, regex: bool = False) -> List[tuple]:
+    """
+    Bracket balance for C-like languages, skipping strings and comments
+    (and /regex/ literals when `regex` is set, for JS/TS).
+    Cheap rather than complete: it catches truncated output and unbalanced edits.
+    """
+    stack, line, i, n = [], 1, 0, len(code)
+    while i < n:
+        ch = code[i]
+        if ch == "\n":
+            line += 1
+        elif regex and ch == "/" and not code.startswith(("//", "/*"), i) and _starts_regex(code, i):
+            end = _skip_regex(code, i)
+            if end != -1:
+                i = end
+                continue
+        elif code.startswith("//", i):
+            end = code.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        elif code.startswith("/*", i):
+            end = code.find("*/", i + 2)
+            if end == -1:
+                return [(line, "Unterminated block comment")]
+            line += code.count("\n", i, end)
+            i = end + 2
+            continue
+        elif ch in "\"'`":
+            start, i = line, i + 1
+            while i < n and code[i] != ch:
+                if code[i] == "\\":
+                    i += 1
+                elif code[i] == "\n":
+                    if ch != "`":
+                        break
+                    line += 1
+                i += 1
+            if i >= n and ch == "`":
+                return [(start, "Unterminated template string")]
+        elif ch in "([{":
+            stack.append((ch, line))
+        elif ch in ")]}":
+            if not stack or stack[-1][0] != _PAIRS[ch]:
+                return [(line, f"Unexpected '{ch}'")]
+            stack.pop()
+        i += 1
+    if stack:
+        opener, opened = stack[-1]
+        return [(opened, f"'{opener}' is never closed")]
+    return []
+
+
+def check_block(language: str, code: str) -> List[tuple]:
+    if language in _PYTHON_LANGS:
+        return check_python(code)
+    if language in _JSON_LANGS:
+        return check_json(code)
+    if language in _BRACE_LANGS:
+        return check_brackets(code, regex=language in _REGEX_LANGS)
+    return []
+
+
+def check_source(location: str, content: str) -> List[dict]:
+    """Syntax errors in one role's fenced code blocks, with line numbers relative to the role's output."""
+    errors = []
+    for language, offset, code in code_blocks(content or ""):
+        for line, message in check_block(language, code):
+            errors.append(_error(location, offset + line - 1, language, message))
+    return errors
+
+
+def check_generated_code(generated_code, workers: int = None) -> List[dict]:
+    """
+    Syntax-checks every role's code blocks in parallel.
+    - Python is compiled; JSON is parsed; C-like languages get a bracket balance check.
+    - Returns errors with role (`file`), line, language and message, in role order.
+    """
+    items = list(generated_code.items()) if isinstance(generated_code, dict) else [("code", generated_code)]
+    results = parallel_map(
+        lambda item: check_source(item[0], item[1] if isinstance(item[1], str) else str(item[1])),
+        items,
+        workers or SYNTAX_CHECK_WORKERS,
+    )
+    return [error for errors in results for error in errors]
+
+
+def format_errors(errors: List[dict]) -> str:
+    return "\n".join(
+        f"- {error['file']} ({error['language'] or 'code'} block, line {error['line']}): {error['message']}"
+        for error in errors
+    )
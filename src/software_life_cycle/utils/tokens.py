@@ -0,0 +1,97 @@
+import os
+import re
+from functools import lru_cache
+from typing import Optional
+
+try:
+    from tokenizers import Tokenizer
+except ImportError:  # tokenizers is optional; fall back to the approximation below
+    Tokenizer = None
+
+# Hugging Face repos holding the tokenizer.json for each Groq model we call
+MODEL_TOKENIZERS = {
+    "qwen-2.5-coder-32b": "Qwen/Qwen2.5-Coder-32B-Instruct",
+    "gemma2-9b-it": "google/gemma-2-9b-it",
+    "llama-3.2-90b-vision-preview": "meta-llama/Llama-3.2-90B-Vision-Instruct",
+    "llama-3.3-70b-versatile": "meta-llama/Llama-3.3-70B-Instruct",
+}
+DEFAULT_MODEL = "qwen-2.5-coder-32b"
+
+# Above this size a string is encoded as a batch of line blocks, which the
+# Rust tokenizer processes on several threads
+FAST_PATH_CHARS = 20_000
+FAST_PATH_BLOCK_CHARS = 4_000
+
+_WORD_OR_SYMBOL = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(model: Optional[str] = None):
+    """
+    Loads and caches the tokenizer for `model`, without touching the network by default.
+    - First looks for `$SDLC_TOKENIZER_DIR/<model>.json`.
+    - Then for the model's tokenizer.json in the local Hugging Face cache
+      (downloaded only when SDLC_TOKENIZER_DOWNLOAD=1).
+    - Returns None when neither is available.
+    """
+    model = model or DEFAULT_MODEL
+    if Tokenizer is None:
+        return None
+
+    local_dir = os.getenv("SDLC_TOKENIZER_DIR")
+    if local_dir:
+        path = os.path.join(local_dir, f"{model}.json")
+        if os.path.exists(path):
+            return Tokenizer.from_file(path)
+
+    repo_id = MODEL_TOKENIZERS.get(model)
+    if repo_id is None:
+        return None
+    try:
+        from huggingface_hub import hf_hub_download
+        path = hf_hub_download(
+            repo_id,
+            "tokenizer.json",
+            local_files_only=os.getenv("SDLC_TOKENIZER_DOWNLOAD", "0") != "1",
+        )
+        return Tokenizer.from_file(path)
+    except Exception as e:
+        print(f"Tokenizer for {model} unavailable ({type(e).__name__}); using approximate token counts.")
+        return None
+
+
+def approximate_tokens(text: str) -> int:
+    """Offline estimate: BPE vocabularies cover short words and symbols in one token,
+    longer identifiers in roughly one token per 4 characters."""
+    return sum(max(1, len(piece) // 4) if piece[0].isalpha() else max(1, len(piece) // 3)
+               for piece in _WORD_OR_SYMBOL.findall(text))
+
+
+def _blocks(text: str, size: int) -> list:
+    """Splits text into line-aligned blocks of about `size` characters."""
+    blocks, start = [], 0
+    while start < len(text):
+        end = text.find("\n", start + size)
+        end = len(text) if end == -1 else end + 1
+        blocks.append(text[start:end])
+        start = end
+    return blocks
+
+
+@lru_cache(maxsize=4096)
+def _count(text: str, model: str) -> int:
+    tokenizer = get_tokenizer(model)
+    if tokenizer is None:
+        return approximate_tokens(text)
+    if len(text) > FAST_PATH_CHARS:
+        encodings = tokenizer.encode_batch(_blocks(text, FAST_PATH_BLOCK_CHARS), add_special_tokens=False)
+        return sum(len(encoding.ids) for encoding in encodings)
+    return len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+def count_tokens(text, model: Optional[str] = None) -> int:
+    """Number of tokens `text` occupies in `model`'s context window."""
+    text = text if isinstance(text, str) else str(text)
+    if not text:
+        return 0
+    return _count(text, model or DEFAULT_MODEL)
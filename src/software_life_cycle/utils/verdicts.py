@@ -0,0 +1,188 @@
+import json
+import re
+from typing import List, Literal, Optional, Type, get_args
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.output_parsers import PydanticOutputParser
+from pydantic import BaseModel, Field, ValidationError, field_validator
+from software_life_cycle.utils.chunk_executor import ainvoke_chunks, invoke_chunks
+from software_life_cycle.utils.metrics import record
+
+
+class ReviewIssue(BaseModel):
+    """One problem a reviewer found."""
+    severity: Literal["critical", "high", "medium", "low"] = Field(default="medium", description="How serious the issue is")
+    role: str = Field(default="", description="Worker role (e.g. 'Backend Developer') whose code has the issue")
+    description: str = Field(description="What is wrong, in one sentence")
+    fix: str = Field(default="", description="How to fix it, in one sentence")
+
+    @field_validator("severity", mode="before")
+    @classmethod
+    def _lower(cls, value):
+        return value.strip().lower() if isinstance(value, str) else value
+
+
+class ReviewVerdict(BaseModel):
+    """Fields shared by every review verdict; subclasses pin down the decision values."""
+    decision: str
+    summary: str = Field(default="", description="One-sentence overall assessment")
+    issues: List[ReviewIssue] = Field(default_factory=list, description="Problems found; empty when there are none")
+
+    @field_validator("decision", mode="before")
+    @classmethod
+    def _normalize_decision(cls, value):
+        return value.strip().strip("'\"").lower() if isinstance(value, str) else value
+
+
+class CodeReviewVerdict(ReviewVerdict):
+    decision: Literal["approve", "revise"] = Field(description="'approve' when the code is acceptable, otherwise 'revise'")
+
+
+class SecurityVerdict(ReviewVerdict):
+    decision: Literal["secure", "fix"] = Field(description="'secure' when no vulnerability needs fixing, otherwise 'fix'")
+
+
+class UnitTestReviewVerdict(ReviewVerdict):
+    decision: Literal["approve", "revise"] = Field(description="'approve' when the test cases are sufficient, otherwise 'revise'")
+
+
+class QAVerdict(ReviewVerdict):
+    decision: Literal["pass", "fail"] = Field(description="'pass' when every test case passes, otherwise 'fail'")
+
+
+def decisions(model: Type[ReviewVerdict]) -> tuple:
+    return get_args(model.model_fields["decision"].annotation)
+
+
+def format_instructions(model: Type[ReviewVerdict]) -> str:
+    return PydanticOutputParser(pydantic_object=model).get_format_instructions() + "\nRespond with the JSON object only."
+
+
+def parse_verdict(model: Type[ReviewVerdict], text: Optional[str]) -> Optional[ReviewVerdict]:
+    """
+    Parses a response into `model`, or returns None.
+    Accepts fenced JSON as well as a JSON object embedded in surrounding prose.
+    """
+    if not text:
+        return None
+    try:
+        return PydanticOutputParser(pydantic_object=model).parse(text)
+    except OutputParserException:
+        pass
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        return None
+    try:
+        return model.model_validate(json.loads(text[start:end + 1]))
+    except (ValueError, ValidationError):
+        return None
+
+
+def repair_messages(model: Type[ReviewVerdict], text: str) -> list:
+    """Prompt asking the model to restate a malformed review as valid JSON."""
+    return [
+        SystemMessage(content="You convert review text into valid JSON. Do not add new findings."),
+        HumanMessage(content=f"{format_instructions(model)}\n\n### Review to convert:\n{text}"),
+    ]
+
+
+def fallback_verdict(model: Type[ReviewVerdict], text: Optional[str]) -> Optional[ReviewVerdict]:
+    """Last resort when even the repair fails: the value on a 'Decision:' line, if there is one."""
+    if not text:
+        return None
+    allowed = "|".join(decisions(model))
+    match = re.search(rf"(?im)^\W*decision\W*\s*(?:[:=-]\s*)?\W*({allowed})\b", text)
+    if not match:
+        return None
+    # Everything but the decision line becomes the summary
+    line_end = text.find("\n", match.end())
+    rest = text[:match.start()] + (text[line_end:] if line_end != -1 else "")
+    return model(decision=match.group(1).lower(), summary=rest.strip())
+
+
+def _unparsed(model: Type[ReviewVerdict], responses: list) -> tuple:
+    verdicts = [parse_verdict(model, response) for response in responses]
+    failed = [idx for idx, verdict in enumerate(verdicts) if verdict is None and responses[idx]]
+    return verdicts, failed
+
+
+def _finish(model, verdicts, failed, responses, repaired) -> List[Optional[ReviewVerdict]]:
+    for idx, text in zip(failed, repaired):
+        verdicts[idx] = parse_verdict(model, text) or fallback_verdict(model, responses[idx])
+    return verdicts
+
+
+def _escalated(model, verdicts, failed, responses, retried) -> tuple:
+    responses = list(responses)
+    for idx, text in zip(failed, retried):
+        if text:
+            responses[idx] = text
+    verdicts, failed = _unparsed(model, responses)
+    return verdicts, failed, responses
+
+
+def parse_verdicts(llm, model: Type[ReviewVerdict], responses: list, label: str,
+                   escalate=None, chunk_messages: list = None) -> List[Optional[ReviewVerdict]]:
+    """
+    Parses each chunk response; the ones that do not parse get one repair call to `llm`.
+    With `escalate` (a larger model) and the original `chunk_messages`, those chunks are first
+    re-asked on `escalate`, which then also does the repairs.
+    A chunk whose call failed (None) stays None.
+    """
+    verdicts, failed = _unparsed(model, responses)
+    if failed and escalate is not None and chunk_messages is not None:
+        print(f"{label}: escalating {len(failed)} unparsable response(s)")
+        record(escalations=len(failed))
+        retried = invoke_chunks(escalate, [chunk_messages[idx] for idx in failed], f"{label} escalation")
+        verdicts, failed, responses = _escalated(model, verdicts, failed, responses, retried)
+        llm = escalate
+    if failed:
+        print(f"{label}: repairing {len(failed)} unparsable response(s)")
+        repaired = invoke_chunks(llm, [repair_messages(model, responses[idx]) for idx in failed], f"{label} repair")
+        verdicts = _finish(model, verdicts, failed, responses, repaired)
+    return verdicts
+
+
+async def aparse_verdicts(llm, model: Type[ReviewVerdict], responses: list, label: str,
+                          escalate=None, chunk_messages: list = None) -> List[Optional[ReviewVerdict]]:
+    """Async variant of `parse_verdicts`."""
+    verdicts, failed = _unparsed(model, responses)
+    if failed and escalate is not None and chunk_messages is not None:
+        print(f"{label}: escalating {len(failed)} unparsable response(s)")
+        record(escalations=len(failed))
+        retried = await ainvoke_chunks(escalate, [chunk_messages[idx] for idx in failed], f"{label} escalation")
+        verdicts, failed, responses = _escalated(model, verdicts, failed, responses, retried)
+        llm = escalate
+    if failed:
+        print(f"{label}: repairing {len(failed)} unparsable response(s)")
+        repaired = await ainvoke_chunks(llm, [repair_messages(model, responses[idx]) for idx in failed], f"{label} repair")
+        verdicts = _finish(model, verdicts, failed, responses, repaired)
+    return verdicts
+
+
+def combined_decision(verdicts: list, accept: str, reject: str, on_missing: str = "skip") -> str:
+    """
+    `accept` only when at least one chunk was reviewed and none of them rejected.
+    A chunk without a usable verdict is skipped, or with `on_missing="reject"` rejects
+    the whole review (for gates where an unreviewed chunk must not pass).
+    """
+    reviewed = [verdict for verdict in verdicts if verdict is not None]
+    if on_missing == "reject" and len(reviewed) < len(verdicts):
+        return reject
+    if not reviewed or any(verdict.decision == reject for verdict in reviewed):
+        return reject
+    return accept
+
+
+def verdict_text(verdict: Optional[ReviewVerdict]) -> str:
+    """Renders a verdict for the feedback log; issues become bullets naming their role."""
+    if verdict is None:
+        return "ERROR: no usable review"
+    lines = [f"Decision: {verdict.decision}"]
+    if verdict.summary:
+        lines.append(verdict.summary)
+    for issue in verdict.issues:
+        role = f"{issue.role}: " if issue.role else ""
+        fix = f" Fix: {issue.fix}" if issue.fix else ""
+        lines.append(f"- [{issue.severity}] {role}{issue.description}{fix}")
+    return "\n".join(lines)
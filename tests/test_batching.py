@@ -0,0 +1,44 @@
+from software_life_cycle.utils.batching import chunk_generated_code, split_at_code_boundaries
+from software_life_cycle.utils.tokens import count_tokens
+
+
+def make_function(name, lines=40):
+    body = "".join(f"    value_{i} = compute_{i}(value_{i - 1})\n" for i in range(1, lines))
+    return f"def {name}(value_0):\n{body}    return value_{lines - 1}\n\n"
+
+
+def test_small_roles_share_one_chunk_in_original_order():
+    code = {"Backend": "print('a')", "Frontend": "console.log('b')", "Database": "SELECT 1;"}
+    chunks = chunk_generated_code(code, token_limit=500)
+    assert chunks == [code]
+
+
+def test_packing_uses_fewer_chunks_than_sequential_fill():
+    limit = 1000
+    roles = {}
+    for name, size in [("A", 600), ("B", 600), ("C", 350), ("D", 350)]:
+        text = "x = 1\n"
+        while count_tokens(text) < size:
+            text += "x = 1\n"
+        roles[name] = text
+    chunks = chunk_generated_code(roles, token_limit=limit)
+    assert len(chunks) == 2
+    assert sorted(k for chunk in chunks for k in chunk) == ["A", "B", "C", "D"]
+
+
+def test_oversized_role_is_split_at_function_boundaries():
+    source = "".join(make_function(f"step_{i}") for i in range(6))
+    limit = count_tokens(make_function("step_0")) * 2 + 50
+    chunks = chunk_generated_code({"Backend": source}, token_limit=limit)
+
+    parts = [value for chunk in chunks for value in chunk.values()]
+    assert len(parts) > 1
+    assert all(part.startswith("def step_") for part in parts)
+    assert sum(part.count("def step_") for part in parts) == 6
+
+
+def test_decorators_stay_with_their_definition():
+    source = "import x\n\n" + "".join(f"@route('/{i}')\n" + make_function(f"view_{i}", 20) for i in range(4))
+    limit = count_tokens(make_function("view_0", 20)) + 60
+    parts = split_at_code_boundaries(source, limit)
+    assert all("@route" not in part.splitlines()[-1] for part in parts)
@@ -0,0 +1,36 @@
+from langchain_core.messages import HumanMessage, SystemMessage
+from software_life_cycle.bench.runner import run_scenario
+from software_life_cycle.LLM.fake import ScriptedChatModel, parse_latency
+
+
+def test_scripted_model_follows_rules_and_reports_usage():
+    llm = ScriptedChatModel(
+        rules=[{"match": r"reviewer", "responses": ["revise", "approve"]}], default="fallback", completion_tokens=7,
+    )
+    review = [SystemMessage(content="You are a reviewer."), HumanMessage(content="Check this.")]
+
+    replies = [llm.invoke(review) for _ in range(3)]
+    assert [reply.content for reply in replies] == ["revise", "approve", "approve"]
+    assert replies[0].usage_metadata["output_tokens"] == 7
+    assert llm.invoke([HumanMessage(content="Anything else")]).content == "fallback"
+    assert "".join(chunk.content for chunk in llm.stream(review)) == "approve"
+    assert llm.calls() == 5
+    assert parse_latency("uniform:0.1:0.5") == ("uniform", 0.1, 0.5)
+
+
+def test_small_scenario_runs_the_whole_graph_offline():
+    report = run_scenario("small")
+
+    assert report["qa_test_result"] == "pass"
+    nodes = {row["node"]: row for row in report["nodes"]}
+    assert {"auto_gen_us", "collect_code_results", "qa_testing", "total"} <= set(nodes)
+    assert nodes["total"]["llm_calls"] == report["served_calls"] > 0
+    assert nodes["total"]["prompt_tokens"] > 0 and report["peak_kb"] > 0
+
+
+def test_bench_command_exits_non_zero_on_bad_arguments():
+    from typer.testing import CliRunner
+    from software_life_cycle.main import app
+
+    assert CliRunner().invoke(app, ["bench", "--scenario", "no-such-scenario"]).exit_code == 1
+    assert CliRunner().invoke(app, ["bench", "--trace", "trace.jsonl"]).exit_code == 1
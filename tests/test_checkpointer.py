@@ -0,0 +1,68 @@
+import sqlite3
+from typing import TypedDict
+from langgraph.graph import START, END, StateGraph
+from langgraph.checkpoint.sqlite import SqliteSaver
+from software_life_cycle.graph.checkpointer import prune_checkpoints, prune_inactive_checkpoints, list_threads
+from software_life_cycle.jobs.queue import AWAITING_REVIEW, COMPLETED, JobQueue
+
+
+class Counter(TypedDict):
+    count: int
+
+
+def build_graph(saver):
+    builder = StateGraph(Counter)
+    builder.add_node("first", lambda state: {"count": state["count"] + 1})
+    builder.add_node("second", lambda state: {"count": state["count"] + 1})
+    builder.add_edge(START, "first")
+    builder.add_edge("first", "second")
+    builder.add_edge("second", END)
+    return builder.compile(checkpointer=saver, interrupt_before=["second"])
+
+
+def checkpoint_count(saver):
+    with saver.cursor() as cur:
+        return cur.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+
+
+def test_prune_keeps_latest_checkpoint_and_thread_still_resumes(tmp_path):
+    saver = SqliteSaver(sqlite3.connect(str(tmp_path / "ck.sqlite"), check_same_thread=False))
+    graph = build_graph(saver)
+    config = {"configurable": {"thread_id": "t1"}}
+    list(graph.stream({"count": 0}, config))
+    assert checkpoint_count(saver) > 1
+
+    prune_checkpoints(saver, max_age_days=7, keep_history=False)
+    assert checkpoint_count(saver) == 1
+
+    list(graph.stream(None, config))
+    assert graph.get_state(config).values["count"] == 2
+
+
+def test_prune_deletes_expired_threads(tmp_path):
+    saver = SqliteSaver(sqlite3.connect(str(tmp_path / "ck.sqlite"), check_same_thread=False))
+    graph = build_graph(saver)
+    list(graph.stream({"count": 0}, {"configurable": {"thread_id": "old"}}))
+    list(graph.stream({"count": 0}, {"configurable": {"thread_id": "running"}}))
+
+    result = prune_checkpoints(saver, max_age_days=-1, exclude=("running",))
+    assert result["deleted"] == 1
+    assert list_threads(saver) == ["running"]
+
+
+def test_prune_skips_threads_of_active_jobs(tmp_path):
+    saver = SqliteSaver(sqlite3.connect(str(tmp_path / "ck.sqlite"), check_same_thread=False))
+    graph = build_graph(saver)
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"))
+    paused = queue.submit({"requirements": "a"})
+    finished = queue.submit({"requirements": "b"})
+    queue.claim("w1")
+    queue.finish(paused, AWAITING_REVIEW)
+    queue.claim("w1")
+    queue.finish(finished, COMPLETED)
+    for thread_id in (paused, finished):
+        list(graph.stream({"count": 0}, {"configurable": {"thread_id": thread_id}}))
+
+    result = prune_inactive_checkpoints(saver, max_age_days=-1, job_db=str(tmp_path / "jobs.sqlite"))
+    assert result == {"deleted": 1, "compacted": 0, "skipped": 1}
+    assert list_threads(saver) == [paused]
@@ -0,0 +1,27 @@
+import asyncio
+from langchain_core.messages import AIMessage, HumanMessage
+from software_life_cycle.utils.chunk_executor import ainvoke_chunks, invoke_chunks
+
+
+class EchoLLM:
+    """Minimal stand-in for a chat model: echoes the prompt, fails on demand."""
+
+    def invoke(self, messages):
+        content = messages[-1].content
+        if content == "boom":
+            raise RuntimeError("rate limited")
+        return AIMessage(content=f" echo {content} ")
+
+    async def ainvoke(self, messages):
+        await asyncio.sleep(0.01 if messages[-1].content == "a" else 0)
+        return self.invoke(messages)
+
+
+def test_invoke_chunks_preserves_order_and_isolates_failures():
+    chunk_messages = [[HumanMessage(content=text)] for text in ["a", "boom", "c"]]
+    assert invoke_chunks(EchoLLM(), chunk_messages, "test") == ["echo a", None, "echo c"]
+
+
+def test_ainvoke_chunks_matches_sync_behaviour():
+    chunk_messages = [[HumanMessage(content=text)] for text in ["a", "boom", "c"]]
+    assert asyncio.run(ainvoke_chunks(EchoLLM(), chunk_messages, "test")) == ["echo a", None, "echo c"]
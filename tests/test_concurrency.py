@@ -0,0 +1,27 @@
+import threading
+import time
+from software_life_cycle.utils.concurrency import parallel_map
+
+
+def test_parallel_map_keeps_input_order():
+    delays = [0.05, 0.01, 0.03, 0.0]
+    results = parallel_map(lambda d: (time.sleep(d), d)[1], delays, max_workers=4)
+    assert results == delays
+
+
+def test_parallel_map_respects_concurrency_cap():
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def work(_):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+
+    parallel_map(work, range(8), max_workers=2)
+    assert peak == 2
@@ -0,0 +1,63 @@
+from software_life_cycle.api.events import (
+    EVENT_SCHEMA_VERSION, NODE_END, NODE_START, SNAPSHOT, TOKEN, WorkflowEvents, apply_event, encode_ndjson,
+    encode_sse, iter_events,
+)
+
+
+def _events():
+    events = WorkflowEvents("wf-1", {"user_stories": "old", "design_documents": {}})
+    return [events.snapshot()] + [
+        event
+        for mode, chunk in [
+            ("tasks", {"id": "1", "name": "auto_gen_us", "input": {}, "triggers": []}),
+            ("custom", {"type": "token", "source": "auto_gen_us", "text": "new"}),
+            ("tasks", {"id": "1", "name": "auto_gen_us", "error": None, "result": {}, "interrupts": []}),
+            ("updates", {"auto_gen_us": {"user_stories": "new", "design_documents": {}}}),
+        ]
+        for event in events.from_chunk(mode, chunk)
+    ]
+
+
+def test_chunks_become_versioned_events_with_deltas():
+    snapshot, start, token, end = _events()
+    assert snapshot["type"] == SNAPSHOT and snapshot["values"]["user_stories"] == "old"
+    assert start["type"] == NODE_START and start["node"] == "auto_gen_us"
+    assert token["type"] == TOKEN and token["text"] == "new"
+    assert end["type"] == NODE_END and end["delta"] == {"user_stories": "new"} and end["patch"] == {}
+    assert [e["seq"] for e in (snapshot, start, token, end)] == [1, 2, 3, 4]
+    assert all(e["v"] == EVENT_SCHEMA_VERSION and e["workflow_id"] == "wf-1" for e in (start, token, end))
+
+
+def test_large_fields_are_patched_and_rebuilt_by_the_client():
+    code = {role: f"code for {role}" for role in ("Backend", "Frontend", "DevOps")}
+    events = WorkflowEvents("wf-1", {"generated_code": code, "feedback": "Round 1", "qa_attempts": 0},
+                            snapshot_every=2)
+    client = apply_event({}, events.snapshot())
+
+    sent = events.from_chunk("updates", {"code_review": {
+        "generated_code": {**code, "Backend": "fixed backend"},
+        "feedback": "Round 1\nRound 2",
+        "qa_attempts": 0,
+    }})
+    assert sent[0]["delta"] == {}
+    assert sent[0]["patch"] == {"generated_code": {"merge": {"Backend": "fixed backend"}}, "feedback": {"append": "\nRound 2"}}
+    for event in sent:
+        client = apply_event(client, event)
+
+    sent = events.from_chunk("updates", {"qa_testing": {"generated_code": {"Backend": "only"}, "qa_attempts": 1}})
+    assert [e["type"] for e in sent] == [NODE_END, SNAPSHOT]
+    assert sent[0]["delta"] == {"generated_code": {"Backend": "only"}, "qa_attempts": 1}
+    client = apply_event(client, sent[0])
+    assert client == sent[1]["values"]
+
+
+def test_ndjson_round_trip():
+    sent = _events()
+    lines = "".join(encode_ndjson(e) for e in sent).encode().splitlines()
+    assert list(iter_events(lines)) == sent
+
+
+def test_sse_round_trip():
+    sent = _events()
+    lines = "".join(encode_sse(e) for e in sent).splitlines()
+    assert list(iter_events(lines)) == sent
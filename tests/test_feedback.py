@@ -0,0 +1,46 @@
+from software_life_cycle.state.state import FeedbackEntry, SoftwareLifecycle
+from software_life_cycle.utils.feedback import compact_feedback, record_feedback, roles_flagged_by_feedback
+
+
+def test_older_entries_are_reduced_to_new_issue_lines():
+    entries = [
+        FeedbackEntry(phase="code_review", attempt=1, content="Looks rough.\n- Missing input validation\n- Use parameterized SQL"),
+        FeedbackEntry(phase="code_review", attempt=2, content="Still issues:\n- missing input validation"),
+    ]
+    compacted = compact_feedback(entries, token_budget=500)
+
+    assert "Looks rough." not in compacted
+    assert compacted.count("nput validation") == 1
+    assert "- Use parameterized SQL" in compacted
+    assert compacted.index("[Code Review Attempt 1]") < compacted.index("[Code Review Attempt 2]")
+
+
+def test_compaction_respects_token_budget_keeping_newest():
+    entries = [
+        FeedbackEntry(phase="qa_testing", attempt=i, content="\n".join(f"- issue {i}.{j} in module" for j in range(50)))
+        for i in range(1, 4)
+    ]
+    compacted = compact_feedback(entries, token_budget=120)
+
+    assert "[QA Testing Attempt 3]" in compacted
+    assert "[QA Testing Attempt 1]" not in compacted
+
+
+def test_record_feedback_bounds_the_log():
+    state = SoftwareLifecycle()
+    for attempt in range(20):
+        state = state.model_copy(update=record_feedback(state, "code_review", attempt, f"- issue {attempt}"))
+    assert len(state.feedback_log) == 12
+    assert state.feedback_log[-1].attempt == 19
+    assert "- issue 19" in state.feedback
+
+
+def test_feedback_is_attributed_to_roles_of_the_current_round():
+    roles = ["Backend Developer", "Frontend Developer", "AI Engineer"]
+    entries = [
+        FeedbackEntry(phase="code_review", attempt=1, generation=0, content="- frontend form lacks validation"),
+        FeedbackEntry(phase="code_review", attempt=2, generation=1, content="- The backend endpoint leaks stack traces\n- said again"),
+    ]
+    assert roles_flagged_by_feedback(entries, roles, generation=1) == ["Backend Developer"]
+    assert roles_flagged_by_feedback(entries, roles, generation=0) == ["Frontend Developer"]
+    assert roles_flagged_by_feedback(entries, roles, generation=5) == []
@@ -0,0 +1,77 @@
+import pytest
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, StateGraph
+from software_life_cycle.jobs.queue import CANCELLED, COMPLETED, QUEUED, RUNNING, JobQueue
+from software_life_cycle.jobs.worker import run_job
+from software_life_cycle.state.state import SoftwareLifecycle
+
+
+def test_jobs_are_claimed_once_in_submission_order(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"))
+    first = queue.submit({"requirements": "a"})
+    second = queue.submit({"requirements": "b"})
+
+    assert queue.claim("w1")["id"] == first
+    assert queue.claim("w2")["id"] == second
+    assert queue.claim("w3") is None
+    assert queue.counts() == {RUNNING: 2}
+
+
+def test_progress_and_result_are_recorded(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"))
+    job_id = queue.submit({"requirements": "a"})
+    queue.claim("w1")
+    queue.progress(job_id, "auto_gen_us")
+    queue.progress(job_id, "create_design_doc")
+    queue.finish(job_id, COMPLETED, result={"qa_test_result": "pass"})
+
+    job = JobQueue(str(tmp_path / "jobs.sqlite")).get(job_id)
+    assert job["status"] == COMPLETED
+    assert job["current_node"] == "create_design_doc"
+    assert job["nodes_completed"] == ["auto_gen_us", "create_design_doc"]
+    assert job["result"] == {"qa_test_result": "pass"}
+
+
+def test_cancel_and_orphan_requeue(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"))
+    queued = queue.submit({"requirements": "a"})
+    assert queue.cancel(queued)["status"] == CANCELLED
+
+    running = queue.submit({"requirements": "b"})
+    queue.claim("dead-worker")
+    assert queue.requeue_orphans(lambda worker: worker != "dead-worker") == 1
+    assert queue.get(running)["status"] == QUEUED
+
+
+def test_requeued_job_resumes_from_its_checkpoint(tmp_path):
+    calls = []
+
+    def node(name, field):
+        def run(state):
+            calls.append(name)
+            if name == "create_design_doc" and calls.count(name) == 1:
+                raise SystemExit("worker killed")
+            return {field: name}
+        return run
+
+    builder = StateGraph(SoftwareLifecycle)
+    builder.add_node("auto_gen_us", node("auto_gen_us", "user_stories"))
+    builder.add_node("create_design_doc", node("create_design_doc", "design_documents"))
+    builder.add_edge(START, "auto_gen_us")
+    builder.add_edge("auto_gen_us", "create_design_doc")
+    builder.add_edge("create_design_doc", END)
+    graph = builder.compile(checkpointer=MemorySaver())
+
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"))
+    job_id = queue.submit({"requirements": "a"})
+    with pytest.raises(SystemExit):
+        run_job(queue, queue.claim("dead-worker"), graph)
+    assert queue.get(job_id)["nodes_completed"] == ["auto_gen_us"]
+
+    assert queue.requeue_orphans(lambda worker: False) == 1
+    assert run_job(queue, queue.claim("w2"), graph) == COMPLETED
+
+    assert calls == ["auto_gen_us", "create_design_doc", "create_design_doc"]
+    job = queue.get(job_id)
+    assert job["nodes_completed"] == ["create_design_doc"]
+    assert job["result"]["user_stories"] == "auto_gen_us"
@@ -0,0 +1,32 @@
+import time
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration
+from software_life_cycle.LLM.cache import DiskResponseCache
+
+
+def test_cache_serves_identical_request_without_calling_model(tmp_path):
+    cache = DiskResponseCache(str(tmp_path / "cache.sqlite"))
+    model = GenericFakeChatModel(messages=iter([AIMessage(content="first"), AIMessage(content="second")]), cache=cache)
+
+    assert model.invoke([HumanMessage(content="hello")]).content == "first"
+    assert model.invoke([HumanMessage(content="hello")]).content == "first"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_expires_entries_after_ttl(tmp_path):
+    cache = DiskResponseCache(str(tmp_path / "cache.sqlite"), ttl_seconds=0.01)
+    cache.update("prompt", "model", [ChatGeneration(message=AIMessage(content="x"))])
+    time.sleep(0.05)
+    assert cache.lookup("prompt", "model") is None
+
+
+def test_cache_evicts_least_recently_used_over_size_cap(tmp_path):
+    cache = DiskResponseCache(str(tmp_path / "cache.sqlite"), max_bytes=1500)
+    cache.update("a", "model", [ChatGeneration(message=AIMessage(content="a" * 400))])
+    time.sleep(0.01)
+    cache.update("b", "model", [ChatGeneration(message=AIMessage(content="b" * 400))])
+
+    assert cache.lookup("a", "model") is None
+    assert cache.lookup("b", "model")[0].message.content == "b" * 400
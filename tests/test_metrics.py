@@ -0,0 +1,56 @@
+import itertools
+import json
+from typing import TypedDict
+from langchain_core.caches import InMemoryCache
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import END, START, StateGraph
+from software_life_cycle.utils import metrics
+from software_life_cycle.utils.metrics import LLMMetrics, summarize, thread_metrics, traced
+
+
+class State(TypedDict):
+    text: str
+
+
+def _graph(llm):
+    def write(state):
+        return {"text": llm.invoke([HumanMessage(content="same prompt")]).content}
+
+    builder = StateGraph(State)
+    builder.add_node("write", RunnableLambda(traced("write", write)[0], name="write"))
+    builder.add_edge(START, "write")
+    builder.add_edge("write", END)
+    return builder.compile()
+
+
+def test_node_runs_record_llm_usage_cache_hits_and_cost(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_PATH", str(tmp_path / "metrics.jsonl"))
+    usage = {"input_tokens": 1000, "output_tokens": 500, "total_tokens": 1500}
+    llm = GenericFakeChatModel(
+        messages=itertools.repeat(AIMessage(content="done", usage_metadata=usage)),
+        cache=InMemoryCache(),
+        callbacks=[LLMMetrics("llama-3.3-70b-versatile")],
+    )
+    graph = _graph(llm)
+    for _ in range(2):
+        graph.invoke({"text": ""}, {"configurable": {"thread_id": "t-metrics"}})
+
+    first, second = thread_metrics("t-metrics")
+    assert (first["attempt"], second["attempt"]) == (1, 2)
+    assert first["llm_calls"] == 1 and first["prompt_tokens"] == 1000 and first["completion_tokens"] == 500
+    assert first["cost_usd"] == round((1000 * 0.59 + 500 * 0.79) / 1_000_000, 6)
+    assert second["llm_calls"] == 0 and second["cache_hits"] == 1 and second["cost_usd"] == 0
+
+    write, total = summarize(thread_metrics("t-metrics"))
+    assert write["node"] == "write" and total["node"] == "total"
+    assert total["runs"] == 2 and total["llm_calls"] == 1 and total["cache_hits"] == 1
+
+    lines = (tmp_path / "metrics.jsonl").read_text().splitlines()
+    assert [json.loads(line)["attempt"] for line in lines] == [1, 2]
+
+
+def test_usage_outside_a_node_is_ignored():
+    metrics.record(llm_calls=1)  # no node run in progress: nothing to attribute it to
+    assert thread_metrics("never-ran") == []
@@ -0,0 +1,31 @@
+from software_life_cycle.node.coder import worker_messages
+from software_life_cycle.state.state import SoftwareLifecycle
+from software_life_cycle.utils.prompts import PrefixTracker, assemble, common_prefix, prompt_text
+
+
+def test_segments_are_laid_out_stable_first_and_repeats_dropped():
+    system, human = assemble(
+        "You review code.", instructions="Reply in JSON.", design="# Design",
+        context=[("Feedback", "fix the parser"), ("Again", "fix the parser"), ("Empty", "")],
+        tail=[("Code", "x = 1")],
+    )
+    assert system.content == "You review code."
+    assert human.content == "Reply in JSON.\n\n### Design Document:\n# Design\n\n### Feedback:\nfix the parser\n\n### Code:\nx = 1"
+
+
+def test_context_contained_in_an_earlier_segment_is_kept():
+    _, human = assemble("s", instructions="Check input validation.", design="Use JWT auth.",
+                        context=[("Feedback", "JWT"), ("Tests", "input validation")])
+    assert "### Feedback:\nJWT" in human.content
+    assert "### Tests:\ninput validation" in human.content
+
+
+def test_worker_prompts_share_everything_but_the_role():
+    state = SoftwareLifecycle(requirements="r", design_documents="# Design\n" + "detail " * 200, feedback="Use typing.")
+    backend = prompt_text(worker_messages(state, "Backend Developer", "Generate code for Backend Developer"))
+    frontend = prompt_text(worker_messages(state, "Frontend Developer", "Generate code for Frontend Developer"))
+
+    shared = common_prefix(backend, frontend)
+    assert backend[shared:].startswith("Backend") and shared / len(backend) > 0.9
+    tracker = PrefixTracker()
+    assert tracker.observe(backend) == 0 and tracker.observe(frontend) == shared
@@ -0,0 +1,83 @@
+import pytest
+from software_life_cycle.LLM.rate_limit import ModelScheduler, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+class Unavailable(Exception):
+    status_code = 503
+
+
+def test_bucket_queues_callers_instead_of_refusing():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock)  # one token per second
+    assert bucket.reserve(60) == 0
+    assert bucket.reserve(1) == pytest.approx(1)
+    assert bucket.reserve(1) == pytest.approx(2)
+
+    clock.now = 10
+    bucket.adjust(5)  # usage came in lower than reserved
+    assert bucket.reserve(1) == 0
+
+
+def test_scheduler_spaces_requests_to_the_rpm_quota():
+    clock = FakeClock()
+    scheduler = ModelScheduler("m", rpm=2, tpm=100_000, clock=clock)
+    for _ in range(4):
+        scheduler.call(10, lambda: "ok", sleep=clock.sleep)
+
+    # two requests fit the bucket, the next two wait 30s each
+    assert clock.now == pytest.approx(60)
+    assert scheduler.stats()["calls"] == 4
+    assert scheduler.stats()["queued"] == 0
+
+
+def test_scheduler_retries_429_with_backoff():
+    clock = FakeClock()
+    scheduler = ModelScheduler("m", rpm=1000, tpm=100_000, clock=clock)
+    responses = iter([RateLimited("429"), RateLimited("429"), "ok"])
+
+    def call():
+        response = next(responses)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    assert scheduler.call(10, call, sleep=clock.sleep) == "ok"
+    assert scheduler.stats()["throttled"] == 2
+
+
+def test_scheduler_does_not_retry_other_errors():
+    scheduler = ModelScheduler("m", rpm=1000, tpm=100_000)
+    with pytest.raises(ValueError):
+        scheduler.call(10, lambda: (_ for _ in ()).throw(ValueError("bad request")))
+
+
+def test_scheduler_retries_transient_errors_without_draining_tokens():
+    clock = FakeClock()
+    scheduler = ModelScheduler("m", rpm=1000, tpm=100_000, clock=clock)
+    responses = iter([Unavailable("503"), "ok"])
+
+    def call():
+        response = next(responses)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    assert scheduler.call(10, call, sleep=clock.sleep) == "ok"
+    assert scheduler.stats()["transient_errors"] == 1
+    assert scheduler.stats()["throttled"] == 0
+    assert scheduler.tokens.level > 0
@@ -0,0 +1,37 @@
+import pytest
+from langchain_core.messages import HumanMessage, SystemMessage
+from software_life_cycle.bench.runner import run_replay, run_scenario
+from software_life_cycle.bench.scenarios import SCENARIOS
+from software_life_cycle.LLM.fake import ScriptedChatModel
+from software_life_cycle.LLM.replay import ReplayMissError, TraceRecorder, replay_client, replay_delay
+
+
+def test_recorded_exchanges_replay_in_order_by_request(tmp_path):
+    trace = str(tmp_path / "trace.jsonl.gz")
+    llm = ScriptedChatModel(
+        model_name="m", rules=[{"match": "review", "responses": ["revise", "approve"]}], default="hello",
+        callbacks=[TraceRecorder("m", trace)],
+    )
+    review = [SystemMessage(content="You review code."), HumanMessage(content="x = 1")]
+    recorded = [llm.invoke(review).content, llm.invoke([HumanMessage(content="hi")]).content, llm.invoke(review).content]
+
+    replay = replay_client("m", trace, "recorded")
+    assert [replay.invoke(review).content, replay.invoke([HumanMessage(content="hi")]).content,
+            replay.invoke(review).content] == recorded == ["revise", "hello", "approve"]
+    assert replay.invoke(review).usage_metadata["input_tokens"] > 0
+    with pytest.raises(ReplayMissError):
+        replay.invoke([HumanMessage(content="never recorded")])
+    assert replay.misses() == 1
+    assert replay_delay("scaled:0.5", 2.0) == 1.0 and replay_delay("zero", 2.0) == 0.0
+
+
+def test_replaying_a_recorded_workflow_reproduces_it(tmp_path):
+    trace = str(tmp_path / "small.jsonl")
+    recorded = run_scenario("small", record=trace)
+    replayed = run_replay(trace, SCENARIOS["small"]["requirements"])
+
+    assert replayed["misses"] == 0 and replayed["error"] is None
+    assert replayed["qa_test_result"] == recorded["qa_test_result"] == "pass"
+    total = {report["scenario"]: report["nodes"][-1] for report in (recorded, replayed)}
+    assert total["replay"]["llm_calls"] == total["small"]["llm_calls"]
+    assert total["replay"]["prompt_tokens"] == total["small"]["prompt_tokens"]
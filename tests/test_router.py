@@ -0,0 +1,58 @@
+import json
+import pytest
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableLambda
+from software_life_cycle.LLM.fake import ScriptedChatModel
+from software_life_cycle.LLM.llm import set_llm
+from software_life_cycle.LLM.router import RoutedClient, invoke_checked, load_policy
+from software_life_cycle.node.coder import valid_worker_roles
+from software_life_cycle.utils.verdicts import UnitTestReviewVerdict, parse_verdicts
+
+
+@pytest.fixture
+def clients():
+    replaced = []
+
+    def use(name, client):
+        replaced.append(name)
+        set_llm(name, client)
+
+    yield use
+    for name in replaced:
+        set_llm(name, None)
+
+
+def _timeout(messages):
+    raise TimeoutError("request timed out")
+
+
+def test_policy_file_overrides_node_routes(tmp_path):
+    path = tmp_path / "policy.json"
+    path.write_text(json.dumps({"code_review": {"model": "llm_fast", "escalate": "llm_coder"}}))
+    policy = load_policy(str(path))
+    assert policy["code_review"] == {"model": "llm_fast", "escalate": "llm_coder"}
+    assert policy["qa_testing"]["model"] == "llm_coder"
+
+    path.write_text(json.dumps({"code_review": {"model": "gpt-huge"}}))
+    with pytest.raises(ValueError):
+        load_policy(str(path))
+
+
+def test_errors_fall_back_to_the_next_model(clients):
+    clients("llm_coder", RunnableLambda(_timeout))
+    clients("llm", ScriptedChatModel(default="reviewed by the fallback"))
+    assert RoutedClient("code_review").invoke([HumanMessage(content="review")]).content == "reviewed by the fallback"
+
+
+def test_invalid_responses_escalate_to_the_larger_model(clients):
+    clients("llm_fast", ScriptedChatModel(default="Here are the roles you need for this design, with explanations."))
+    clients("llm_docs", ScriptedChatModel(default="Backend Developer\nFrontend Developer"))
+    roles = invoke_checked(RoutedClient("generate_worker_roles"), [HumanMessage(content="roles")], valid_worker_roles, "t")
+    assert roles == "Backend Developer\nFrontend Developer"
+
+    review = RoutedClient("review_test_cases")
+    clients("llm_fast", ScriptedChatModel(default="Looks fine to me."))
+    clients("llm_coder", ScriptedChatModel(default='{"decision": "approve"}'))
+    messages = [[HumanMessage(content="review these tests")]]
+    verdicts = parse_verdicts(review, UnitTestReviewVerdict, ["Looks fine to me."], "t", review.escalation, messages)
+    assert verdicts[0].decision == "approve"
@@ -0,0 +1,105 @@
+import os
+import time
+import pytest
+from software_life_cycle.utils.sandbox import QAResultCache, run_pytest, run_test_suite, shard, write_workspace
+
+GENERATED_CODE = {
+    "Backend Developer": "Implementation:\n```python\ndef add(a, b):\n    return a + b\n\ndef sub(a, b):\n    return a - b + 1\n```",
+}
+
+TEST_CASES = """## Unit tests
+```python
+from calculator import add, sub
+
+def test_add():
+    assert add(1, 2) == 3
+
+def test_sub():
+    assert sub(3, 1) == 2
+```
+"""
+
+
+def test_tests_run_against_generated_code():
+    report = run_test_suite(GENERATED_CODE, TEST_CASES, workers=1)
+
+    outcomes = {result["test"]: result["outcome"] for result in report["results"]}
+    assert outcomes == {"test_case_1::test_add": "passed", "test_case_1::test_sub": "failed"}
+    assert report["summary"]["total"] == 2
+
+
+def test_network_is_blocked():
+    tests = "```python\nimport socket\n\ndef test_net():\n    socket.create_connection(('example.com', 80))\n```"
+    report = run_test_suite(GENERATED_CODE, tests, workers=1)
+    assert report["results"][0]["outcome"] == "failed"
+    assert "network access is disabled" in report["results"][0]["message"]
+
+
+def test_no_python_tests_returns_none():
+    assert run_test_suite(GENERATED_CODE, "1. Check that the page loads.", workers=1) is None
+
+
+def test_unchanged_files_are_served_from_cache(tmp_path):
+    cache = QAResultCache(str(tmp_path / "qa.sqlite"))
+    tests = TEST_CASES + "\n```python\nfrom calculator import add\n\ndef test_add_again():\n    assert add(2, 2) == 4\n```\n"
+
+    first = run_test_suite(GENERATED_CODE, tests, workers=2, cache=cache)
+    assert first["summary"]["shards"] == 2 and first["summary"]["cached_files"] == 0
+
+    second = run_test_suite(GENERATED_CODE, tests, workers=2, cache=cache)
+    assert second["summary"]["shards"] == 0 and second["summary"]["cached_files"] == 2
+    assert second["results"] == first["results"]
+
+    changed = {"Backend Developer": GENERATED_CODE["Backend Developer"].replace("a - b + 1", "a - b")}
+    third = run_test_suite(changed, tests, workers=2, cache=cache)
+    assert third["summary"]["cached_files"] == 0 and third["summary"]["failed"] == 0
+
+
+def test_shards_are_balanced_by_size():
+    files = {"test_a.py": "x" * 50, "test_b.py": "x" * 30, "test_c.py": "x" * 20, "test_d.py": "x" * 10}
+    assert shard(files, 2) == [["test_a.py", "test_d.py"], ["test_b.py", "test_c.py"]]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="process groups are POSIX-only")
+def test_timeout_kills_processes_spawned_by_tests(tmp_path):
+    tests = {"test_spawn.py": (
+        "import subprocess, sys, time\n\n"
+        "def test_spawn():\n"
+        "    child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+        "    open('grandchild.pid', 'w').write(str(child.pid))\n"
+        "    time.sleep(60)\n"
+    )}
+    write_workspace(str(tmp_path), {}, tests)
+
+    results = run_pytest(str(tmp_path), ["test_spawn.py"], "spawn.junit.xml", timeout=3)
+    assert results[0]["outcome"] == "timeout"
+
+    pid = int((tmp_path / "grandchild.pid").read_text())
+    deadline = time.monotonic() + 5
+    while _alive(pid) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert not _alive(pid)
+
+
+def _alive(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def test_qa_command_exits_non_zero_when_tests_fail(tmp_path):
+    from typer.testing import CliRunner
+    from software_life_cycle.main import app
+
+    (tmp_path / "code").mkdir()
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "code" / "calculator.py").write_text("def sub(a, b):\n    return a - b + 1\n")
+    (tmp_path / "tests" / "test_case_1.py").write_text(
+        "from calculator import sub\n\ndef test_sub():\n    assert sub(3, 1) == 2\n"
+    )
+    result = CliRunner().invoke(app, [
+        "qa", "--code-dir", str(tmp_path / "code"), "--tests-dir", str(tmp_path / "tests"), "--workers", "1",
+    ], env={"SDLC_QA_CACHE": "0"})
+    assert result.exit_code == 1
@@ -0,0 +1,40 @@
+from software_life_cycle.utils.security_scan import needs_llm_review, scan_code
+
+
+def _rules(report):
+    return {(finding["rule"], finding["line"]) for finding in report["findings"]}
+
+
+def test_clean_python_is_not_escalated():
+    code = {"Backend Developer": "```python\ndef add(a, b):\n    return a + b\n```"}
+    report = scan_code(code)
+    assert report == {"findings": [], "ambiguous": []}
+    assert not needs_llm_review(report)
+
+
+def test_python_findings_carry_file_and_line():
+    code = (
+        "Notes\n```python\nimport subprocess\n"
+        "API_KEY = 'abcd1234efgh'\n"
+        "def find(cur, name):\n"
+        "    cur.execute(f\"SELECT * FROM users WHERE name = '{name}'\")\n"
+        "    cur.execute('SELECT * FROM users WHERE name = ?', (name,))\n"
+        "    subprocess.run(name, shell=True)\n```"
+    )
+    report = scan_code({"Backend Developer": code})
+    assert _rules(report) == {("hardcoded-secret", 4), ("sql-injection", 6), ("command-injection", 8)}
+    assert all(finding["file"] == "Backend Developer" for finding in report["findings"])
+
+
+def test_javascript_patterns_and_ambiguous_code():
+    code = "```javascript\nel.innerHTML = userInput;\nfunction login(user) { return check(user); }\n```"
+    report = scan_code({"Frontend Developer": code})
+    assert _rules(report) == {("xss-inner-html", 2)}
+    assert [item["rule"] for item in report["ambiguous"]] == ["auth-logic"]
+
+
+def test_unparsable_python_is_escalated():
+    report = scan_code("```python\ndef broken(:\n    pass\n```")
+    assert report["findings"] == []
+    assert report["ambiguous"][0]["rule"] == "unparsable"
+    assert needs_llm_review(report)
@@ -0,0 +1,35 @@
+import pytest
+from software_life_cycle.api.sessions import SessionLimitError, SessionRegistry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_registry_caps_concurrent_sessions():
+    registry = SessionRegistry(max_sessions=2, idle_seconds=60, clock=FakeClock())
+    registry.create()
+    registry.create()
+    with pytest.raises(SessionLimitError):
+        registry.create()
+
+
+def test_idle_sessions_are_evicted_but_active_ones_kept():
+    clock = FakeClock()
+    registry = SessionRegistry(max_sessions=2, idle_seconds=60, clock=clock)
+    registry.create("idle")
+    active = registry.create("active")
+
+    clock.now = 45
+    assert registry.get("active") is active
+    clock.now = 90
+
+    # "idle" has not been touched for 90s, "active" only for 45s
+    session = registry.create("new")
+    assert registry.get("idle") is None
+    assert registry.get("active") is active
+    assert session.workflow_id == "new"
@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+# Wall-clock seconds `main --help` may take, interpreter start-up included
+STARTUP_BUDGET = float(os.getenv("SDLC_STARTUP_BUDGET", "0.75"))
+HEAVY_MODULES = ("langgraph", "langchain_core", "langchain_groq", "groq", "fastapi", "IPython")
+
+
+def _python(*args):
+    env = {key: value for key, value in os.environ.items() if key != "GROQ_API_KEY"}
+    env["PYTHONPATH"] = str(SRC)
+    return subprocess.run([sys.executable, *args], env=env, capture_output=True, text=True, timeout=60)
+
+
+def test_cli_import_has_no_heavy_dependencies_or_side_effects():
+    result = _python("-c", (
+        "import sys, software_life_cycle.main\n"
+        f"print(sorted({{m.split('.')[0] for m in sys.modules}} & set({HEAVY_MODULES!r})))"
+    ))
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
+
+
+def test_help_is_within_the_startup_budget():
+    _python("-m", "software_life_cycle.main", "--help")  # warm the bytecode cache
+    start = time.perf_counter()
+    result = _python("-m", "software_life_cycle.main", "--help")
+    elapsed = time.perf_counter() - start
+    assert result.returncode == 0, result.stderr
+    assert "run" in result.stdout
+    assert elapsed < STARTUP_BUDGET, f"--help took {elapsed:.2f}s (budget {STARTUP_BUDGET}s)"
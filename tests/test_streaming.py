@@ -0,0 +1,56 @@
+import asyncio
+import itertools
+from typing import TypedDict
+from langchain_core.caches import InMemoryCache
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, StateGraph
+from software_life_cycle.utils.streaming import astream_completion, stream_completion
+
+
+class State(TypedDict):
+    text: str
+
+
+def _graph(node):
+    builder = StateGraph(State)
+    builder.add_node("write", node)
+    builder.add_edge(START, "write")
+    builder.add_edge("write", END)
+    return builder.compile()
+
+
+def _fake(text, cache=None):
+    return GenericFakeChatModel(messages=itertools.repeat(AIMessage(content=text)), cache=cache)
+
+
+def test_tokens_reach_the_custom_stream():
+    llm = _fake("hello streaming world")
+    graph = _graph(lambda state: {"text": stream_completion(llm, [HumanMessage(content="hi")], "writer")})
+
+    events = [chunk for mode, chunk in graph.stream({"text": ""}, stream_mode=["custom", "updates"]) if mode == "custom"]
+    assert len(events) > 1
+    assert {event["source"] for event in events} == {"writer"}
+    assert "".join(event["text"] for event in events) == "hello streaming world"
+
+
+def test_cached_response_is_sent_as_one_event():
+    llm = _fake("cached answer", cache=InMemoryCache())
+    graph = _graph(lambda state: {"text": stream_completion(llm, [HumanMessage(content="hi")], "writer")})
+    list(graph.stream({"text": ""}))
+
+    events = [chunk for chunk in graph.stream({"text": ""}, stream_mode="custom")]
+    assert [event["text"] for event in events] == ["cached answer"]
+
+
+def test_async_streaming_and_plain_calls_outside_a_graph():
+    llm = _fake("async tokens")
+
+    async def node(state):
+        return {"text": await astream_completion(llm, [HumanMessage(content="hi")], "writer")}
+
+    async def run():
+        return [chunk async for chunk in _graph(node).astream({"text": ""}, stream_mode="custom")]
+
+    assert "".join(event["text"] for event in asyncio.run(run())) == "async tokens"
+    assert stream_completion(llm, [HumanMessage(content="hi")], "writer") == "async tokens"
@@ -0,0 +1,31 @@
+from software_life_cycle.utils.syntax_check import check_brackets, check_generated_code
+
+
+def test_python_errors_are_located_per_role():
+    code = {
+        "Backend Developer": "Service:\n```python\ndef ok():\n    return 1\n\ndef broken(:\n    pass\n```",
+        "Frontend Developer": "```javascript\nconst s = \"}\"; // ) in a comment\nfunction f() { return [1, 2]; }\n```",
+    }
+    errors = check_generated_code(code, workers=2)
+    assert [(error["file"], error["line"], error["language"]) for error in errors] == [
+        ("Backend Developer", 6, "python")
+    ]
+
+
+def test_unbalanced_brackets():
+    assert check_brackets("function f() {\n  if (x) {\n    go();\n}\n") == [(1, "'{' is never closed")]
+    assert check_brackets("const a = [1, 2);") == [(1, "Unexpected ')'")]
+
+
+
+def test_json_and_unknown_languages():
+    errors = check_generated_code({"Config": "```json\n{\"a\": 1,}\n```\n```bash\necho ${\n```"})
+    assert [(error["file"], error["language"]) for error in errors] == [("Config", "json")]
+
+
+def test_valid_code_is_not_flagged():
+    css = "body { background: url(http://example.com/a.png); }"
+    js = "const re = /[(]/;\nconst half = total / 2; // (\nif (/}/.test(s)) { return s.split(/,/); }"
+    errors = check_generated_code({"Frontend Developer": f"```css\n{css}\n```\n```javascript\n{js}\n```"})
+    assert errors == []
+    assert check_brackets("const re = /[(]/;", regex=True) == []
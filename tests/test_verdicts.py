@@ -0,0 +1,56 @@
+from langchain_core.messages import AIMessage
+from software_life_cycle.node.code_security import apply_security_review
+from software_life_cycle.state.state import SoftwareLifecycle
+from software_life_cycle.utils.verdicts import (
+    CodeReviewVerdict, SecurityVerdict, combined_decision, parse_verdict, parse_verdicts, verdict_text,
+)
+
+
+class RepairLLM:
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return AIMessage(content=self.reply)
+
+
+def test_parses_fenced_and_embedded_json():
+    fenced = '```json\n{"decision": "Approve", "issues": []}\n```'
+    assert parse_verdict(CodeReviewVerdict, fenced).decision == "approve"
+
+    embedded = 'Here is my review:\n{"decision": "fix", "issues": [{"severity": "HIGH", "role": "Backend Developer", ' \
+               '"description": "SQL built with f-strings"}]}\nThanks!'
+    verdict = parse_verdict(SecurityVerdict, embedded)
+    assert verdict.issues[0].severity == "high"
+    assert "- [high] Backend Developer: SQL built with f-strings" in verdict_text(verdict)
+
+
+def test_unparsable_responses_get_one_repair_call():
+    llm = RepairLLM('{"decision": "secure"}')
+    verdicts = parse_verdicts(llm, SecurityVerdict, ['{"decision": "secure"}', "The code looks insecure to me.", None], "test")
+    assert [v.decision if v else None for v in verdicts] == ["secure", "secure", None]
+    assert llm.calls == 1
+
+
+def test_failed_repair_falls_back_to_the_decision_line():
+    verdicts = parse_verdicts(RepairLLM("still not json"), CodeReviewVerdict, ["- Decision: revise\n- Feedback: add tests"], "test")
+    assert verdicts[0].decision == "revise"
+    assert parse_verdicts(RepairLLM("nope"), CodeReviewVerdict, ["I approve of nothing here"], "test") == [None]
+
+
+def test_combined_decision_needs_every_chunk_to_accept():
+    secure, fix = SecurityVerdict(decision="secure"), SecurityVerdict(decision="fix")
+    assert combined_decision([secure, secure], "secure", "fix") == "secure"
+    assert combined_decision([secure, fix], "secure", "fix") == "fix"
+    assert combined_decision([None], "secure", "fix") == "fix"
+
+
+def test_security_review_rejects_an_escalated_chunk_without_verdict():
+    secure = SecurityVerdict(decision="secure")
+    assert combined_decision([secure, None], "secure", "fix") == "secure"
+    assert combined_decision([secure, None], "secure", "fix", on_missing="reject") == "fix"
+
+    state = apply_security_review(SoftwareLifecycle(), [secure, None], indexes=[0, 2], scans=[None] * 3)
+    assert state.security_feedback == "fix"
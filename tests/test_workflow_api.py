@@ -0,0 +1,40 @@
+import streamlit as st
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from software_life_cycle.api import workflow
+from software_life_cycle.api.sessions import AWAITING_REVIEW, COMPLETED, WorkflowSession
+from software_life_cycle.ui.streamlit_ui.display_output import collect_user_story_feedback
+
+
+def _client(monkeypatch, status):
+    looked_up = []
+
+    async def find_session(workflow_id):
+        looked_up.append(workflow_id)
+        session = WorkflowSession(workflow_id)
+        session.status = status
+        return session
+
+    monkeypatch.setattr(workflow, "find_session", find_session)
+    app = FastAPI()
+    app.include_router(workflow.router)
+    return TestClient(app), looked_up
+
+
+def test_ui_feedback_payload_is_accepted(monkeypatch):
+    st.session_state.workflow_id = "wf-1"
+    st.session_state.current_user_stories = "As a user, I can log in."
+    payload = collect_user_story_feedback()
+
+    client, looked_up = _client(monkeypatch, COMPLETED)
+    response = client.post("/send_feedback/", json=payload)
+    # Validated and routed to the session (which is not waiting for review)
+    assert response.status_code == 409
+    assert looked_up == ["wf-1"]
+
+
+def test_resume_workflow_does_not_skip_a_pending_review(monkeypatch):
+    client, looked_up = _client(monkeypatch, AWAITING_REVIEW)
+    response = client.post("/resume_workflow/wf-2")
+    assert response.status_code == 409
+    assert looked_up == ["wf-2"]